@@ -32,7 +32,6 @@
 import argparse
 import textwrap
 from textwrap			import dedent
-import copy
 import os
 import os.path
 import re
@@ -40,6 +39,7 @@ import sys
 from pathlib			import Path
 from datetime			import datetime
 from datetime			import timedelta
+from types				import MappingProxyType
 
 # MHGLIB includes
 from mhgAppConstants	import AppConstants
@@ -74,6 +74,27 @@ class CommandOptions(object):															# Command Line options constants
 	_OPT_DEBUG				= 'debug'													# Debug enable
 	_OPT_TRACE				= 'trace'													# Trace enable
 	_OPT_ZOMBIES			= 'zombies'													# Zombies enable
+	_OPT_REFRESH			= 'refresh'													# Force refetch of sheet data, bypassing snapshot cache
+	_OPT_ROW_SOURCE			= 'source'													# Where to read observation rows from
+	_OPT_SOURCE_FILE		= 'sourcefile'												# Dump file to read rows from, for file source
+	_OPT_UNFORMATTED		= 'unformatted'												# Fetch sheet values unformatted, dates as serial numbers
+	_OPT_TALLY				= 'tally'													# Tally engine for county stats
+	_OPT_WINDOWS			= 'windows'													# Report windows, in days ending on end date
+
+	#
+	#  Row Source Constants (public)
+	#
+	SOURCE_SHEET			= 'sheet'													# Google spreadsheet
+	SOURCE_DETAIL			= 'detail'													# Replay of Detail CSV files in data folder
+	SOURCE_FILE				= 'file'													# Local CSV/JSON dump of sheet rows
+	SOURCE_CUBE				= 'cube'													# Data cube saved by --tally cube
+
+	#
+	#  Tally Engine Constants (public)
+	#
+	TALLY_BATCH				= 'batch'													# Group-by over batch columns
+	TALLY_ROWS				= 'rows'													# Row at a time
+	TALLY_CUBE				= 'cube'													# County x day data cube of all rows, saved for --source cube
 	
 	_PROGRAM_NAME			= 'mhgCovidStatus.bat'
 
@@ -111,6 +132,9 @@ class AppCommandArgs(CommandOptions,AppConstants):
 	_ENV_APP_ALIAS			= "MHGGIS_APPALIAS"											# Environment variable containing alias program name to be used
 	_FORMAT_YMD				= '%Y.%m.%d'												# yyyy.mm.dd format 
 
+	# Properties (private)
+	_isFrozen				= False														# Set once arguments are parsed. Options are read-only after that.
+
 	#
 	# Constructor
 	#
@@ -118,6 +142,10 @@ class AppCommandArgs(CommandOptions,AppConstants):
 		self._argsNamespace	= None
 		self._argsHash		= {}
 
+	def __setattr__(self,name,value):													# Options are shared by reference, so they can't change once parsed
+		if self._isFrozen: raise AttributeError("Command options are read-only ({})".format(name))
+		super(AppCommandArgs,self).__setattr__(name,value)
+
 	#
 	#  Get Command Line Arguments
 	#
@@ -166,6 +194,12 @@ class AppCommandArgs(CommandOptions,AppConstants):
 		parser.add_argument(_optSw(self._OPT_DEBUG),												default=False,			action='store_true',	help='Whether to barf debug info')
 		parser.add_argument(_optSw(self._OPT_TRACE),												default=False,			action='store_true',	help='Whether to barf trace info')
 		parser.add_argument(_optSw(self._OPT_ZOMBIES),												default=False,			action='store_true',	help='Whether to enable zombies')
+		parser.add_argument(_optSw(self._OPT_ROW_SOURCE),		 type=str,	default=self.SOURCE_SHEET,	choices=[self.SOURCE_SHEET,self.SOURCE_DETAIL,self.SOURCE_FILE,self.SOURCE_CUBE],	help='Where to read observation rows from')
+		parser.add_argument(_optSw(self._OPT_SOURCE_FILE),		 type=str,	default=None,																		help='CSV or JSON dump of sheet rows, for --source file. Cube file, for --source cube.')
+		parser.add_argument(_optSw(self._OPT_REFRESH),												default=False,			action='store_true',	help='Refetch sheet data, ignoring cached snapshot')
+		parser.add_argument(_optSw(self._OPT_TALLY),			 type=str,	default=self.TALLY_BATCH,	choices=[self.TALLY_BATCH,self.TALLY_ROWS,self.TALLY_CUBE],						help='How to tally county stats. Output is the same either way.')
+		parser.add_argument(_optSw(self._OPT_WINDOWS),			 type=str,	default=None,																		help='Report windows, as days ending on end date (e.g. 1,7,30). One fetch, reports for each.')
+		parser.add_argument(_optSw(self._OPT_UNFORMATTED),											default=False,			action='store_true',	help='Fetch sheet values unformatted, with dates as serial numbers')
 
 		# Parse Arguments
 		self._argsNamespace = parser.parse_args()
@@ -173,6 +207,20 @@ class AppCommandArgs(CommandOptions,AppConstants):
 
 		# Post-parsing validation
 		
+		# File source needs a file
+		if self._argsHash[self._OPT_ROW_SOURCE] == self.SOURCE_FILE and self._argsHash[self._OPT_SOURCE_FILE] is None:
+			parser.error("{} {} requires {}".format(_optSw(self._OPT_ROW_SOURCE),self.SOURCE_FILE,_optSw(self._OPT_SOURCE_FILE)))
+
+		# Windows are a list of day counts
+		if not self._argsHash[self._OPT_WINDOWS] is None:
+			try:
+				windows = sorted(set(int(windowText) for windowText in self._argsHash[self._OPT_WINDOWS].split(',')))
+			except ValueError:
+				windows = []
+			if not windows or windows[0] < 1:
+				parser.error("{} takes a list of day counts, e.g. 1,7,30".format(_optSw(self._OPT_WINDOWS)))
+			self._argsHash[self._OPT_WINDOWS] = tuple(windows)
+
 		# Fix end date less than start date
 		if self._argsHash[self._OPT_FILTER_START_DATE] > self._argsHash[self._OPT_FILTER_END_DATE]:
 			swapDate = self._argsHash[self._OPT_FILTER_START_DATE]
@@ -205,11 +253,22 @@ class AppCommandArgs(CommandOptions,AppConstants):
 			deltaTime = endTS - startTS
 			self._argsHash[self._OPT_FILTER_DAYS] = deltaTime.days + 1
 			
+		# Windows end on the end date. Range reaches back to cover the longest.
+		if not self._argsHash[self._OPT_WINDOWS] is None:
+			endTS = datetime.strptime(self._argsHash[self._OPT_FILTER_END_DATE],self._FORMAT_YMD)
+			startTS = endTS - timedelta(days=self._argsHash[self._OPT_WINDOWS][-1] - 1)
+			self._argsHash[self._OPT_FILTER_START_DATE]	= startTS.strftime(self._FORMAT_YMD)
+			self._argsHash[self._OPT_FILTER_DAYS]		= self._argsHash[self._OPT_WINDOWS][-1]
+
 		# Trace implies debug
 		#if self._argsHash[self._OPT_TRACE]:		self._argsHash[self._OPT_DEBUG] = True
 
 		# Debug implies info
 		#if self._argsHash[self._OPT_DEBUG]:		self._argsHash[self._OPT_INFO] = True
+
+		# Freeze options. Getters hand out references.
+		self._argsHash = MappingProxyType(dict(self._argsHash))
+		self._isFrozen = True
 		
 		success = True
 		return success
@@ -218,49 +277,67 @@ class AppCommandArgs(CommandOptions,AppConstants):
 	# Getters
 	#
 	def startDate(self):
-		return copy.deepcopy(self._argsHash[self._OPT_FILTER_START_DATE])
+		return self._argsHash[self._OPT_FILTER_START_DATE]
 		
 	def startDateTS(self):
 		return datetime.strptime(self._argsHash[self._OPT_FILTER_START_DATE],self._FORMAT_YMD)
 
 	def endDate(self):
-		return copy.deepcopy(self._argsHash[self._OPT_FILTER_END_DATE])
+		return self._argsHash[self._OPT_FILTER_END_DATE]
 
 	def endDateTS(self):
 		return datetime.strptime(self._argsHash[self._OPT_FILTER_END_DATE],self._FORMAT_YMD)
 		
 	def nDays(self):
-		return copy.deepcopy(self._argsHash[self._OPT_FILTER_DAYS])
+		return self._argsHash[self._OPT_FILTER_DAYS]
 
 	def isDateRange(self):
 		return self._argsHash[self._OPT_FILTER_START_DATE] != self._argsHash[self._OPT_FILTER_END_DATE]
 		
 	def captureDetail(self):
-		return copy.deepcopy(self._argsHash[self._OPT_CAPTURE_DETAIL])
+		return self._argsHash[self._OPT_CAPTURE_DETAIL]
 		
 	def generateSummary(self):
-		return copy.deepcopy(self._argsHash[self._OPT_GENERATE_SUMMARY])
+		return self._argsHash[self._OPT_GENERATE_SUMMARY]
 
 	def generateProject(self):
-		return copy.deepcopy(self._argsHash[self._OPT_GENERATE_PROJECT])
+		return self._argsHash[self._OPT_GENERATE_PROJECT]
 
 	def generatePdf(self):
-		return copy.deepcopy(self._argsHash[self._OPT_GENERATE_PDF])
+		return self._argsHash[self._OPT_GENERATE_PDF]
 
 	def generateImage(self):
-		return copy.deepcopy(self._argsHash[self._OPT_GENERATE_IMAGE])
+		return self._argsHash[self._OPT_GENERATE_IMAGE]
 
 	def infoEnabled(self):
 		return self._argsHash[self._OPT_INFO] or self._argsHash[self._OPT_DEBUG]
 		
 	def debugEnabled(self):
-		return copy.deepcopy(self._argsHash[self._OPT_DEBUG])
+		return self._argsHash[self._OPT_DEBUG]
 		
 	def traceEnabled(self):
-		return copy.deepcopy(self._argsHash[self._OPT_TRACE])
+		return self._argsHash[self._OPT_TRACE]
 
 	def zombiesEnabled(self):
-		return copy.deepcopy(self._argsHash[self._OPT_ZOMBIES])
+		return self._argsHash[self._OPT_ZOMBIES]
+
+	def refreshData(self):
+		return self._argsHash[self._OPT_REFRESH]
+
+	def rowSource(self):
+		return self._argsHash[self._OPT_ROW_SOURCE]
+
+	def sourceFile(self):
+		return self._argsHash[self._OPT_SOURCE_FILE]
+
+	def unformattedValues(self):
+		return self._argsHash[self._OPT_UNFORMATTED]
+
+	def tallyEngine(self):
+		return self._argsHash[self._OPT_TALLY]
+
+	def windows(self):															# Report window day counts, ascending. None if not given.
+		return self._argsHash[self._OPT_WINDOWS]
 		
 	#
 	#	Methods
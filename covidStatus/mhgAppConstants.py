@@ -14,7 +14,6 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
-import copy
 
 #
 # Application Constants
@@ -25,10 +24,21 @@ class AppConstants(object):										# Application Settings Class
 	PROGNM					= "mhgCovidStatus"					# Application program name
 	FORMAT_YMD				= "%Y.%m.%d"						# date format YYYY.MM.DD
 	TEMPLATE_DATE_TOKEN		= "YMD"								# Token for search/replace of date in file name templates
+	TEMPLATE_KEY_TOKEN		= "KEY"								# Token for search/replace of cache key in file name templates
 
 	# Constants (private)
 	_COVID_SPREADSHEET_ID	= '1ckdKCNIB-5-KSUlV2ehW3KPARVlu_CC2npjsAHrml7Q'	# Google Document ID to fetch
 	_COVID_DATA_RANGE		= 'DailyData!A2:K'									# Spreadsheet range to fetch (minus header)
+	_COVID_DATA_RANGES		= ( _COVID_DATA_RANGE, )							# Spreadsheet ranges to fetch, one per intake/history tab. Fetched in one batch.
+
+	_SHEET_CACHE_MAX_AGE_DAYS	= 30											# Sheet snapshot cache entries older than this are evicted
+	_SHEET_CACHE_MAX_BYTES		= 64 * 1024 * 1024								# Sheet snapshot cache total size limit
+	_SHEET_OVERLAP_ROWS			= 5												# Trailing rows refetched to verify an append-only fetch
+
+	_SHEETS_REQUESTS_PER_MINUTE	= 60											# Sheets API read quota, requests per minute per user
+	_SHEETS_MAX_RETRIES			= 5												# Retries of a Sheets request after quota or server errors
+	_SHEETS_BACKOFF_SECS		= 1.0											# First retry backoff ceiling, doubled on each retry
+	_SHEETS_BACKOFF_MAX_SECS	= 32.0											# Retry backoff ceiling limit
 
 	_currTimestamp			= None 								# current date and time (timestamp)
 	_currDateYmd			= None 								# current date YYYY.MM.DD (text)
@@ -56,10 +66,10 @@ class AppConstants(object):										# Application Settings Class
 
 
 	def currTimestamp(cls):
-		return copy.deepcopy(cls._currTimestamp)
+		return cls._currTimestamp
 
 	def currDateYmd(cls):
-		return copy.deepcopy(cls._currDateYmd)
+		return cls._currDateYmd
 
 	def currDateTS(cls):
-		return copy.deepcopy(cls._currDateTS)
+		return cls._currDateTS
@@ -52,6 +52,7 @@ class AppEnvironment:
 	#
 	_ENV_QGIS_ROOT			= 'MHGGIS_QGIS_ROOT'						# QGIS Package root folder environment var
 	_ENV_PACKAGE_FOLDER		= 'MHGGIS_ROOT'								# MHGGIS Package root folder environment var
+	_ENV_GOOGLE_ENDPOINT	= 'MHGGIS_GOOGLE_ENDPOINT'					# Google API endpoint override (e.g. local sheet stand-in) environment var
 	_ROOT_KEY_FOLDERS		= [ 'data', 'kml', 'output', 'images' ]		# MHGGIS Package folders for verification of install
 
     #
@@ -104,3 +105,11 @@ class AppEnvironment:
 		rootPath = Path(rootFolder)
 		if not rootPath.is_dir(): appExit(2,errorText = "ERROR: Folder {} does not exist. Fix {} environment variable.".format(packageFolder,AppEnvironment._ENV_QGIS_ROOT))
 		return rootFolder
+
+	# Google API Endpoint
+	def GetGoogleEndpoint():											# Get Google API endpoint override from environment variable. None for Google's own.
+		endpointUrl = os.environ.get(AppEnvironment._ENV_GOOGLE_ENDPOINT)
+		if endpointUrl is None or endpointUrl.strip() == '': return None
+		endpointUrl = endpointUrl.strip()
+		if endpointUrl[-1:] != '/': endpointUrl = endpointUrl + '/'
+		return endpointUrl
@@ -27,7 +27,6 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
-import copy
 import sys
 from datetime			import datetime
 
@@ -36,6 +35,7 @@ from mhgAppCommandArgs	import AppCommandArgs
 from mhgAppConstants	import AppConstants
 from mhgAppEnvironment	import AppEnvironment
 from mhgException		import *
+from mhgRunConfig		import RunConfig
 
 #
 # Application Settings class
@@ -45,6 +45,7 @@ class AppSettings(AppConstants):								# Application Settings Class
 	# Properties (private)
 	_instance 				= None								# Class singleton object holder
 	_appOptions				= None								# Parsed Command Options Object
+	_runConfig				= None								# Run configuration snapshot of command options
 
 	_package_root			= None								# MHGGIS Package root folder for mgh-gis suite
 	_app_folder				= None								# Application folder
@@ -56,6 +57,7 @@ class AppSettings(AppConstants):								# Application Settings Class
 	_qgis_root				= None								# QGIS Root folder
 	_qgis_bin_folder		= None								# QGIS Apps folder
 	_qgis_python_folder		= None								# QGIS Python folder
+	_google_endpoint		= None								# Google API endpoint override (None for Google's own)
 
 	def __init__(self):
 		raise RuntimeError('Call glob() instead')
@@ -75,6 +77,8 @@ class AppSettings(AppConstants):								# Application Settings Class
 			success = cls._appOptions.GetArguments()
 			if not success:
 				raise CommandArgError('AppSettings::Error processing command arguments')
+			cls._runConfig = RunConfig.FromOptions(cls._appOptions)
+			RunConfig.SetCurrent(cls._runConfig)
 
 			# Get Application Environment Info
 			cls._package_root		= AppEnvironment.GetPackageRoot()												
@@ -89,48 +93,85 @@ class AppSettings(AppConstants):								# Application Settings Class
 			cls._qgis_bin_folder	= cls._qgis_root + "/apps/qgis-ltr"
 			cls._qgis_python_folder	= cls._qgis_bin_folder + "/python/plugins"
 
+			# Get Google API Environment Info
+			cls._google_endpoint	= AppEnvironment.GetGoogleEndpoint()
+
 		return cls._instance
 
 
 	#
 	# Properties (public)
 	#
-	def options(cls):											# Get Application Options object
-		return copy.deepcopy(cls._appOptions)
+	def options(cls):											# Get Application Options object (read-only, shared)
+		return cls._appOptions
+
+	def runConfig(cls):											# Run configuration, built from options
+		return cls._runConfig
+
+	def _FileTag(cls,runConfig):								# Output file name tag of a run configuration. Current one, if None.
+		if runConfig is None: runConfig = cls._runConfig
+		return runConfig.fileTag()
 
 	def packageRoot(cls):										# Application Root Folder
-		return copy.deepcopy(cls._package_root)
+		return cls._package_root
 
 	def qgisRoot(cls):											# QGIS Root Folder
-		return copy.deepcopy(cls._qgis_root)
+		return cls._qgis_root
 
 	def qgisBinFolder(cls):										# QGIS Binaries Folder
-		return copy.deepcopy(cls._qgis_bin_folder)
+		return cls._qgis_bin_folder
 
 	def qgisPythonFolder(cls):									# QGIS Python Folder
-		return copy.deepcopy(cls._qgis_python_folder)
+		return cls._qgis_python_folder
+
+	def googleEndpoint(cls):									# Google API endpoint override, e.g. local sheet stand-in. None for Google's own.
+		return cls._google_endpoint
 
 	def appFolder(cls):											# Covid Report application folder
-		return copy.deepcopy(cls._app_folder)
+		return cls._app_folder
 
 	def dataFolder(cls):										# Data Folder (output)
-		return copy.deepcopy(cls._data_folder)
+		return cls._data_folder
 
 	def imagesFolder(cls):										# Images Folder (input)
-		return copy.deepcopy(cls._images_folder)
+		return cls._images_folder
 
 	def kmlFolder(cls):											# KML Folder (input)
-		return copy.deepcopy(cls._kml_folder)
+		return cls._kml_folder
 
 	def outputFolder(cls):										# Output Folder (output)
-		return copy.deepcopy(cls._output_folder)
+		return cls._output_folder
 
 	
 	def covidSheetID(cls):
-		return copy.deepcopy(cls._COVID_SPREADSHEET_ID)
+		return cls._COVID_SPREADSHEET_ID
 		
 	def covidSheetDataRange(cls):
-		return copy.deepcopy(cls._COVID_DATA_RANGE)
+		return cls._COVID_DATA_RANGE
+
+	def covidSheetDataRanges(cls):
+		return cls._COVID_DATA_RANGES
+
+	def sheetCacheMaxAgeDays(cls):
+		return cls._SHEET_CACHE_MAX_AGE_DAYS
+
+	def sheetCacheMaxBytes(cls):
+		return cls._SHEET_CACHE_MAX_BYTES
+
+	def sheetOverlapRows(cls):
+		return cls._SHEET_OVERLAP_ROWS
+
+	def sheetsRequestsPerMinute(cls):
+		return cls._SHEETS_REQUESTS_PER_MINUTE
+
+	def sheetsMaxRetries(cls):
+		return cls._SHEETS_MAX_RETRIES
+
+	def sheetsBackoffSecs(cls):
+		return cls._SHEETS_BACKOFF_SECS
+
+	def sheetsBackoffMaxSecs(cls):
+		return cls._SHEETS_BACKOFF_MAX_SECS
 
 											#########   File specs  #############
 	def googlePickleSpec(cls):
@@ -139,27 +180,43 @@ class AppSettings(AppConstants):								# Application Settings Class
 	def googleCredentialsSpec(cls):
 		return cls._data_folder + 'credentials.json'							# Google API credentials file									# GoogleGoo.IO
 
+	def googleDiscoveryTemplate(cls):
+		return cls._data_folder + 'googleDiscovery-KEY.json'					# Google API discovery document cache, by api-version			# GoogleGoo.IO
+
+
+	def sheetCacheTemplate(cls):												# Sheet snapshot cache file specification						# SheetCache.IO
+		return "{}mhgSheetCache-KEY.json".format(cls._data_folder)
+
+	def sheetIndexTemplate(cls):												# Sheet date index file specification							# SheetIndex.IO
+		return "{}mhgSheetIndex-KEY.json".format(cls._data_folder)
+
 
 	def kmlStatusTemplateSpec(cls):												# Template KML of Michigan counties and MHG Covid data schema	# KmlWriter:Input
 		return cls._kml_folder + "mhgCovidStatusMichigan.kml"
 
-	def statusKmlSpec(cls):														# Status KML file daily generated file 							# KmlWriter:Output, GisWriter.Input
-		return "{}mhgCovidStatus-{}.kml".format(cls._output_folder,cls._appOptions.endDate())
+	def statusKmlSpec(cls,runConfig=None):										# Status KML file daily generated file 							# KmlWriter:Output, GisWriter.Input
+		return "{}mhgCovidStatus-{}.kml".format(cls._output_folder,cls._FileTag(runConfig))
 
 	def detailCsvTemplate(cls):													# Detail CSV file specification									# DetailWriter.Output
 		return "{}mhgCovidStatus-Detail-YMD.csv".format(cls._data_folder)
 
-	def summaryCsvSpec(cls):													# Summary CSV file specification								# SummaryWriter.Output
-		return "{}mhgCovidStatus-Summary-{}.csv".format(cls._data_folder,cls._appOptions.endDate())
+	def summaryCsvSpec(cls,runConfig=None):										# Summary CSV file specification								# SummaryWriter.Output
+		return "{}mhgCovidStatus-Summary-{}.csv".format(cls._data_folder,cls._FileTag(runConfig))
+
+	def rejectsCsvSpec(cls,runConfig=None):										# Rejected rows CSV file specification							# RejectsWriter.Output
+		return "{}mhgCovidStatus-Rejects-{}.csv".format(cls._data_folder,cls._FileTag(runConfig))
+
+	def cubeSpec(cls,zombiesEnabled=False):										# Data cube file specification, by zombie mode of its weights	# CovidDataReader.Output, CubeRowSource.Input
+		return "{}mhgCovidStatus-Cube{}.npy".format(cls._data_folder,'-Zombies' if zombiesEnabled else '')
 
 	def mhgLogoSpec(cls):
 		return cls._images_folder + "MHG-yellow.jpg"							# MHG Logo Image file specification								# GisWriter.Input
 
-	def gisProjectSpec(cls):													# Report QGIS Project file specification						# GisWriter.Output
-		return "{}mhgCovidStatus-{}.qgz".format(cls._output_folder,cls._appOptions.endDate())
+	def gisProjectSpec(cls,runConfig=None):										# Report QGIS Project file specification						# GisWriter.Output
+		return "{}mhgCovidStatus-{}.qgz".format(cls._output_folder,cls._FileTag(runConfig))
 
-	def gisPdfSpec(cls):														# Report PDF file specification									# GisWriter.Output
-		return "{}mhgCovidStatus-{}.pdf".format(cls._output_folder,cls._appOptions.endDate())
+	def gisPdfSpec(cls,runConfig=None):											# Report PDF file specification									# GisWriter.Output
+		return "{}mhgCovidStatus-{}.pdf".format(cls._output_folder,cls._FileTag(runConfig))
 
-	def gisImageSpec(cls):														# Report JPG image file specification							# GisWriter.Output
-		return "{}mhgCovidStatus-{}.jpg".format(cls._output_folder,cls._appOptions.endDate())
+	def gisImageSpec(cls,runConfig=None):										# Report JPG image file specification							# GisWriter.Output
+		return "{}mhgCovidStatus-{}.jpg".format(cls._output_folder,cls._FileTag(runConfig))
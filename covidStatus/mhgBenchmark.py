@@ -0,0 +1,336 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgBenchmark.py
+#
+# Description
+#
+#   Fetch and parse benchmark. Starts a local Sheets stand-in (mhgSheetStandIn) serving
+#   synthetic DailyData rows, points GoogleGoo at it, and times fetching the rows and running
+#   them through the GetData validate/batch/filter path, for each sheet size given.
+#   Runs offline, and gives the same rows every time for a given seed.
+#
+#   --micro times the per-call cost of the accessors used on every row and log line instead,
+#   next to the cost of the deepcopy those accessors used to make of their value.
+#
+#   --selfcheck drives the Google request scheduler (mhgRequestScheduler) against the stand-in
+#   instead, failing requests on purpose, and checks its retry, backoff, Retry-After, token
+#   bucket and coalescing counts. Exits with status 1 if any check fails.
+#
+# Usage:
+#
+#    mhgBenchmark.py [-h] [--rows ROWS] [--latency MS] [--errorrate RATE] [--commentbytes N]
+#                    [--fixture FIXTURE] [--seed SEED] [--micro] [--selfcheck] [mhgCovidStatus options]
+#
+#    e.g.   mhgBenchmark.py --rows 10000,100000,1000000
+#           mhgBenchmark.py --rows 100000 --latency 80 --errorrate 0.05 --unformatted
+#           mhgBenchmark.py --micro
+#           mhgBenchmark.py --selfcheck
+#
+#    Options not listed above are passed on as mhgCovidStatus options (date range, --unformatted,
+#    --debug, ...). --refresh is always set. Date range defaults to all synthetic dates.
+#
+#    The app runs on a scratch package root (MHGGIS_ROOT), so the stand-in's rows never reach the
+#    sheet snapshot and index in the real data folder. Cached discovery documents are copied in.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import argparse
+import copy
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import urllib.error
+import urllib.request
+
+# MHGLIB includes
+from mhgSheetStandIn	import SheetStandIn
+
+# Constants
+_SYNTH_DAYS				= 365													# Days synthetic rows are spread over
+_SYNTH_DATE_ARGS		= ['--start', '2020.03.20', '--ndays', str(_SYNTH_DAYS)]	# Date range covering all synthetic rows
+_MICRO_CALLS			= 200000												# Calls timed per accessor
+_ROOT_FOLDERS			= [ 'data', 'kml', 'output', 'images' ]						# Folders of a package root
+_CHECK_RANGE			= 'v4/spreadsheets/selfcheck/values/DailyData!A2:K'			# Stand-in values request of the scheduler self-check
+_CHECK_COALESCE_CT		= 5															# Identical requests made at once by the coalescing check
+
+#
+# Stand-in request (private)
+#	Enough of googleapiclient's HttpRequest for the request scheduler: method, uri and body to
+#	key it, and execute(), which raises HttpError on an error status as the client library does.
+#
+class _StandInResponse(dict):													# Response headers (lower case names), with status and reason, as httplib2 has them
+
+	status						= None
+	reason						= None
+
+	def __init__(self,status,reason,headers):
+		super(_StandInResponse,self).__init__((headerName.lower(),headerValue) for headerName,headerValue in headers.items())
+		self.status		= status
+		self.reason		= reason
+
+class _StandInRequest(object):
+
+	method						= 'GET'
+	uri							= None
+	body						= None
+
+	def __init__(self,uri):
+		self.uri		= uri
+
+	def execute(self,http=None):
+		from googleapiclient.errors	import HttpError
+		try:
+			with urllib.request.urlopen(self.uri) as httpResponse:
+				return json.loads(httpResponse.read().decode('utf-8'))
+		except urllib.error.HTTPError as err:
+			raise HttpError(_StandInResponse(err.code,err.reason,err.headers), err.read(), uri=self.uri)
+
+#
+# Clock (private). Moves only when slept on, so scheduler waits are counted but take no time.
+#
+class _StepClock(object):
+
+	_nowSecs					= 0.0
+
+	def now(self):
+		return self._nowSecs
+
+	def sleep(self,waitSecs):
+		self._nowSecs += waitSecs
+
+#
+# Scratch package root for the app, with discovery documents of the real one. Returns its folder.
+#
+def benchRoot(scratchFolder):
+	for packageFolder in _ROOT_FOLDERS: os.makedirs(os.path.join(scratchFolder,packageFolder))
+	packageRoot = os.environ.get('MHGGIS_ROOT')
+	if packageRoot:
+		for discoverySpec in glob.glob(os.path.join(packageRoot,'data','googleDiscovery-*.json')):
+			shutil.copy(discoverySpec, os.path.join(scratchFolder,'data'))
+	return scratchFolder
+
+#
+# Benchmark one sheet size
+#
+def benchSheet(rowCt):
+	from mhgGoogleGoo		import GoogleGoo
+	from mhgGoogleSheet		import GoogleSheet
+	from mhgRowBatch		import RowBatch
+	from mhgRowValidator	import RowValidator
+
+	scheduler = GoogleGoo.Scheduler()
+	requestCt,retryCt,waitSecs = scheduler.requestCt(),scheduler.retryCt(),scheduler.waitSecs()
+	sheet = GoogleSheet()
+	startTime = time.perf_counter()
+	rowSets = sheet.FetchRowSets()												# Login, fetch (and snapshot write)
+	fetchTime = time.perf_counter()
+	rowValidator,rowBatch = RowValidator(),RowBatch()
+	for sourceTag,sourceRows in rowSets:										# Validate and batch, as GetData does
+		sourceColumns,keepMask = rowValidator.Validate(sourceRows,sourceTag)
+		rowBatch.AppendColumns(sourceColumns,keepMask,sourceTag)
+	runConfig = sheet.runConfig()												# Filter by date
+	matchCt = rowBatch.Select(rowBatch.DateMask(runConfig.startDateOrd(),runConfig.endDateOrd())).rowCt()
+	parseTime = time.perf_counter()
+	sheet.Close()
+
+	fetchSecs = fetchTime - startTime
+	parseSecs = parseTime - fetchTime
+	print("{:>9} {:>9.3f} {:>9.3f} {:>11.0f} {:>9} {:>8} {:>7} {:>8.1f}".format(rowCt, fetchSecs, parseSecs, rowCt / max(parseSecs,1e-9), matchCt,
+				scheduler.requestCt() - requestCt, scheduler.retryCt() - retryCt, scheduler.waitSecs() - waitSecs))
+
+#
+# Request scheduler self-check. Returns list of names of failed checks.
+#
+def checkResult(checkName,isOk,detailText,failedChecks):
+	print("{:<5} {:<34} {}".format('ok' if isOk else 'FAIL', checkName, detailText))
+	if not isOk: failedChecks.append(checkName)
+	return isOk
+
+def checkScheduler():
+	from googleapiclient.errors	import HttpError
+	from mhgAppSettings			import AppSettings
+	from mhgRequestScheduler	import RequestScheduler
+
+	maxRetries		= AppSettings.glob().sheetsMaxRetries()
+	backoffSecs		= AppSettings.glob().sheetsBackoffSecs()
+	failedChecks	= []
+
+	def newScheduler(requestsPerMinute=600,jitter=1.0):							# Scheduler on a step clock. Jitter 1.0 backs off the whole ceiling.
+		stepClock = _StepClock()
+		return RequestScheduler(requestsPerMinute=requestsPerMinute, clock=stepClock.now, sleep=stepClock.sleep, rand=lambda: jitter)
+
+	def runChecked(scheduler,standIn,failCt=0,errorStatus=None,requestCt=1):	# Make requests, failing the first failCt. Returns (upstream requests, requests given up).
+		standInCt,giveUpCt = standIn.requestCt(),0
+		if failCt: standIn.FailNext(failCt,errorStatus)
+		for requestNo in range(requestCt):
+			try:
+				scheduler.Execute(_StandInRequest(standIn.endpoint() + _CHECK_RANGE))
+			except HttpError:
+				giveUpCt += 1
+		return standIn.requestCt() - standInCt, giveUpCt
+
+	standIn			= SheetStandIn(synthRows=20)
+	retryAfterIn	= SheetStandIn(synthRows=20, retryAfterSecs=7)
+	randomErrorIn	= SheetStandIn(synthRows=20, errorRate=0.2, seed=3)
+	slowIn			= SheetStandIn(synthRows=20, latencyMs=300)
+	for checkStandIn in [standIn, retryAfterIn, randomErrorIn, slowIn]: checkStandIn.Start()
+
+	# 5xx, twice: three calls, backoff of 1x then 2x the first ceiling
+	scheduler = newScheduler()
+	upstreamCt,giveUpCt = runChecked(scheduler, standIn, 2, 503)
+	checkResult('503 retried', upstreamCt == 3 and scheduler.retryCt() == 2 and giveUpCt == 0,
+				"calls={} retries={} givenUp={}".format(upstreamCt,scheduler.retryCt(),giveUpCt), failedChecks)
+	checkResult('503 backoff doubles', abs(scheduler.waitSecs() - backoffSecs * 3) < 1e-6,
+				"waitSecs={:.2f} want={:.2f}".format(scheduler.waitSecs(),backoffSecs * 3), failedChecks)
+
+	# 429, once
+	scheduler = newScheduler()
+	upstreamCt,giveUpCt = runChecked(scheduler, standIn, 1, 429)
+	checkResult('429 retried', upstreamCt == 2 and scheduler.retryCt() == 1 and giveUpCt == 0,
+				"calls={} retries={} givenUp={}".format(upstreamCt,scheduler.retryCt(),giveUpCt), failedChecks)
+
+	# 429 with Retry-After longer than the jittered backoff (none, at jitter 0)
+	scheduler = newScheduler(jitter=0.0)
+	upstreamCt,giveUpCt = runChecked(scheduler, retryAfterIn, 1, 429)
+	checkResult('Retry-After honored', upstreamCt == 2 and abs(scheduler.waitSecs() - 7.0) < 1e-6,
+				"calls={} waitSecs={:.2f} want=7.00".format(upstreamCt,scheduler.waitSecs()), failedChecks)
+
+	# 5xx past the retry limit: request given up
+	scheduler = newScheduler()
+	upstreamCt,giveUpCt = runChecked(scheduler, standIn, maxRetries + 1, 503)
+	checkResult('503 retries run out', upstreamCt == maxRetries + 1 and scheduler.retryCt() == maxRetries and giveUpCt == 1,
+				"calls={} retries={} givenUp={}".format(upstreamCt,scheduler.retryCt(),giveUpCt), failedChecks)
+
+	# 4xx other than 429: not retried
+	scheduler = newScheduler()
+	upstreamCt,giveUpCt = runChecked(scheduler, standIn, 1, 400)
+	checkResult('400 not retried', upstreamCt == 1 and scheduler.retryCt() == 0 and giveUpCt == 1,
+				"calls={} retries={} givenUp={}".format(upstreamCt,scheduler.retryCt(),giveUpCt), failedChecks)
+
+	# Token bucket of 3 a minute: 4th request waits for one token, 20 seconds
+	scheduler = newScheduler(requestsPerMinute=3)
+	upstreamCt,giveUpCt = runChecked(scheduler, standIn, requestCt=4)
+	checkResult('token bucket wait', upstreamCt == 4 and scheduler.retryCt() == 0 and abs(scheduler.waitSecs() - 20.0) < 1e-6,
+				"calls={} waitSecs={:.2f} want=20.00".format(upstreamCt,scheduler.waitSecs()), failedChecks)
+
+	# Random errors: every injected error is one retry, but for requests given up
+	scheduler = newScheduler()
+	upstreamCt,giveUpCt = runChecked(scheduler, randomErrorIn, requestCt=50)
+	checkResult('random errors retried', upstreamCt == scheduler.requestCt() and scheduler.retryCt() == randomErrorIn.errorCt() - giveUpCt,
+				"calls={} errors={} retries={} givenUp={}".format(upstreamCt,randomErrorIn.errorCt(),scheduler.retryCt(),giveUpCt), failedChecks)
+
+	# Identical requests while one is in flight: one upstream call, all get its result
+	scheduler,results = newScheduler(),[]
+	requestThreads = [threading.Thread(target=lambda: results.append(scheduler.Execute(_StandInRequest(slowIn.endpoint() + _CHECK_RANGE))))
+						for threadNo in range(_CHECK_COALESCE_CT)]
+	requestThreads[0].start()
+	while scheduler.requestCt() < 1: time.sleep(0.01)							# First request is in flight
+	for requestThread in requestThreads[1:]: requestThread.start()
+	for requestThread in requestThreads: requestThread.join()
+	checkResult('in flight requests coalesced', slowIn.requestCt() == 1 and scheduler.coalescedCt() == _CHECK_COALESCE_CT - 1
+				and len(results) == _CHECK_COALESCE_CT and all(result == results[0] for result in results),
+				"calls={} coalesced={} results={}".format(slowIn.requestCt(),scheduler.coalescedCt(),len(results)), failedChecks)
+
+	for checkStandIn in [standIn, retryAfterIn, randomErrorIn, slowIn]: checkStandIn.Stop()
+	return failedChecks
+
+#
+# Benchmark accessors on hot paths. Per call cost now, and the cost of the deepcopy each one used to make.
+#
+def benchAccessors(callCt=_MICRO_CALLS):
+	from mhgAppCommandArgs	import AppCommandArgs
+	from mhgAppSettings		import AppSettings
+	from mhgDataField		import DataField
+	from mhgImpact			import Impact
+	from mhgUtility			import barfd
+
+	appOptions = AppSettings.glob().options()
+	copiedOptions = AppCommandArgs()												# Options as they were before being frozen, for the deepcopy cost
+	copiedOptions._argsNamespace = appOptions._argsNamespace
+	copiedOptions._argsHash = dict(appOptions._argsHash)
+	dataField = DataField(2, DataField.DTYPE_TEXT, 'County', 'Kent')
+
+	accessorTests = [	('DataField.value()',			dataField.value,									'Kent'),
+						('AppSettings.options()',		AppSettings.glob().options,							copiedOptions),
+						('options().startDate()',		appOptions.startDate,								appOptions.startDate()),
+						('barfd() (debug off)',			lambda: barfd("benchmark %s", callCt),				copiedOptions),
+						('Impact.WeightFromCode(Z)',	lambda: Impact.WeightFromCode('Z'),					copiedOptions) ]
+
+	print("{:<26} {:>10} {:>12}".format('accessor','ns/call','deepcopy ns'))
+	for testName,testCall,copiedValue in accessorTests:
+		callNs = timeit.Timer(testCall).timeit(callCt) / callCt * 1e9
+		copyCt = max(callCt // 100, 100)
+		copyNs = timeit.Timer(lambda: copy.deepcopy(copiedValue)).timeit(copyCt) / copyCt * 1e9
+		print("{:<26} {:>10.0f} {:>12.0f}".format(testName, callNs, copyNs))
+
+"""
+##########################################
+		MAIN
+##########################################
+"""
+def main():
+	parser = argparse.ArgumentParser(prog='mhgBenchmark.py', description="=== MHG Fetch/Parse Benchmark ===")
+	parser.add_argument('--rows',			type=str,	default='10000,100000,1000000',	help='Comma separated sheet sizes, in rows')
+	parser.add_argument('--latency',		type=int,	default=0,						help='Stand-in milliseconds added to every response')
+	parser.add_argument('--errorrate',		type=float,	default=0.0,					help='Stand-in fraction of requests failed')
+	parser.add_argument('--commentbytes',	type=int,	default=0,						help='Synthetic comment length, to pad payload size')
+	parser.add_argument('--fixture',		type=str,	default=None,					help='JSON or CSV dump of sheet rows to serve instead of synthetic rows')
+	parser.add_argument('--seed',			type=int,	default=1,						help='Synthetic data and error injection seed')
+	parser.add_argument('--micro',			default=False,	action='store_true',			help='Time hot path accessors instead of fetch and parse')
+	parser.add_argument('--selfcheck',		default=False,	action='store_true',			help='Check request scheduler retries and coalescing against the stand-in')
+	benchArgs,appArgs = parser.parse_known_args()
+
+	if benchArgs.micro:
+		sys.argv = [sys.argv[0]] + appArgs
+		print("####\n#### Accessor micro-benchmark. {} calls each\n####".format(_MICRO_CALLS))
+		benchAccessors()
+		return
+
+	if benchArgs.selfcheck:
+		if not '--start' in appArgs and not '--ndays' in appArgs: appArgs = appArgs + _SYNTH_DATE_ARGS
+		sys.argv = [sys.argv[0]] + appArgs
+		print("####\n#### Request scheduler self-check\n####")
+		failedChecks = checkScheduler()
+		print("{} check(s) failed: {}".format(len(failedChecks), ', '.join(failedChecks)) if failedChecks else "All checks passed")
+		sys.exit(1 if failedChecks else 0)
+
+	scratchRoot = tempfile.TemporaryDirectory(prefix='mhgBenchmark-')
+	os.environ['MHGGIS_ROOT'] = benchRoot(scratchRoot.name)						# Keep snapshot and index writes out of the real data folder
+
+	standIn = SheetStandIn(fixtureSpec=benchArgs.fixture, synthDays=_SYNTH_DAYS, latencyMs=benchArgs.latency,
+							errorRate=benchArgs.errorrate, commentBytes=benchArgs.commentbytes, seed=benchArgs.seed)
+	os.environ['MHGGIS_GOOGLE_ENDPOINT'] = standIn.Start()
+
+	if not '--start' in appArgs and not '--ndays' in appArgs: appArgs = appArgs + _SYNTH_DATE_ARGS
+	sys.argv = [sys.argv[0]] + appArgs + ['--refresh']							# App options, for AppSettings
+
+	print("####\n#### Benchmark. Stand-in={} latency={}ms errorRate={}\n####".format(standIn.endpoint(),benchArgs.latency,benchArgs.errorrate))
+	print("{:>9} {:>9} {:>9} {:>11} {:>9} {:>8} {:>7} {:>8}".format('rows','fetchSecs','parseSecs','parseRows/s','matched','requests','retries','waitSecs'))
+	if not benchArgs.fixture is None:
+		benchSheet(standIn.rowCt())
+	else:
+		for rowCt in [int(rowText) for rowText in benchArgs.rows.split(',')]:
+			standIn.SetSynthRows(rowCt)
+			benchSheet(rowCt)
+
+	standIn.Stop()
+	scratchRoot.cleanup()
+
+if __name__ == '__main__':
+	main()
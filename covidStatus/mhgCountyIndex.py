@@ -0,0 +1,167 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgCountyIndex.py
+#
+# Description
+#
+#   County index. Interned dictionary of Michigan county names, by small integer county id.
+#   Built once from the MichiganInfo county table plus the placemarks of the KML status
+#   template. County text from reports is canonicalized by normalized spelling, known aliases
+#   and city names (Flint -> Genesee), and each distinct string is looked up only once. Only
+#   cities wholly inside one county are mapped; cities that span counties (Holland, Lansing)
+#   are left unknown. Names that can't be placed are interned as-is under their own id, and
+#   reported once.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import os
+import re
+import sys
+
+# MHGLIB includes
+from mhgCountyStats		import CountyStats
+from mhgMichiganInfo	import MichiganInfo
+from mhgUtility			import *
+
+class CountyIndex(object):
+
+	# Constants (public)
+	DEFAULT_ID				= 0													# Id of the default county, for stats with no county
+
+	# Constants (private)
+	_COUNTY_SUFFIX			= ' county'											# Dropped from normalized names
+	_PLACEMARK_PATTERN		= re.compile('^[\t ]*<Placemark>[\t ]*$')			# KML placemark start
+	_PLACEMARK_NAME_PATTERN	= re.compile('^[\t ]*<name>([^<]+)</name>[\t ]*$')	# County name line of a KML placemark
+	_ALIASES				= { 'st joeseph':		'St Joseph',				# Normalized misspellings and variants -> county
+								'saint joseph':		'St Joseph',
+								'saint clair':		'St Clair',
+								'gd traverse':		'Grand Traverse',
+								'presqueisle':		'Presque Isle',
+								'vanburen':			'Van Buren' }
+	_CITIES					= { 'ann arbor':		'Washtenaw',				# Normalized city names -> county. Single county cities only.
+								'battle creek':		'Calhoun',
+								'bay city':			'Bay',
+								'dearborn':			'Wayne',
+								'detroit':			'Wayne',
+								'escanaba':			'Delta',
+								'farmington hills':	'Oakland',
+								'flint':			'Genesee',
+								'grand rapids':		'Kent',
+								'kentwood':			'Kent',
+								'livonia':			'Wayne',
+								'mount pleasant':	'Isabella',
+								'mt pleasant':		'Isabella',
+								'novi':				'Oakland',
+								'pontiac':			'Oakland',
+								'port huron':		'St Clair',
+								'rochester hills':	'Oakland',
+								'royal oak':		'Oakland',
+								'sault ste marie':	'Chippewa',
+								'southfield':		'Oakland',
+								'sterling heights':	'Macomb',
+								'troy':				'Oakland',
+								'warren':			'Macomb',
+								'westland':			'Wayne',
+								'wyoming':			'Kent',
+								'ypsilanti':		'Washtenaw' }
+
+	# Index of Michigan counties (private)
+	_michigan				= None												# Built on first use
+
+	# Properties (private)
+	_names					= None												# County id -> county name
+	_ids					= None												# Normalized name -> county id
+	_idMemo					= None												# County text, as given -> county id
+	_knownCt				= None												# Ids below this are known counties
+
+	# Constructor
+	def __init__(self,countyNames,templateSpec=None):
+		self._names		= []
+		self._ids		= {}
+		self._idMemo	= {}
+		self._Intern(CountyStats.COUNTY_DEFAULT)									# Id 0
+		for countyName in countyNames: self._Intern(countyName)
+		if not templateSpec is None and os.path.isfile(templateSpec):				# Template counties not in the table
+			inPlacemark = False
+			with open(templateSpec) as fhTemplate:
+				for kmlLine in fhTemplate:
+					kmlLine = kmlLine.rstrip('\r\n')
+					if self._PLACEMARK_PATTERN.match(kmlLine): inPlacemark = True
+					nameMatch = self._PLACEMARK_NAME_PATTERN.match(kmlLine) if inPlacemark else None
+					if nameMatch:
+						inPlacemark = False													# First name of a placemark is the county
+						if self._Canonical(self._Normalized(nameMatch.group(1))) is None: self._Intern(nameMatch.group(1).strip())
+		self._knownCt	= len(self._names)
+		barfd("CountyIndex.Constructor(%s counties)", self._knownCt - 1)
+
+	#
+	# Methods (private)
+	#
+	def _Normalized(self,countyText):											# Lower case, single spaced, no periods or county suffix
+		normalName = ' '.join(countyText.replace('.',' ').lower().split())
+		if normalName.endswith(self._COUNTY_SUFFIX): normalName = normalName[:-len(self._COUNTY_SUFFIX)]
+		if normalName.startswith('saint '): normalName = 'st ' + normalName[6:]
+		return normalName
+
+	def _Canonical(self,normalName):											# County id of a normalized name, alias or city. None if not known.
+		countyId = self._ids.get(normalName)
+		if countyId is None:
+			countyName = self._ALIASES.get(normalName) or self._CITIES.get(normalName)
+			if not countyName is None: countyId = self._ids.get(self._Normalized(countyName))
+		return countyId
+
+	def _Intern(self,countyName):
+		countyId = len(self._names)
+		self._names.append(countyName)
+		self._ids[self._Normalized(countyName)] = countyId
+		return countyId
+
+	#
+	# Methods (public)
+	#
+	def CountyId(self,countyText):												# County id of county text from a report
+		countyId = self._idMemo.get(countyText)
+		if countyId is None:
+			normalName = self._Normalized(countyText)
+			countyId = self._Canonical(normalName)
+			if countyId is None:
+				barf("WARNING: Unknown county '%s'. Stats kept under that name.", countyText)
+				countyId = self._Intern(countyText.strip())
+			self._idMemo[countyText] = countyId
+		return countyId
+
+	def CountyIds(self,countyTexts):											# County ids of a list of county text
+		return [self.CountyId(countyText) for countyText in countyTexts]
+
+	def CountyName(self,countyId):
+		return self._names[countyId]
+
+	def IsKnown(self,countyId):													# Michigan county, or the default
+		return countyId < self._knownCt
+
+	#
+	# Methods (class public)
+	#
+	def Michigan():																# Index of Michigan counties, built on first use
+		if CountyIndex._michigan is None:
+			CountyIndex._michigan = CountyIndex(sorted(MichiganInfo.MICHIGAN_COUNTIES.keys()), AppSettings.glob().kmlStatusTemplateSpec())
+		return CountyIndex._michigan
+
+	#
+	# Getters
+	#
+	def countyCt(self):
+		return len(self._names)
+
+	def countyNames(self):
+		return self._names
@@ -39,10 +39,10 @@ class CountyStats(CumulativeStats):
 	_countyNameText					= None
 
 	# Constructor
-	def __init__(self,countyName=COUNTY_DEFAULT):
+	def __init__(self,countyName=COUNTY_DEFAULT,runConfig=None):
 		self._countyNameText = countyName
-		barfd("CountyStats.Constructor.entry(countyName={})".format(countyName))
-		super(CountyStats,self).__init__()												# Call base class constructor
+		barfd("CountyStats.Constructor.entry(countyName=%s)", countyName)
+		super(CountyStats,self).__init__(runConfig)										# Call base class constructor
 		self._SetDefaults()
 		self._countyName			= DataField(self.STAT_COUNTY,	DataField.DTYPE_TEXT,	'County',	countyName)
 
@@ -50,7 +50,7 @@ class CountyStats(CumulativeStats):
 	# Methods (private)
 	#
 	def _SetDefaults(self):
-		barft("CountyStats.SetDefaults.enter(countyName={})".format(self._countyNameText))
+		barft("CountyStats.SetDefaults.enter(countyName=%s)", self._countyNameText)
 		self._countyName			= DataField(self.STAT_COUNTY,	DataField.DTYPE_TEXT,	'County',	self.COUNTY_DEFAULT)
 		barft("CountyStats.SetDefaults.exit()")
 		return True
@@ -59,8 +59,8 @@ class CountyStats(CumulativeStats):
 		barft("CountyStats._SetFieldData.enter()")
 		super(CountyStats,self)._SetFieldData()
 		self._fieldData.append(self._countyName)
-		barft("CountyStats._SetFieldData.data({})".format(self._dataFieldsDumpsText()))
-		barft("CountyStats._SetFieldData.exit(fieldCount={})".format(len(self._fieldData)))
+		if barftOn(): barft("CountyStats._SetFieldData.data(%s)", self._dataFieldsDumpsText())
+		barft("CountyStats._SetFieldData.exit(fieldCount=%s)", len(self._fieldData))
 		return True
 
 	#
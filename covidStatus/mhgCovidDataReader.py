@@ -30,15 +30,25 @@ import os
 import os.path
 import re
 import sys
+from array import array
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 from datetime import timedelta
 
 # MHGLIB includes
 from mhgAppCommandArgs	import AppCommandArgs
-from mhgGoogleSheet 	import GoogleSheet,StatusRow
+from mhgGoogleSheet 	import GoogleSheet
+from mhgRowSource		import CubeRowSource
+from mhgRowSource		import DetailCsvRowSource
+from mhgRowSource		import DumpRowSource
+from mhgStatusRow		import StatusRow
 from mhgImpact			import Impact
+from mhgImpact			import ImpactTable
+from mhgObservation		import Observation
 from mhgCountyStats		import CountyStats
+from mhgDataCube		import DataCube
+from mhgGroupTally		import GroupTally
 from mhgStateStats		import StateStats
 from mhgUtility			import *
 
@@ -49,85 +59,171 @@ class CovidDataReader:
 
 	# Private data
 	_stateData				= None												# State Stats 
+	_windowData				= None												# State Stats of each report window (--windows)
 	_dailyCounts			= None												# Number of reports by day
-	_gshtSheet				= None												# Google sheet
+	_gshtSheet				= None												# Row source (Google sheet, by default)
+	_runConfig				= None												# Run configuration
 
 	#
 	# Constructor
 	#
-	def __init__(self):															# CovidDataReader Constructor
-		self._stateData				= StateStats('Michigan')					#	Initialize State Statistics
+	def __init__(self,rowSource=None,runConfig=None):							# CovidDataReader Constructor
+		self._runConfig				= activeRunConfig(runConfig)				#	Run configuration. None for the current one
+		self._stateData				= StateStats('Michigan',self._runConfig)	#	Initialize State Statistics
+		self._windowData			= None										#	Report window stats, tallied with state stats
 		self._dailyCounts			= {}										# 	Initialize daily report counts
-		_gshtSheet					= None										#	Initialize sheet object
+		self._gshtSheet				= rowSource									#	Initialize row source object. None picks one from command options
 
 	#
-	# Methods
+	# Methods (private)
 	#
-	def FetchCoronaData(self):													# Pull corona stats from Google spreadsheet
+	def _NewRowSource(self):													# Create row source selected by command options
+		if self._runConfig.rowSource() == AppCommandArgs.SOURCE_DETAIL:	return DetailCsvRowSource(self._runConfig)
+		if self._runConfig.rowSource() == AppCommandArgs.SOURCE_FILE:		return DumpRowSource(self._runConfig.sourceFile(),self._runConfig)
+		if self._runConfig.rowSource() == AppCommandArgs.SOURCE_CUBE:		return CubeRowSource(coalesce(self._runConfig.sourceFile(),AppSettings.glob().cubeSpec(self._runConfig.zombiesEnabled())),self._runConfig)
+		return GoogleSheet(self._runConfig)
 
-		_appOptions = AppSettings.glob().options()								# Get reference to application options
+	#
+	# Methods
+	#
+	def FetchCoronaData(self):													# Pull corona stats from row source (Google spreadsheet, by default)
 
-		barfd("CovidDataReader.FetchCoronaData().Enter(filterRange={})".format(_appOptions.filterRangeText()))
+		barfd("CovidDataReader.FetchCoronaData().Enter(filterRange=%s)", self._runConfig.filterRangeText())
 
 		# Initialize data
 		fetchStatus 				= False										# Method status
 		self._dailyCounts			= {}										# Initialize daily report counts
 
-		self._gshtSheet = GoogleSheet()											# Get a sheet object
+		if self._gshtSheet is None: self._gshtSheet = self._NewRowSource()		# Get a row source object
 		if self._gshtSheet.GetData():											# Fetch the data
 			if self._gshtSheet.rowMatchCt() == 0:								# Check that we got rows
 				shtRowCt = self._gshtSheet.rowCt()								# Whine and fail if no data matches date range
-				print("WARNING: {} rows read from sheet. No rows match date filter of {}".format(shtRowCt,_appOptions.filterRangeText()) )
+				barf("WARNING: %s rows read from %s. No rows match date filter of %s", shtRowCt,self._gshtSheet.sourceText(),self._runConfig.filterRangeText())
 			else:
 				self.TallyStats()												# Generate calculated fields
 				fetchStatus = True												# Indicate success
 
-		barfi("Fetch complete. {} records retrieved.".format(self._gshtSheet.rowMatchCt()))
+		barfi("Fetch complete. %s records retrieved.", self._gshtSheet.rowMatchCt())
 
 #		barfd("CovidDataReader.FetchCoronaData.countyStats:{})".format(countyStats['Kent']))
-		barfd("CovidDataReader.FetchCoronaData().Exit(rowCt={},goodCt={},matchCt={})".format( \
-				self._gshtSheet.rowCt(),self._gshtSheet.rowGoodCt(),self._gshtSheet.rowMatchCt()))
+		barfd("CovidDataReader.FetchCoronaData().Exit(rowCt=%s,goodCt=%s,matchCt=%s)", \
+				self._gshtSheet.rowCt(),self._gshtSheet.rowGoodCt(),self._gshtSheet.rowMatchCt())
 
 		return fetchStatus
 
+	def _TallyRows(self):														# Tally county stats a row at a time
+		rowBatch = self._gshtSheet.rowBatchFiltered()							# Columns of rows that match filter
+		countyIndex = self._stateData.countyIndex()
+		countyIds = countyIndex.CountyIds(rowBatch.countyNames())				# County id of each county code in batch, each distinct name looked up once
+		impactTable = ImpactTable.ForConfig(self._runConfig)					# Impact weights of whole columns
+		codeTexts = Observation.CodeTexts()
+		debugOn = barfdOn()														# Per row debug lines cost nothing when off
+		for countyCode,dateOrd,utilityWeight,servicesWeight,consumablesWeight,checkins2M,participate2M,checkinsHF,participateHF in zip( \
+				rowBatch.counties(), rowBatch.dates(), impactTable.WeightsFor(rowBatch.utilities(),codeTexts), \
+				impactTable.WeightsFor(rowBatch.services(),codeTexts), impactTable.WeightsFor(rowBatch.consumables(),codeTexts), \
+				rowBatch.checkins2M(), rowBatch.participate2M(), rowBatch.checkinsHF(), rowBatch.participateHF()):
+
+			countyId		= countyIds[countyCode]								# Get county id of observation report
+			intelDate		= Observation.DateYmd(dateOrd)
+			countyData		= self._stateData.countyDataById(countyId)
+
+			if debugOn: county = countyIndex.CountyName(countyId)
+			if debugOn: barfd("CovidDataReader.TallyRow.county=(%s.%s)", self._stateData.stateName(),county)
+			self._stateData.AddDailyCount(intelDate)							# Tally count of intel reports by date for state
+			countyData.AddDailyCount(intelDate)									# Tally count of intel reports by date for county
+
+			if debugOn and county == 'Kent':
+				barfd("CovidDataReader.TallyStats.maxtest1(util:%s,svc:%s,cons:%s,max:%s)", \
+							utilityWeight, servicesWeight, consumablesWeight, countyData.maxCode().value())
+
+			countyData.observationCount().AddValue(1)
+			countyData.utilityWeight().AddValue(utilityWeight)
+			countyData.servicesWeight().AddValue(servicesWeight)
+			countyData.consumablesWeight().AddValue(consumablesWeight)
+
+			countyData.AccumulateMaxScore(utilityWeight,servicesWeight,consumablesWeight)	# Single impact observation weight is same as score
+
+			countyData.checkins2M().AddValue(checkins2M)
+			countyData.participate2M().AddValue(participate2M)
+			countyData.checkinsHF().AddValue(checkinsHF)
+			countyData.participateHF().AddValue(participateHF)
+
+			if debugOn and county=='Kent':
+				barfd("CovidDataReader.TallyStats.maxtest2(util:%s,svc:%s,cons:%s,max:%s)", \
+							utilityWeight, servicesWeight, consumablesWeight, countyData.maxCode().value())
+
+	def _TallyBatch(self):														# Tally county stats by group-by over batch columns, a column at a time
+		rowBatch = self._gshtSheet.rowBatchFiltered()							# Columns of rows that match filter
+		countyIndex = self._stateData.countyIndex()
+		countyIds = countyIndex.CountyIds(rowBatch.countyNames())				# County id of each county code in batch
+		impactTable = ImpactTable.ForConfig(self._runConfig)
+		codeTexts = Observation.CodeTexts()
+
+		rowCountyIds		= array('I', map(countyIds.__getitem__, rowBatch.counties()))
+		countyTally			= GroupTally(rowCountyIds)
+		utilityWeights		= impactTable.WeightsFor(rowBatch.utilities(),codeTexts)
+		servicesWeights		= impactTable.WeightsFor(rowBatch.services(),codeTexts)
+		consumablesWeights	= impactTable.WeightsFor(rowBatch.consumables(),codeTexts)
+
+		utilitySums			= countyTally.Sums(utilityWeights)
+		servicesSums		= countyTally.Sums(servicesWeights)
+		consumablesSums		= countyTally.Sums(consumablesWeights)
+		utilityMaxes		= countyTally.Maxes(utilityWeights)					# Single impact observation weight is same as score
+		servicesMaxes		= countyTally.Maxes(servicesWeights)
+		consumablesMaxes	= countyTally.Maxes(consumablesWeights)
+		checkins2MSums		= countyTally.Sums(rowBatch.checkins2M())
+		participate2MSums	= countyTally.Sums(rowBatch.participate2M())
+		checkinsHFSums		= countyTally.Sums(rowBatch.checkinsHF())
+		participateHFSums	= countyTally.Sums(rowBatch.participateHF())
+
+		for dateOrd,dateCount in Counter(rowBatch.dates()).items():				# Tally count of intel reports by date for state
+			self._stateData.AddDailyCount(Observation.DateYmd(dateOrd),dateCount)
+
+		for countyId,observationCount in countyTally.counts().items():			# Counties in order of first report, as a row at a time tally adds them
+			countyData = self._stateData.countyDataById(countyId)
+			countyData.observationCount().AddValue(observationCount)
+			countyData.utilityWeight().AddValue(utilitySums[countyId])
+			countyData.servicesWeight().AddValue(servicesSums[countyId])
+			countyData.consumablesWeight().AddValue(consumablesSums[countyId])
+			countyData.AccumulateMaxScore(utilityMaxes[countyId],servicesMaxes[countyId],consumablesMaxes[countyId])
+			countyData.checkins2M().AddValue(checkins2MSums[countyId])
+			countyData.participate2M().AddValue(participate2MSums[countyId])
+			countyData.checkinsHF().AddValue(checkinsHFSums[countyId])
+			countyData.participateHF().AddValue(participateHFSums[countyId])
+			barfd("CovidDataReader.TallyCounty.county=(%s.%s,observations=%s)", self._stateData.stateName(),countyIndex.CountyName(countyId),observationCount)
+
+		for (countyId,dateOrd),dateCount in countyTally.PairCounts(rowBatch.dates()).items():	# Tally count of intel reports by date for county
+			self._stateData.countyDataById(countyId).AddDailyCount(Observation.DateYmd(dateOrd),dateCount)
+
+	def _TallyCube(self):														# Tally county stats of date range from a data cube of all rows. Returns the cube.
+		dataCube = self._gshtSheet.dataCube()									# Cube row source has one. Otherwise build one, and save it for --tally cube.
+		if dataCube is None:
+			dataCube = DataCube.FromRowBatch(self._gshtSheet.rowBatch(), self._stateData.countyIndex(), ImpactTable.ForConfig(self._runConfig), self._runConfig.zombiesEnabled())
+			if self._runConfig.tallyEngine() == AppCommandArgs.TALLY_CUBE:
+				if self._gshtSheet.hasAllRows():	dataCube.Save(AppSettings.glob().cubeSpec(self._runConfig.zombiesEnabled()))
+				else:								barf("WARNING: Data cube not saved. %s rows are only part of the history, and would replace a cube of all of it.", self._gshtSheet.sourceText())
+		dataCube.TallyWindow(self._stateData, self._runConfig.startDateOrd(), self._runConfig.endDateOrd())
+		return dataCube
+
+	def _TallyWindows(self,dataCube):											# Tally state stats of each report window from the cube, without another pass over rows
+		self._windowData = []
+		for windowConfig in self._runConfig.WindowConfigs():
+			windowData = StateStats(self._stateData.stateName(),windowConfig)
+			windowData.ClearCountyData()
+			dataCube.TallyWindow(windowData, windowConfig.startDateOrd(), windowConfig.endDateOrd())
+			self._windowData.append(windowData)
+			barfi("Window of %s days (%s) tallied.", windowConfig.nDays(), windowConfig.filterRangeText())
+
 	def TallyStats(self):
 
-		barfd("CovidDataReader.TallyStats.Enter()")
+		barfd("CovidDataReader.TallyStats.Enter(engine=%s)", coalesce(self._runConfig.tallyEngine(),AppCommandArgs.TALLY_BATCH))
 		self._stateData.ClearCountyData()
-		for stsRow in self._gshtSheet.statusRowsFiltered():						# Iterate StatusRow objects from list of rows that match filter
-
-			county = stsRow.county().value()									# Get county name of observation report
-
-			barfd("CovidDataReader.TallyRow.county=({}.{})".format(self._stateData.stateName(),county))
-			self._stateData.AddDailyCount(stsRow.intelDate().value())						# Tally count of intel reports by date for state
-			self._stateData.countyData(county).AddDailyCount(stsRow.intelDate().value())	# Tally count of intel reports by date for county
-
-			if county == 'Kent':
-				barfd("CovidDataReader.TallyStats.maxtest1(util:{},svc:{},cons:{},max:{})".format( \
-							Impact.WeightFromCode(stsRow.utilities().value()), \
-							Impact.WeightFromCode(stsRow.services().value()),	\
-							Impact.WeightFromCode(stsRow.consumables().value()), \
-							self._stateData.countyData(county).maxCode().value()))
-
-			self._stateData.countyData(county).observationCount().AddValue(1)
-			self._stateData.countyData(county).utilityWeight().AddValue(Impact.WeightFromCode(stsRow.utilities().value()))
-			self._stateData.countyData(county).servicesWeight().AddValue(Impact.WeightFromCode(stsRow.services().value()))
-			self._stateData.countyData(county).consumablesWeight().AddValue(Impact.WeightFromCode(stsRow.consumables().value()))
-
-			self._stateData.countyData(county).AccumulateMaxScore(Impact.WeightFromCode(stsRow.utilities().value()),				# Single impact observation weight is same as score
-																	Impact.WeightFromCode(stsRow.services().value()),	
-																	Impact.WeightFromCode(stsRow.consumables().value()))
-
-			self._stateData.countyData(county).checkins2M().AddValue(stsRow.checkins2M().value())
-			self._stateData.countyData(county).participate2M().AddValue(stsRow.participate2M().value())
-			self._stateData.countyData(county).checkinsHF().AddValue(stsRow.checkinsHF().value())
-			self._stateData.countyData(county).participateHF().AddValue(stsRow.participateHF().value())
-
-			if county=='Kent':
-				barfd("CovidDataReader.TallyStats.maxtest2(util:{},svc:{},cons:{},max:{})".format( \
-							Impact.WeightFromCode(stsRow.utilities().value()), Impact.WeightFromCode(stsRow.services().value()), Impact.WeightFromCode(stsRow.consumables().value()), \
-							self._stateData.countyData(county).maxCode().value()))
-
+		self._windowData = None
+		if self._runConfig.tallyEngine() == AppCommandArgs.TALLY_CUBE or not self._gshtSheet.dataCube() is None or not self._runConfig.windows() is None:
+			dataCube = self._TallyCube()
+			if not self._runConfig.windows() is None: self._TallyWindows(dataCube)
+		elif self._runConfig.tallyEngine() == AppCommandArgs.TALLY_ROWS:	self._TallyRows()
+		else:															self._TallyBatch()
 		barfd("CovidDataReader.TallyStats.Exit()")
 		
 	def Close(self):															# Clean up resources
@@ -142,9 +238,16 @@ class CovidDataReader:
 	def stateData(self):
 		return 	self._stateData
 
+	def windowData(self):														# State stats of each report window (--windows). Just the state stats, otherwise.
+		if self._windowData is None: return [self._stateData]
+		return self._windowData
+
 	def covidSheet(self):
 		return self._gshtSheet
 
+	def runConfig(self):
+		return self._runConfig
+
 	#
 	#  Setters
 	#
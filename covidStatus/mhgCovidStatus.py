@@ -27,7 +27,9 @@
 # Usage:
 #
 #    mhgCovidStatus.py [-h] [--start START] [--end END] [--ndays [NDAYS]] [--nodetail] [--nosummary]
-#                         [--noproject] [--nopdf] [--noimage] [--info] [--debug] [--zombies]
+#                         [--noproject] [--nopdf] [--noimage] [--info] [--debug] [--zombies] [--refresh]
+#                         [--source {sheet,detail,file,cube}] [--sourcefile SOURCEFILE] [--unformatted]
+#                         [--tally {batch,rows,cube}] [--windows WINDOWS]
 #
 #     === MHG Covid Status Report ===
 #
@@ -44,6 +46,16 @@
 #       --info           Whether to barf progress info
 #       --debug          Whether to barf debug info
 #       --zombies        Whether to enable zombies
+#       --refresh        Refetch sheet data, ignoring cached snapshot
+#       --source {sheet,detail,file,cube}
+#                        Where to read observation rows from
+#       --sourcefile SOURCEFILE
+#                        CSV or JSON dump of sheet rows, for --source file. Cube file, for --source cube.
+#       --unformatted    Fetch sheet values unformatted, with dates as serial numbers
+#       --tally {batch,rows,cube}
+#                        How to tally county stats. Output is the same either way.
+#       --windows WINDOWS
+#                        Report windows, as days ending on end date (e.g. 1,7,30). One fetch, reports for each.
 #
 #     Note:
 #             dates may be entered mm/dd, mm/dd/yyyy or yyyy.mm.dd
@@ -82,6 +94,7 @@ import gc
 from mhgAppSettings		import AppSettings
 from mhgCovidDataReader	import CovidDataReader
 from mhgDetailWriter	import DetailWriter
+from mhgRejectsWriter	import RejectsWriter
 from mhgSummaryWriter   import SummaryWriter
 from mhgKmlWriter		import KmlWriter
 from mhgGisWriter		import GisWriter
@@ -106,7 +119,7 @@ def appExit(err=None):
 	#	statusCode = err.errorNumber()
 	#	statusText = " Status={}".format(statusCode)
 
-	print ("####\n#### {} complete.  Status={}\n####".format(AppSettings.PROGNM,statusCode))
+	barf("####\n#### %s complete.  Status=%s\n####", AppSettings.PROGNM,statusCode)
 
 	sys.exit(statusCode)
 
@@ -117,17 +130,17 @@ def appExit(err=None):
 """
 def main():
 
-	# Get Application settings (environment info and command args). Retain a reference to command arg options for convenience
+	# Get Application settings (environment info and command args). Retain a reference to the run configuration built from them
 	try:
-		_appOptions = AppSettings.glob().options()
+		runConfig = AppSettings.glob().runConfig()
 	except (CommandArgError, EnvironmentError) as err:
 		appExit(err)
 
 	# App Start
-	print ("####\n#### {} starting.\n####".format(AppSettings.PROGNM))
+	barf("####\n#### %s starting.\n####", AppSettings.PROGNM)
 
 	# Get Corona data from spreadsheet
-	dataReader = CovidDataReader()
+	dataReader = CovidDataReader(runConfig=runConfig)
 	fetchOk = dataReader.FetchCoronaData()
 	if not fetchOk: 
 		appExit(UserError('No records retrieved from sheet.',AppError.ERR_FETCHFAIL))
@@ -135,13 +148,16 @@ def main():
 	# Generate Output CSVs and KML from County stats
 	try:
 		# Write Detail
-		if _appOptions.captureDetail(): DetailWriter().WriteStatusRows(dataReader.covidSheet().statusRowsFiltered())
-		
-		# Write Summary
-		if _appOptions.generateSummary(): SummaryWriter().WriteStateCountyStats(dataReader.stateData())
+		if runConfig.captureDetail() and not dataReader.covidSheet().replaysDetail():
+			DetailWriter(runConfig).WriteRowBatch(dataReader.covidSheet().rowBatchFiltered())
 
-		# Write KML
-		KmlWriter().WriteStateCountyStats(dataReader.stateData())
+		# Write Rejects
+		if runConfig.captureDetail(): RejectsWriter(runConfig).WriteRejects(dataReader.covidSheet().rowValidator())
+		
+		# Write Summary and KML of each report window (--windows), or of the date range
+		for windowData in dataReader.windowData():
+			if runConfig.generateSummary(): SummaryWriter().WriteStateCountyStats(windowData)
+			KmlWriter().WriteStateCountyStats(windowData)
 
 	except EnvironmentError as err:
 		appExit(err)
@@ -153,11 +169,13 @@ def main():
 	# Remojinate generated KML into QGIS Project, then barf to PDF and JPG
 	try:
 		
-		gisWriter = GisWriter()														# Fire up GIS Writer
-		gisWriter.GenerateProject()													# Create a GIS project base on generated KML
-		if _appOptions.generateProject(): 	gisWriter.SaveProject()					# Save project, if needed.
-		if _appOptions.generatePdf(): 		gisWriter.GeneratePdf()					# Write to PDF, if needed.
-		if _appOptions.generateImage(): 	gisWriter.GenerateImage()				# Write to JPG image, if needed.
+		gisWriter = GisWriter(runConfig)														# Fire up GIS Writer, once for all report windows
+		for windowConfig in runConfig.WindowConfigs():
+			gisWriter.SetRunConfig(windowConfig)										# Report window (--windows), or the date range
+			gisWriter.GenerateProject()													# Create a GIS project base on generated KML
+			if runConfig.generateProject(): 	gisWriter.SaveProject()					# Save project, if needed.
+			if runConfig.generatePdf(): 		gisWriter.GeneratePdf()					# Write to PDF, if needed.
+			if runConfig.generateImage(): 		gisWriter.GenerateImage()				# Write to JPG image, if needed.
 		gisWriter.Cleanup()															# Shut down GIS Writer
 		gisWriter = None
 
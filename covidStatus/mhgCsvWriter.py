@@ -56,7 +56,7 @@ class CsvWriter(object):										# Base class for CSV writing
 	# Methods (public)
 	# 
 	def Write(self,text):										# Write text to CSV
-		barfd("CsvWriter.Write({})".format(text))
+		barfd("CsvWriter.Write(%s)", text)
 		self._fhCsv.write(text + '\n')
 		return True
 
@@ -18,7 +18,6 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
-import copy
 import sys
 
 # MHGLIB includes
@@ -39,8 +38,8 @@ class CumulativeStats(ObservationStats):
 	#
 	# Constructor
 	#
-	def __init__(self):
-		super(CumulativeStats,self).__init__()								# Call base class constructor
+	def __init__(self,runConfig=None):
+		super(CumulativeStats,self).__init__(runConfig)						# Call base class constructor
 		self._SetCumulativeDefaults()
 
 	#
@@ -62,10 +61,12 @@ class CumulativeStats(ObservationStats):
 	# Methods (public)
 	#
 	def AccumulateMaxScore(self,*values):									# Keep track of maximum score encountered
-		barft("CumulativeStats.AccumulateMaxScore.enter(maxScore={},values={})".format(self._maxScore.value(),values))
+		barft("CumulativeStats.AccumulateMaxScore.enter(maxScore=%s,values=%s)", self._maxScore.value(),values)
 		score = max(self._maxScore.value(), max(values))
-		self._maxScore				= DataField(self.STAT_MAX_SCORE,	DataField.DTYPE_NUMERIC,	'MaxScore',	 score)
-		barft("CumulativeStats.AccumulateMaxScore.newMaxScore={}".format(self._maxScore.value()))
+		if score != self._maxScore.value():
+			self._maxScore			= DataField(self.STAT_MAX_SCORE,	DataField.DTYPE_NUMERIC,	'MaxScore',	 score)
+			self._Invalidate()												# Max code derives from max score
+		barft("CumulativeStats.AccumulateMaxScore.newMaxScore=%s", self._maxScore.value())
 		barft("CumulativeStats.AccumulateMaxScore.exit()")
 		return self.maxScore()
 
@@ -80,4 +81,4 @@ class CumulativeStats(ObservationStats):
 		return self._dailyCounts
 
 	def maxScore(self):														# Override Max Score to accumulate max, rather than have max(avg score)
-		return copy.deepcopy(self._maxScore)
+		return self._maxScore
@@ -0,0 +1,288 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgDataCube.py
+#
+# Description
+#
+#   County x day x metric data cube of observation tallies. Built once from the columns of a
+#   row batch of all valid rows, it lets the county stats of any date window be derived
+#   without touching rows again:
+#
+#       observations, impact weight sums and radio counters   prefix sums along the day axis,
+#                                                              so a window total is two lookups
+#       max impact weight, first row of county                per day, scanned over the window
+#
+#   The cube is held as a flat int64 array laid out (county, metric, day slot), so the days of
+#   a county metric are contiguous. Day slot 0 is empty, slot n+1 holds day n (prefix sums
+#   run through the end of the day). It is saved as a .npy file (written by hand, numpy isn't
+#   needed) with a JSON sidecar naming the counties and first day, and is loaded back through
+#   a read-only memory map.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import ast
+import json
+import mmap
+import os
+import os.path
+import struct
+import sys
+from array				import array
+from itertools			import accumulate
+
+# MHGLIB includes
+from mhgException		import EnvironmentError
+from mhgGroupTally		import GroupTally
+from mhgObservation		import Observation
+from mhgUtility			import *
+
+class DataCube(object):
+
+	# Metrics (public)
+	METRIC_OBSERVATIONS		= 0													# Prefix sums
+	METRIC_UTILITY			= 1
+	METRIC_SERVICES			= 2
+	METRIC_CONSUMABLES		= 3
+	METRIC_CHECKINS_2M		= 4
+	METRIC_PARTICIPATE_2M	= 5
+	METRIC_CHECKINS_HF		= 6
+	METRIC_PARTICIPATE_HF	= 7
+	METRIC_MAX_WEIGHT		= 8													# Per day
+	METRIC_FIRST_ROW		= 9													# Per day. Row index + 1 of first report, 0 if none.
+	METRIC_NAMES			= ( 'Observations', 'UtilityWeight', 'ServicesWeight', 'ConsumablesWeight', 'Checkins2M', 'Participate2M',
+								'CheckinsHF', 'ParticipateHF', 'MaxWeight', 'FirstRow' )
+	METRIC_CT				= len(METRIC_NAMES)
+	SUM_METRICS				= range(METRIC_OBSERVATIONS, METRIC_MAX_WEIGHT)
+
+	# Constants (private)
+	_TYPE_CELL				= 'q'												# int64 cell
+	_NPY_DESCR				= '<i8'
+	_NPY_MAGIC				= b'\x93NUMPY'
+	_NPY_ALIGN				= 64												# Data offset alignment of .npy files
+
+	# Properties (private)
+	_cells					= None												# Flat cells, (county, metric, day slot). array, or memoryview of a mapped file.
+	_countyNames			= None												# County name of each county slot
+	_firstDayOrd			= None												# Day ordinal of day slot 1
+	_dayCt					= 0
+	_rowCt					= 0													# Rows the cube was built from
+	_zombiesEnabled			= False												# Zombie mode of impact weights
+	_fhMapped				= None												# File and map behind cells, when loaded
+	_mapped					= None
+
+	#
+	# Constructor
+	#
+	def __init__(self,countyNames,firstDayOrd,dayCt,rowCt=0,zombiesEnabled=False,cells=None):
+		self._countyNames		= list(countyNames)
+		self._firstDayOrd		= firstDayOrd
+		self._dayCt				= dayCt
+		self._rowCt				= rowCt
+		self._zombiesEnabled	= zombiesEnabled
+		self._cells				= cells
+		if self._cells is None: self._cells = array(self._TYPE_CELL, bytes(8 * len(self._countyNames) * self.METRIC_CT * (self._dayCt + 1)))
+
+	#
+	# Methods (private)
+	#
+	def _Row(self,countySlot,metric):											# Offset of day slot 0 of a county metric
+		return (countySlot * self.METRIC_CT + metric) * (self._dayCt + 1)
+
+	def _Slots(self,startOrd,endOrd):											# Day slot range (first, last) of a date window, clipped to the cube. None if no overlap.
+		firstSlot	= max(startOrd - self._firstDayOrd, 0) + 1
+		lastSlot	= min(endOrd - self._firstDayOrd, self._dayCt - 1) + 1
+		if firstSlot > lastSlot: return None
+		return firstSlot, lastSlot
+
+	def _SidecarSpec(cubeSpec):
+		return os.path.splitext(cubeSpec)[0] + '.json'
+
+	#
+	# Methods (public)
+	#
+	def WindowSum(self,countySlot,metric,slots):								# Total of a prefix summed metric over day slots
+		rowOffset = self._Row(countySlot,metric)
+		return self._cells[rowOffset + slots[1]] - self._cells[rowOffset + slots[0] - 1]
+
+	def WindowDays(self,countySlot,metric,slots):								# Per day values of a metric over day slots
+		rowOffset = self._Row(countySlot,metric)
+		if metric in self.SUM_METRICS:
+			dayValues = self._cells[rowOffset + slots[0] - 1 : rowOffset + slots[1] + 1]
+			return [nextValue - prevValue for prevValue,nextValue in zip(dayValues, dayValues[1:])]
+		return self._cells[rowOffset + slots[0] : rowOffset + slots[1] + 1]
+
+	def ObservationCt(self,startOrd,endOrd):									# Observations in a date window, all counties
+		slots = self._Slots(startOrd,endOrd)
+		if slots is None: return 0
+		return sum(self.WindowSum(countySlot, self.METRIC_OBSERVATIONS, slots) for countySlot in range(len(self._countyNames)))
+
+	def TallyWindow(self,stateData,startOrd,endOrd):							# Tally county stats of a date window into StateStats, as a row tally of the window would
+		slots = self._Slots(startOrd,endOrd)
+		if slots is None: return True
+		countyIndex	= stateData.countyIndex()
+		firstRows	= {}
+		for countySlot in range(len(self._countyNames)):							# Counties with reports in window, by first report
+			firstRow = min(filter(None, self.WindowDays(countySlot, self.METRIC_FIRST_ROW, slots)), default=0)
+			if firstRow: firstRows[countySlot] = firstRow
+
+		for countySlot in sorted(firstRows, key=firstRows.__getitem__):
+			countyData = stateData.countyDataById(countyIndex.CountyId(self._countyNames[countySlot]))
+			countyData.observationCount().AddValue(self.WindowSum(countySlot, self.METRIC_OBSERVATIONS, slots))
+			countyData.utilityWeight().AddValue(self.WindowSum(countySlot, self.METRIC_UTILITY, slots))
+			countyData.servicesWeight().AddValue(self.WindowSum(countySlot, self.METRIC_SERVICES, slots))
+			countyData.consumablesWeight().AddValue(self.WindowSum(countySlot, self.METRIC_CONSUMABLES, slots))
+			countyData.AccumulateMaxScore(max(self.WindowDays(countySlot, self.METRIC_MAX_WEIGHT, slots)))
+			countyData.checkins2M().AddValue(self.WindowSum(countySlot, self.METRIC_CHECKINS_2M, slots))
+			countyData.participate2M().AddValue(self.WindowSum(countySlot, self.METRIC_PARTICIPATE_2M, slots))
+			countyData.checkinsHF().AddValue(self.WindowSum(countySlot, self.METRIC_CHECKINS_HF, slots))
+			countyData.participateHF().AddValue(self.WindowSum(countySlot, self.METRIC_PARTICIPATE_HF, slots))
+			for daySlot,dateCount in enumerate(self.WindowDays(countySlot, self.METRIC_OBSERVATIONS, slots), slots[0]):
+				if dateCount == 0: continue
+				dateYmd = Observation.DateYmd(self._firstDayOrd + daySlot - 1)
+				countyData.AddDailyCount(dateYmd,dateCount)
+				stateData.AddDailyCount(dateYmd,dateCount)
+
+		barfd("DataCube.TallyWindow(days=%s..%s,counties=%s)", slots[0], slots[1], len(firstRows))
+		return True
+
+	def Save(self,cubeSpec):													# Write cube as .npy, with JSON sidecar of axis labels
+		shapeText	= "({}, {}, {})".format(len(self._countyNames), self.METRIC_CT, self._dayCt + 1)
+		headerText	= "{{'descr': '{}', 'fortran_order': False, 'shape': {}, }}".format(self._NPY_DESCR, shapeText)
+		headerLen	= len(self._NPY_MAGIC) + 4 + len(headerText) + 1
+		headerText	+= ' ' * (-headerLen % self._NPY_ALIGN) + '\n'
+		cells		= array(self._TYPE_CELL, self._cells)
+		if sys.byteorder == 'big': cells.byteswap()
+		with open(cubeSpec, 'wb') as fhCube:
+			fhCube.write(self._NPY_MAGIC + bytes((1, 0)) + struct.pack('<H', len(headerText)) + headerText.encode('latin1'))
+			cells.tofile(fhCube)
+		with open(DataCube._SidecarSpec(cubeSpec), 'w') as fhSidecar:
+			json.dump({ 'counties': self._countyNames, 'firstDay': Observation.DateYmd(self._firstDayOrd), 'days': self._dayCt,
+						'metrics': self.METRIC_NAMES, 'rows': self._rowCt, 'zombies': self._zombiesEnabled }, fhSidecar, indent=1)
+		barfi("Data cube saved. %s counties x %s days.", len(self._countyNames), self._dayCt)
+		return True
+
+	def Close(self):															# Release memory map of a loaded cube
+		if not self._mapped is None:
+			self._cells.release()
+			self._mapped.close()
+			self._fhMapped.close()
+		self._cells		= None
+		self._mapped	= None
+		self._fhMapped	= None
+		return True
+
+	#
+	# Methods (class public)
+	#
+	def FromRowBatch(rowBatch,countyIndex,impactTable,zombiesEnabled=False):	# Cube of all rows of a batch
+		countyNames	= rowBatch.countyNames()
+		dates		= rowBatch.dates()
+		if rowBatch.rowCt() == 0: return DataCube([], 0, 0, zombiesEnabled=zombiesEnabled)
+
+		firstDayOrd	= min(dates)
+		dayCt		= max(dates) - firstDayOrd + 1
+		countyIds	= countyIndex.CountyIds(countyNames)							# County slots are county ids of the batch, in order of county code
+		slotIds		= sorted(set(countyIds))
+		countySlots	= { countyId: countySlot for countySlot,countyId in enumerate(slotIds) }
+		codeSlots	= [countySlots[countyId] for countyId in countyIds]
+		dataCube	= DataCube([countyIndex.CountyName(countyId) for countyId in slotIds], firstDayOrd, dayCt, rowBatch.rowCt(), zombiesEnabled)
+
+		slotDays	= dayCt + 1
+		groupKeys	= array('I', [codeSlots[countyCode] * slotDays + dateOrd - firstDayOrd + 1 for countyCode,dateOrd in zip(rowBatch.counties(), dates)])
+		cellTally	= GroupTally(groupKeys)										# Group of each (county slot, day slot)
+		codeTexts	= Observation.CodeTexts()
+		weights		= [ impactTable.WeightsFor(rowBatch.utilities(),codeTexts), impactTable.WeightsFor(rowBatch.services(),codeTexts),
+						impactTable.WeightsFor(rowBatch.consumables(),codeTexts) ]
+
+		metricTallies = [ (DataCube.METRIC_OBSERVATIONS,	cellTally.counts()),
+						  (DataCube.METRIC_UTILITY,			cellTally.Sums(weights[0])),
+						  (DataCube.METRIC_SERVICES,		cellTally.Sums(weights[1])),
+						  (DataCube.METRIC_CONSUMABLES,		cellTally.Sums(weights[2])),
+						  (DataCube.METRIC_CHECKINS_2M,		cellTally.Sums(rowBatch.checkins2M())),
+						  (DataCube.METRIC_PARTICIPATE_2M,	cellTally.Sums(rowBatch.participate2M())),
+						  (DataCube.METRIC_CHECKINS_HF,		cellTally.Sums(rowBatch.checkinsHF())),
+						  (DataCube.METRIC_PARTICIPATE_HF,	cellTally.Sums(rowBatch.participateHF())),
+						  (DataCube.METRIC_MAX_WEIGHT,		cellTally.Maxes(map(max, *weights))),
+						  (DataCube.METRIC_FIRST_ROW,		{ groupKey: rowIdx + 1 for rowIdx,groupKey in reversed(list(enumerate(groupKeys))) }) ]
+
+		cells = dataCube._cells
+		for metric,groupValues in metricTallies:
+			for groupKey,groupValue in groupValues.items():
+				countySlot,daySlot = divmod(groupKey, slotDays)
+				cells[dataCube._Row(countySlot,metric) + daySlot] = groupValue
+
+		for countySlot in range(len(slotIds)):									# Prefix sums along days
+			for metric in DataCube.SUM_METRICS:
+				rowOffset = dataCube._Row(countySlot,metric)
+				cells[rowOffset : rowOffset + slotDays] = array(DataCube._TYPE_CELL, accumulate(cells[rowOffset : rowOffset + slotDays]))
+
+		barfd("DataCube.FromRowBatch(rows=%s,counties=%s,days=%s)", rowBatch.rowCt(), len(slotIds), dayCt)
+		return dataCube
+
+	def Load(cubeSpec):															# Cube saved by Save, memory mapped read-only
+		sidecarSpec = DataCube._SidecarSpec(cubeSpec)
+		if not os.path.isfile(cubeSpec) or not os.path.isfile(sidecarSpec):
+			raise EnvironmentError("ERROR: Data cube not found ({})".format(cubeSpec))
+		with open(sidecarSpec, 'r') as fhSidecar:
+			sidecar = json.load(fhSidecar)
+
+		fhCube = open(cubeSpec, 'rb')
+		npyMagic = fhCube.read(len(DataCube._NPY_MAGIC) + 2)
+		if npyMagic[:-2] != DataCube._NPY_MAGIC:
+			fhCube.close()
+			raise EnvironmentError("ERROR: Not a .npy file ({})".format(cubeSpec))
+		if npyMagic[-2] == 1:	headerLen = struct.unpack('<H', fhCube.read(2))[0]
+		else:					headerLen = struct.unpack('<I', fhCube.read(4))[0]
+		header = ast.literal_eval(fhCube.read(headerLen).decode('latin1'))
+		dataOffset = fhCube.tell()
+		countyCt,dayCt = len(sidecar['counties']), sidecar['days']
+		if header['descr'] != DataCube._NPY_DESCR or header['fortran_order'] or tuple(header['shape']) != (countyCt, DataCube.METRIC_CT, dayCt + 1):
+			fhCube.close()
+			raise EnvironmentError("ERROR: Data cube doesn't match its sidecar ({})".format(cubeSpec))
+
+		cellCt = countyCt * DataCube.METRIC_CT * (dayCt + 1)
+		if cellCt == 0:
+			fhCube.close()
+			return DataCube(sidecar['counties'], Observation.DateOrd(sidecar['firstDay']), dayCt, sidecar['rows'], sidecar['zombies'])
+		mapped = mmap.mmap(fhCube.fileno(), 0, access=mmap.ACCESS_READ)
+		if sys.byteorder == 'big':													# Cells are little endian. Big endian hosts get a swapped copy.
+			cells = array(DataCube._TYPE_CELL)
+			cells.frombytes(mapped[dataOffset : dataOffset + 8 * cellCt])
+			cells.byteswap()
+			mapped.close()
+			fhCube.close()
+			return DataCube(sidecar['counties'], Observation.DateOrd(sidecar['firstDay']), dayCt, sidecar['rows'], sidecar['zombies'], cells)
+		cells = memoryview(mapped)[dataOffset : dataOffset + 8 * cellCt].cast(DataCube._TYPE_CELL)
+		dataCube = DataCube(sidecar['counties'], Observation.DateOrd(sidecar['firstDay']), dayCt, sidecar['rows'], sidecar['zombies'], cells)
+		dataCube._fhMapped	= fhCube
+		dataCube._mapped	= mapped
+		barfd("DataCube.Load(file=%s,counties=%s,days=%s)", cubeSpec, countyCt, dayCt)
+		return dataCube
+
+	#
+	# Getters
+	#
+	def countyNames(self):														# County name of each county slot
+		return self._countyNames
+
+	def firstDayOrd(self):
+		return self._firstDayOrd
+
+	def dayCt(self):
+		return self._dayCt
+
+	def rowCt(self):															# Rows the cube was built from
+		return self._rowCt
+
+	def zombiesEnabled(self):													# Zombie mode of the impact weights
+		return self._zombiesEnabled
@@ -4,7 +4,8 @@
 #
 # Description
 #
-#   Class for Data Fields from CSVs and Spreadsheets
+#   Class for Data Fields from CSVs and Spreadsheets. Field values are immutable scalars (text,
+#   numbers, None), so getters and setters pass them by reference rather than copying.
 #
 # Copyright
 #
@@ -18,7 +19,6 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
-import copy
 import sys
 
 class DataField(object):
@@ -35,6 +35,7 @@ class DataField(object):
 	_field_value		= None									# Field value holder
 	_column_number		= None									# Field Column Number
 	_source_id			= None									# Field Source ID
+	_change_listener	= None									# Called with no args when value changes, if set
 
 	# Constructor
 	def __init__(self,fldid=None,dtype=DTYPE_TEXT,header="",value=None,colNo=None,srcid=None):
@@ -50,27 +51,28 @@ class DataField(object):
 	#
 	def AddValue(self,value):									# Add a value to this field's value
 		self._field_value = self._field_value + value
+		if not self._change_listener is None: self._change_listener()
 		
 	#
 	# Property getters (public)
 	#
 	def fieldId(self):
-		return copy.deepcopy(self._field_id)
+		return self._field_id
 
 	def dataType(self):
-		return copy.deepcopy(self._field_dtype)
+		return self._field_dtype
 
 	def headerText(self):
-		return copy.deepcopy(self._field_header_text)
+		return self._field_header_text
 
 	def sourceId(self):
-		return copy.deepcopy(self._source_id)
+		return self._source_id
 
 	def columnNo(self):
-		return copy.deepcopy(self._column_number)
+		return self._column_number
 
 	def value(self):
-		return copy.deepcopy(self._field_value)
+		return self._field_value
 	
 	#
 	# Properties (static)
@@ -82,19 +84,23 @@ class DataField(object):
 	# Property setters (public)
 	#
 	def SetFieldId(self,id):
-		self._field_id = copy.deepcopy(id)
+		self._field_id = id
 
 	def SetDataType(self,dtype):
-		self._field_dtype = copy.deepcopy(dtype)
+		self._field_dtype = dtype
 
 	def SetHeaderText(self,headerText):
-		self._field_header_text = copy.deepcopy(headerText)
+		self._field_header_text = headerText
 
 	def SetSourceId(self,srcId):
-		self._source_id = copy.deepcopy(srcId)
+		self._source_id = srcId
 
 	def SetColumnNo(self,colNo):
-		self._column_number = copy.deepcopy(colNo)
+		self._column_number = colNo
 
 	def SetValue(self,value):
-		self._field_value = copy.deepcopy(value)
+		self._field_value = value
+		if not self._change_listener is None: self._change_listener()
+
+	def SetChangeListener(self,listener):						# Listener for value changes (e.g. to drop values derived from this one). None for none.
+		self._change_listener = listener
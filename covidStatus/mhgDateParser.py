@@ -28,6 +28,7 @@
 # ---------------------------------------------------------------------------------------------------
 
 # Python includes
+from collections import OrderedDict
 from datetime import datetime
 import re
 import sys
@@ -63,30 +64,92 @@ class DateParseResult(object):
 
 class DateParser(object):
 
+	# Constants (private)
+	_SERIAL_EPOCH_DAYS	= 25569															# Spreadsheet serial day number of 1970.01.01 (serial day 0 is 1899.12.30)
+	_PARSE_MEMO_SIZE	= 4096															# Most recently parsed date strings kept
+	_PATTERN_MMDD		= re.compile('^[0-9]+/[0-9]+$')									# mm/dd
+	_PATTERN_YMD_DASH	= re.compile('^[0-9]{4}[-][0-9]+[-][0-9]+$')					# yyyy-mm-dd
+	_PATTERN_YMD_SLASH	= re.compile('^[0-9]{4}[/][0-9]+[/][0-9]+$')					# yyyy/mm/dd
+	_PATTERN_YMD_DOT	= re.compile('^[0-9]{4}[.][0-9]+[.][0-9]+$')					# yyyy.mm.dd
+
+	# Properties (private)
+	_serialYmdMemo		= {}															# Serial day number -> yyyy.mm.dd, shared by all parsers
+	_parseMemo			= OrderedDict()													# Date string -> DateParseResult, least recently used first, shared by all parsers
+
 	# Constructor
 	def __init__(self):
 		pass
 		
 	#
-	# Methods (public)
+	# Methods (private)
 	#
-	def ParseDate(self,dateString):														# Parse a date string into a timestamp
-		dateTS = None
-		
-		dateTS	= self.TestDatePattern('^[0-9]+/[0-9]+$', dateString, '%Y/%m/%d', "{}/{}".format(datetime.now().strftime("%Y"),dateString))	#	mm/dd format
-		if dateTS is None: dateTS	= self.TestDatePattern('^[0-9]{4}[-][0-9]+[-][0-9]+$', dateString, '%Y-%m-%d', dateString)				#	yyyy-mm-dd
-		if dateTS is None: dateTS	= self.TestDatePattern('^[0-9]{4}[/][0-9]+[/][0-9]+$', dateString, '%Y/%m/%d', dateString)				#	yyyy/mm/dd
-		if dateTS is None: dateTS	= self.TestDatePattern('^[0-9]{4}[.][0-9]+[.][0-9]+$', dateString, '%Y.%m.%d', dateString)				#	yyyy.mm.dd
+	def _SplitYmd(self,dateString):														# Fast path for yyyy.mm.dd. None if string isn't in that form.
+		dateParts = dateString.split('.')
+		if len(dateParts) != 3 or len(dateParts[0]) != 4 or not 1 <= len(dateParts[1]) <= 2 or not 1 <= len(dateParts[2]) <= 2: return None
+		if not (dateString.isascii() and dateParts[0].isdigit() and dateParts[1].isdigit() and dateParts[2].isdigit()): return None
+		return datetime(int(dateParts[0]), int(dateParts[1]), int(dateParts[2]))				# Bad day or month raises ValueError, as strptime does
 
-		parseResult = DateParseResult(dateTS)
+	def _ParseUncached(self,dateString):
+		dateTS	= None
+		if '.' in dateString: dateTS = self._SplitYmd(dateString)
+		if dateTS is None: dateTS	= self.TestDatePattern(self._PATTERN_MMDD, dateString, '%Y/%m/%d', "{}/{}".format(datetime.now().strftime("%Y"),dateString))	#	mm/dd format
+		if dateTS is None: dateTS	= self.TestDatePattern(self._PATTERN_YMD_DASH, dateString, '%Y-%m-%d', dateString)		#	yyyy-mm-dd
+		if dateTS is None: dateTS	= self.TestDatePattern(self._PATTERN_YMD_SLASH, dateString, '%Y/%m/%d', dateString)		#	yyyy/mm/dd
+		if dateTS is None: dateTS	= self.TestDatePattern(self._PATTERN_YMD_DOT, dateString, '%Y.%m.%d', dateString)		#	yyyy.mm.dd
+		return DateParseResult(dateTS)
+
+	#
+	# Methods (public)
+	#
+	def ParseDate(self,dateString):														# Parse a date string into a timestamp. Results are kept in a bounded LRU memo.
+		parseMemo = DateParser._parseMemo
+		parseResult = parseMemo.get(dateString)
+		if parseResult is None:
+			parseResult = self._ParseUncached(dateString)
+			parseMemo[dateString] = parseResult
+			if len(parseMemo) > self._PARSE_MEMO_SIZE: parseMemo.popitem(last=False)
+		else:
+			parseMemo.move_to_end(dateString)
 
 		return parseResult
 
-	def TestDatePattern(self,regex,parseString,strptimeFormat,strptimeString=''):		# Test a date string for pattern match, and parse to timestamp on match
+	def ParseMany(self,dateStrings):													# Parse a column of date strings, as a list of results. Each distinct string is parsed once.
+		columnResults = {}
+		parseResults = []
+		for dateString in dateStrings:
+			parseResult = columnResults.get(dateString)
+			if parseResult is None:
+				parseResult = self.ParseDate(dateString)
+				columnResults[dateString] = parseResult
+			parseResults.append(parseResult)
+		return parseResults
+
+	def TestDatePattern(self,regex,parseString,strptimeFormat,strptimeString=''):		# Test a date string for pattern match, and parse to timestamp on match. Regex may be compiled.
 		if strptimeString == '': strptimeString = parseString
 		dateTS = None																		
-		pattern = re.compile(regex)
+		pattern = regex if hasattr(regex,'match') else re.compile(regex)
 		if pattern.match(parseString):
 			dateTS = datetime.strptime(strptimeString, strptimeFormat)
 			
 		return dateTS
+
+	#
+	# Methods (class public)
+	#
+	def SerialDateYMD(serialDays):														# Spreadsheet serial date number (SERIAL_NUMBER render) to yyyy.mm.dd, by integer arithmetic
+		serialDay = int(serialDays)															# Drop time of day fraction
+		dateYMD = DateParser._serialYmdMemo.get(serialDay)
+		if dateYMD is None:
+			# Civil date from days since 1970.01.01, counted in 400 year eras starting on March 1st
+			epochDays	= serialDay - DateParser._SERIAL_EPOCH_DAYS + 719468
+			eraNo		= (epochDays if epochDays >= 0 else epochDays - 146096) // 146097
+			eraDay		= epochDays - eraNo * 146097										# [0, 146096]
+			eraYear		= (eraDay - eraDay//1460 + eraDay//36524 - eraDay//146096) // 365	# [0, 399]
+			yearDay		= eraDay - (365*eraYear + eraYear//4 - eraYear//100)				# [0, 365], from March 1st
+			monthIdx	= (5*yearDay + 2) // 153											# [0, 11], March = 0
+			dayNo		= yearDay - (153*monthIdx + 2)//5 + 1
+			monthNo		= monthIdx + 3 if monthIdx < 10 else monthIdx - 9
+			yearNo		= eraYear + eraNo * 400 + (1 if monthNo <= 2 else 0)
+			dateYMD		= "{:04d}.{:02d}.{:02d}".format(yearNo,monthNo,dayNo)
+			DateParser._serialYmdMemo[serialDay] = dateYMD
+		return dateYMD
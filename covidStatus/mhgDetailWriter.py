@@ -31,6 +31,7 @@ import sys
 from mhgAppCommandArgs		import AppCommandArgs
 from mhgCsvWriter			import CsvWriter
 from mhgDataField			import DataField
+from mhgStatusRow			import StatusRow
 from mhgUtility				import *
 
 
@@ -38,52 +39,54 @@ class DetailWriter(CsvWriter):												# Summary CSV Writer
 
 	# Properties (private)
 	_detailDateYmd						= None								# Date of current open CSV file
+	_runConfig							= None								# Run configuration (date range)
 
 	# Constructor
-	def __init__(self):
+	def __init__(self,runConfig=None):
 		_detailDateYmd					= None								# Initialize date of current open CSV file
+		self._runConfig					= activeRunConfig(runConfig)		# Run configuration. None for the current one
 
 	#
 	# Methods (public)
 	# 
 	def CleanUp(self):														# Delete any existing output CSV files for date range being run
 		barfd("DetailWriter.CleanUp().enter()")
-		detailStartTS = AppSettings.glob().options().startDateTS()
+		detailStartTS = self._runConfig.startDateTS()
 		detailDateTS = detailStartTS
 		deltaOneDay = timedelta(days=1)
 
-		for dayNo in range(AppSettings.glob().options().nDays()):
-			barfd("DetailWriter.Cleanup(cleanLoop.dayNo={})".format(dayNo))
+		for dayNo in range(self._runConfig.nDays()):
+			barfd("DetailWriter.Cleanup(cleanLoop.dayNo=%s)", dayNo)
 			detailDateYmd = detailDateTS.strftime(AppSettings.FORMAT_YMD)
 			self.SetFileSpec( AppSettings.glob().detailCsvTemplate().replace(AppSettings.TEMPLATE_DATE_TOKEN,detailDateYmd) )
-			barfd("DetailWriter.Cleanup(dayNo={},date={},file={})".format(dayNo,detailDateYmd,self.fileSpec()))
+			barfd("DetailWriter.Cleanup(dayNo=%s,date=%s,file=%s)", dayNo,detailDateYmd,self.fileSpec())
 			if os.path.isfile(self.fileSpec()):
-				barfd("DetailWriter.Cleanup(deleteFile={})".format(self.fileSpec()))
+				barfd("DetailWriter.Cleanup(deleteFile=%s)", self.fileSpec())
 				os.remove(self.fileSpec())
 			detailDateTS = detailDateTS + deltaOneDay
 		barfd("DetailWriter.CleanUp().exit()")
 		return True
 
 	def Close(self):														# Close Detail CSV
-		barfd("DetailWriter.Close(date={})".format(self._detailDateYmd))
+		barfd("DetailWriter.Close(date=%s)", self._detailDateYmd)
 		super(DetailWriter, self).Close()
 		self._detailDateYmd = None
 		return True
 
 	def Open(self,statRow):													# Open Detail CSV for output
-		if not self._fhCsv is None and statRow.intelDate().value() != self._detailDateYmd:
+		if not self._fhCsv is None and statRow.intelDateYmd() != self._detailDateYmd:
 			self.Close()
 
 		if self._fhCsv is None:
-			self.SetFileSpec( AppSettings.glob().detailCsvTemplate().replace(AppSettings.TEMPLATE_DATE_TOKEN,statRow.intelDate().value()) )
+			self.SetFileSpec( AppSettings.glob().detailCsvTemplate().replace(AppSettings.TEMPLATE_DATE_TOKEN,statRow.intelDateYmd()) )
 			isNew = not os.path.isfile(self.fileSpec())
-			barfd("DetailWriter.Open(isNew={},file={})".format(isNew,self.fileSpec()))
+			barfd("DetailWriter.Open(isNew=%s,file=%s)", isNew,self.fileSpec())
 			self._fhCsv = open(self.fileSpec(), 'a')
 			if self._fhCsv is None:
 				raise EnvironmentError("Can't open output Detail CSV ({})".format(self.fileSpec()))
 			if isNew: self.WriteHeader(statRow)
 
-		self._detailDateYmd = statRow.intelDate().value()
+		self._detailDateYmd = statRow.intelDateYmd()
 		return True
 
 	def WriteHeader(self,statRow):											# Write Detail CSV header
@@ -110,3 +113,27 @@ class DetailWriter(CsvWriter):												# Summary CSV Writer
 			self.WriteRow(stsRow)	
 		self.Close()
 		return True
+
+	def WriteRowBatch(self,rowBatch):										# Take columnar batch of rows and barf to CSVs, without a record per row
+		self.CleanUp()
+		columnInfos = [StatusRow._GSHT_METADATA[columnId] for columnId in range(StatusRow._GSHT_COMMENTS)]
+		headerLine = ''.join([self._csvText(columnInfo[StatusRow._COL_HEADER], DataField.DTYPE_TEXT) for columnInfo in columnInfos])
+		dataTypes = [columnInfo[StatusRow._COL_DTYPE] for columnInfo in columnInfos]
+
+		for rowValues in rowBatch.DetailRows():
+			intelDateYmd = rowValues[StatusRow._GSHT_DATE]
+			if not self._fhCsv is None and intelDateYmd != self._detailDateYmd:
+				self.Close()
+			if self._fhCsv is None:
+				self.SetFileSpec( AppSettings.glob().detailCsvTemplate().replace(AppSettings.TEMPLATE_DATE_TOKEN,intelDateYmd) )
+				isNew = not os.path.isfile(self.fileSpec())
+				barfd("DetailWriter.WriteRowBatch(isNew=%s,file=%s)", isNew,self.fileSpec())
+				self._fhCsv = open(self.fileSpec(), 'a')
+				if self._fhCsv is None:
+					raise EnvironmentError("Can't open output Detail CSV ({})".format(self.fileSpec()))
+				if isNew: self.Write(headerLine)
+			self._detailDateYmd = intelDateYmd
+			self.Write(''.join(map(self._csvText, rowValues, dataTypes)))
+
+		if not self._fhCsv is None: self.Close()
+		return True
@@ -129,11 +129,13 @@ class GisWriter():
 	_legendSymbolFont	= None														# Legend Symbols Font
 	_legendLabelFont	= None														# Legend Labels Font
 	_labelingFont		= None														# Labeling Font (Counties)
+	_runConfig			= None														# Run configuration (date range, zombie mode)
 
 	#
 	# Constructor
 	#
-	def __init__(self):																# Constructor
+	def __init__(self,runConfig=None):												# Constructor
+		self._runConfig = activeRunConfig(runConfig)								#    Run configuration. None for the current one
 		self._InitializeFonts()														#    Initialize fonts
 		self._InitializeQgis()														#    Initialize QGIS
 
@@ -142,15 +144,15 @@ class GisWriter():
 	#
 	def reportDateText(self):														# Generate report date text string.
 		textDate = ''
-		if 1 == AppSettings.glob().options().nDays():
-			textDate = AppSettings.glob().options().endDateTS().strftime(self._reportDateFormat1)
-		elif 7 == AppSettings.glob().options().nDays():
-			textDate = AppSettings.glob().options().endDateTS().strftime(self._reportDateFormatW)
-		elif 1 == AppSettings.glob().options().startDateTS().day and isBetween(AppSettings.glob().options().nDays(),28,31):
-			textDate = AppSettings.glob().options().endDateTS().strftime(self._reportDateFormatM)
+		if 1 == self._runConfig.nDays():
+			textDate = self._runConfig.endDateTS().strftime(self._reportDateFormat1)
+		elif 7 == self._runConfig.nDays():
+			textDate = self._runConfig.endDateTS().strftime(self._reportDateFormatW)
+		elif 1 == self._runConfig.startDateTS().day and isBetween(self._runConfig.nDays(),28,31):
+			textDate = self._runConfig.endDateTS().strftime(self._reportDateFormatM)
 		else:
-			startText = AppSettings.glob().options().startDateTS().strftime(self._reportDateFormat2)
-			endText = AppSettings.glob().options().endDateTS().strftime(self._reportDateFormat2)
+			startText = self._runConfig.startDateTS().strftime(self._reportDateFormat2)
+			endText = self._runConfig.endDateTS().strftime(self._reportDateFormat2)
 			textDate = "{} to {}".format(startText,endText)
 		return textDate
 
@@ -172,13 +174,13 @@ class GisWriter():
 
 	def _InitializeQgis(self):														# Initialize QGIS
 		barfd("GisWriter._InitializeQgis.enter()")
-		barfd("GisWriter._InitializeQgis.env(qgisPythonFolder={})".format(AppSettings.glob().qgisPythonFolder()))
-		barfd("GisWriter._InitializeQgis.env(qgisBinFolder={})".format(AppSettings.glob().qgisBinFolder()))
+		barfd("GisWriter._InitializeQgis.env(qgisPythonFolder=%s)", AppSettings.glob().qgisPythonFolder())
+		barfd("GisWriter._InitializeQgis.env(qgisBinFolder=%s)", AppSettings.glob().qgisBinFolder())
 
 		sys.path.append(AppSettings.glob().qgisPythonFolder())						#    Add QGIS Python plugins to search path
 
 		barfd("####PATH#####")
-		barfd("InitializeQgis.path={})".format('\n'.join(sys.path)))
+		barfd("InitializeQgis.path=%s)", '\n'.join(sys.path))
 		barfd("####PATH#####")
 
 		QgsApplication.setPrefixPath(AppSettings.glob().qgisBinFolder(), True)		#    Define QGIS Install point
@@ -196,19 +198,20 @@ class GisWriter():
 	def _NewGisProject(self):														# Create GIS Project
 		barfd("GisWriter._NewGisProject.enter()")									#
 		self._project = QgsProject.instance()										#     Instance a GIS project
+		self._project.clear()														#     Empty it of any earlier report window's layers
 		if self._USE_GUI:															#     If not headless, create an interface bridge
 			bridge = QgsLayerTreeMapCanvasBridge( self._project.layerTreeRoot(), iface.mapCanvas())
 		barfd("GisWriter._NewGisProject.exit()")
 		return True
 
 	def _LoadKmlLayer(self):														# Load Status KML as a vector layer and display
-		statusKml = AppSettings.glob().statusKmlSpec()								#    Get file spec of KML to load
-		barfd("GisWriter._LoadKmlLayer.enter(statusKml={})".format(statusKml))		#
+		statusKml = AppSettings.glob().statusKmlSpec(self._runConfig)				#    Get file spec of KML to load
+		barfd("GisWriter._LoadKmlLayer.enter(statusKml=%s)", statusKml)		#
 		if self._USE_GUI:
 			self._statusLayer = \
 				iface.addVectorLayer(statusKml, self._layerTitle, "ogr")
 		else:
-			barfd("GisWriter._LoadKmlLayer.Load(file={})".format(statusKml))
+			barfd("GisWriter._LoadKmlLayer.Load(file=%s)", statusKml)
 			self._statusLayer = QgsVectorLayer(statusKml, self._layerTitle, "ogr")
 			barfd("GisWriter._LoadKmlLayer.AddLayer()")
 			self._project.addMapLayer(self._statusLayer)
@@ -252,22 +255,22 @@ class GisWriter():
 	def _DebugDumpLayerFields(self):
 		barfd("GisWriter._DebugDumpLayerFields.FIELDS-begin-#####")
 		fields = self._statusLayer.fields()
-		barfd("GisWriter._DebugDumpLayerFields.FIELDS=\n{}".format(fields.names()))
+		barfd("GisWriter._DebugDumpLayerFields.FIELDS=\n%s", fields.names())
 		barfd("GisWriter._DebugDumpLayerFields.FIELDS-end-#####")
 		return True
 	
 	def _LayerSetCategories(self):																		# Define Status _statusCategories and set up Symbol Rendering
 		barfd("GisWriter._LayerSetCategories.Enter()")	
 		fni = self._statusLayer.fields().indexFromName(self._KDATA_KEYFIELD)							#     Get index number of KML field to use as basis for categorization
-		barfd("GisWriter._LayerSetCategories(KEYFIELD={},index={})".format(self._KDATA_KEYFIELD,fni))
+		barfd("GisWriter._LayerSetCategories(KEYFIELD=%s,index=%s)", self._KDATA_KEYFIELD,fni)
 
-		if AppSettings.glob().options().debugEnabled(): self._DebugDumpLayerFields()
+		if self._runConfig.debugEnabled(): self._DebugDumpLayerFields()
 
 		self._statusCategories = []																		#    Initialize a list of categories
 		self._AddSymbolCategory('A', 'All Available',   Colors.COLOR_GREEN,  self._statusCategories)	#        Add statuses...
 		self._AddSymbolCategory('M', 'Moderate Impact', Colors.COLOR_YELLOW, self._statusCategories)
 		self._AddSymbolCategory('S', 'Severe Impact',   Colors.COLOR_RED,    self._statusCategories)
-		if AppSettings.glob().options().zombiesEnabled():
+		if self._runConfig.zombiesEnabled():
 			self._AddSymbolCategory('Z', 'Zombies Oubreak', Colors.COLOR_BLACK,   self._statusCategories)
 
 		self._AddSymbolCategory('', 'Unknown Impact',  Colors.COLOR_GREY, self._statusCategories)		#    ... use blank status to handle 'U' status as well as any other code
@@ -394,7 +397,7 @@ class GisWriter():
 	#  
 	def GenerateProject(self):															# Create GIS project from Status KML
 		barfd("GisWriter.GenerateProject.Enter()")
-		status_project = AppSettings.glob().gisProjectSpec()
+		status_project = AppSettings.glob().gisProjectSpec(self._runConfig)
 		self._CreateProject()
 		self._GuiRefresh()
 		barfd("GisWriter.GenerateProject.Exit()")
@@ -402,13 +405,13 @@ class GisWriter():
 		
 	def SaveProject(self):																# Save GIS project
 		barfd("GisWriter.GenerateProject.Enter()")
-		self._project.write(AppSettings.glob().gisProjectSpec())
+		self._project.write(AppSettings.glob().gisProjectSpec(self._runConfig))
 		barfd("GisWriter.GenerateProject.Exit()")
 		return True
 
 	def GeneratePdf(self):																# Barf to PDF
 		barfd("GisWriter.GeneratePdf.Enter()")
-		status_pdf = AppSettings.glob().gisPdfSpec()
+		status_pdf = AppSettings.glob().gisPdfSpec(self._runConfig)
 		exporter = QgsLayoutExporter(self._statusPrintLayout)
 		exporter.exportToPdf(status_pdf, QgsLayoutExporter.PdfExportSettings())
 		barf("Exported to PDF. File=\"{}\"".format(status_pdf))
@@ -418,7 +421,7 @@ class GisWriter():
 	def GenerateImage(self):															# Barf to JPG Image
 		barfd("GisWriter.GenerateImage.Enter()")
 		
-		statusImage = AppSettings.glob().gisImageSpec()
+		statusImage = AppSettings.glob().gisImageSpec(self._runConfig)
 		exporter = QgsLayoutExporter(self._statusPrintLayout)
 		settings = QgsLayoutExporter.ImageExportSettings()
 		settings.dpi      = 300
@@ -428,6 +431,10 @@ class GisWriter():
 		barfd("GisWriter.GenerateImage.Exit()")
 		return True
 		
+	def SetRunConfig(self,runConfig):													# Point writer at another run configuration (report window). QGIS keeps running.
+		self._runConfig = activeRunConfig(runConfig)
+		return True
+
 	def	Cleanup(self):
 		barfd("GisWriter.Cleanup.Enter()")
 		self._qgisEngine.exitQgis()														# remove provider and layer registries from memory
@@ -27,71 +27,139 @@
 
 # Python includes
 from __future__			import print_function
+import json
 import os
 import os.path
 from pathlib			import Path
+from datetime			import datetime
+from datetime			import timedelta
 
 # Google includes
 import pickle
 from googleapiclient.discovery 		import build
+from googleapiclient.discovery 		import build_from_document
 from google_auth_oauthlib.flow		import InstalledAppFlow
 from google.auth.transport.requests	import Request
+from google.auth.credentials		import AnonymousCredentials
 
 # MHGLIB Includes
 from mhgAppSettings		import AppSettings
+from mhgRequestScheduler	import RequestScheduler
 from mhgUtility			import *
 
 #
 #  GoogleGoo    Google Service Connection Class
 #
+#  Credentials and service objects are held by the class, so every GoogleGoo (and GoogleSheet) in
+#  the process shares one login. Service discovery documents are cached in the data folder, and
+#  credentials are refreshed only when they are close to expiring.
+#
+#  When MHGGIS_GOOGLE_ENDPOINT is set, services are pointed at that endpoint (e.g. the local
+#  mhgSheetStandIn server) with anonymous credentials, and no login is done.
+#
 class GoogleGoo:
 
 	# Connection Constants (private)
-	_SCOPES 					= ['https://www.googleapis.com/auth/spreadsheets.readonly']	# If modifying scope(s), delete the file token.pickle.
+	_SCOPES 					= ['https://www.googleapis.com/auth/spreadsheets.readonly',	# If modifying scope(s), delete the file token.pickle.
+									'https://www.googleapis.com/auth/drive.metadata.readonly']	# Drive metadata is read to revalidate cached sheet snapshots
+	_REFRESH_MARGIN				= timedelta(minutes=5)										# Refresh access token when this close to expiry
 
-	# Spreadsheet data (private)
+	# Spreadsheet data (private, shared by all instances)
+	_credentials				= None														# Google API credentials
 	_service					= None														# Google sheet service object
+	_driveService				= None														# Google drive service object (file metadata)
+	_scheduler					= None														# Request scheduler (quota pacing, retry) for all Google requests
 
 	# Constructor
 	def __init__(self):
 		pass
 
 	#
-	# Methods
+	# Methods (private)
 	#
-	def Login(self):
-
-		# Goo Security
-		gooPickleSpec		  	= AppSettings.glob().googlePickleSpec()						# Google API pickle file
-		gooCredentialsSpec		= AppSettings.glob().googleCredentialsSpec()				# Google API credentials file
-
-		# Security File Specs
-
-		# Get pickle (session token) figured out.
+	def _LoadCredentials(self):													# Get pickle (session token) figured out.
 		# The file token.pickle stores the user's access and refresh tokens, and is
 		# created automatically when the authorization flow completes for the first
 		# time.
+		if not AppSettings.glob().googleEndpoint() is None: return AnonymousCredentials()	# Stand-in endpoint takes anything
+		gooPickleSpec = AppSettings.glob().googlePickleSpec()					# Google API pickle file
 		creds = None
 		if os.path.exists(gooPickleSpec):
 			with open(gooPickleSpec, 'rb') as token:
 				creds = pickle.load(token)
-		# If there are no (valid) credentials available, let the user log in.
-		if not creds or not creds.valid:
-			if creds and creds.expired and creds.refresh_token:
-				creds.refresh(Request())
-			else:
-				flow = InstalledAppFlow.from_client_secrets_file(gooCredentialsSpec, GoogleGoo._SCOPES)
-				creds = flow.run_local_server(port=0)
-			# Save the credentials for the next run
-			with open(gooPickleSpec, 'wb') as token:
-				pickle.dump(creds, token)
+		# Token from before a scope was added can't be refreshed into the new scope. Log in again.
+		if creds and not creds.has_scopes(GoogleGoo._SCOPES):
+			creds = None
+		return creds
+
+	def _SaveCredentials(self,creds):											# Save the credentials for the next run
+		with open(AppSettings.glob().googlePickleSpec(), 'wb') as token:
+			pickle.dump(creds, token)
+		return True
+
+	def _NearExpiry(self,creds):												# Whether access token is expired, or about to be
+		if creds.expiry is None: return not creds.valid
+		return creds.expiry - datetime.utcnow() < GoogleGoo._REFRESH_MARGIN
+
+	def _FreshCredentials(self,creds):											# Refresh credentials near expiry. If there are no (valid) credentials available, let the user log in.
+		if isinstance(creds,AnonymousCredentials): return creds					# Nothing to refresh
+		if creds and creds.refresh_token and self._NearExpiry(creds):
+			barfd("GoogleGoo._FreshCredentials(refresh,expiry=%s)", creds.expiry)
+			creds.refresh(Request())											# Refreshed in place, so services built on creds pick it up
+			self._SaveCredentials(creds)
+		elif not creds or not creds.valid:
+			gooCredentialsSpec = AppSettings.glob().googleCredentialsSpec()		# Google API credentials file
+			flow = InstalledAppFlow.from_client_secrets_file(gooCredentialsSpec, GoogleGoo._SCOPES)
+			creds = flow.run_local_server(port=0)
+			self._SaveCredentials(creds)
+		return creds
+
+	def _BuildService(self,apiName,apiVersion):									# Build a service from cached discovery document, caching it on first build
+		discoverySpec = AppSettings.glob().googleDiscoveryTemplate().replace(AppSettings.TEMPLATE_KEY_TOKEN,"{}-{}".format(apiName,apiVersion))
+		clientOptions = None
+		if not AppSettings.glob().googleEndpoint() is None: clientOptions = { 'api_endpoint': AppSettings.glob().googleEndpoint() }
+		if os.path.isfile(discoverySpec):
+			with open(discoverySpec, 'r') as fhDiscovery:
+				discoveryDoc = fhDiscovery.read()
+			barfd("GoogleGoo._BuildService(api=%s.%s,discovery=%s)", apiName,apiVersion,discoverySpec)
+			return build_from_document(discoveryDoc, credentials=GoogleGoo._credentials, client_options=clientOptions)
+
+		service = build(apiName, apiVersion, credentials=GoogleGoo._credentials, client_options=clientOptions)
+		rootDesc = getattr(service, '_rootDesc', None)							# Discovery document the service was built from
+		if not rootDesc is None:
+			with open(discoverySpec, 'w') as fhDiscovery:
+				json.dump(rootDesc, fhDiscovery)
+			barfd("GoogleGoo._BuildService(api=%s.%s,cached=%s)", apiName,apiVersion,discoverySpec)
+		return service
+
+	#
+	# Methods
+	#
+	def Login(self):															# Log in, reusing this process's credentials and service when still good
+		creds = GoogleGoo._credentials
+		if creds is None: creds = self._LoadCredentials()
+		freshCreds = self._FreshCredentials(creds)
+
+		if not freshCreds is GoogleGoo._credentials:							# New login. Services built on old credentials are no good
+			GoogleGoo._credentials	= freshCreds
+			GoogleGoo._service		= None
+			GoogleGoo._driveService	= None
 
 		# Connect to Google Sheets service
-		self._service = build('sheets', 'v4', credentials=creds)
-		return self._service
+		if GoogleGoo._service is None: GoogleGoo._service = self._BuildService('sheets', 'v4')
+		return GoogleGoo._service
 
 	#
 	# Getters
 	#
 	def Service(self):
-		return self._service
+		return GoogleGoo._service
+
+	def Scheduler():															# Process request scheduler. (class public)
+		if GoogleGoo._scheduler is None: GoogleGoo._scheduler = RequestScheduler()
+		return GoogleGoo._scheduler
+
+	def DriveService(self):														# Drive service, built on first use with the sheet login credentials
+		if GoogleGoo._driveService is None and not GoogleGoo._credentials is None:
+			GoogleGoo._driveService = self._BuildService('drive', 'v3')
+		return GoogleGoo._driveService
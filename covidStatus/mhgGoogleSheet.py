@@ -34,259 +34,241 @@
 import copy
 import os
 import os.path
+import re
 from pathlib 			import Path
 
+# Google includes
+from googleapiclient.errors			import HttpError
+
 # MHGLIB includes
 from mhgAppSettings		import AppSettings
-from mhgDataField   	import DataField
-from mhgDateParser   	import DateParser
+from mhgException	  	import AppError
 from mhgException	  	import EnvironmentError
 from mhgGoogleGoo   	import GoogleGoo
+from mhgRowSource		import RowSource
+from mhgSheetCache		import SheetCache
+from mhgSheetIndex		import SheetIndex
+from mhgStatusRow		import StatusRow
 from mhgUtility			import *
 
 #
 # Google Spreadsheet
 #
-class GoogleSheet():
+class GoogleSheet(RowSource):
 
 	#
 	# Properties (private)
 	#
+	_sourceText						= 'spreadsheet'								# Description of source for messages
+	_goo							= None										# Google service connection
 	_sheetService					= None										# Sheet Service on a shingle
-	_gshtRows						= None										# List of sheet data rows
-	_gshtStatusRows					= None										# List of sheet data rows converted to RowData objects.
-	_gshtStatusRowsFiltered			= None										# List of sheet data rows converted to RowData objects and matching date range
 	_spreadsheet_id					= None										# Google spreadsheet identifier string
 	_spreadsheet_range				= None										# Range to pull
-	_rowCt							= 0											# Count of rows read from sheet
-	_rowGoodCt						= 0											# Count of valid rows read from sheet
-	_rowMatchCt						= 0											# Count of valid rows read from sheet matching filter
-	
+	_spreadsheet_ranges				= None										# Ranges to pull, one per tab. More than one are pulled in a single batch.
+	_renderOptions					= None										# Value render options for values requests
+	_isIndexSpan					= False										# Whether rows fetched are only an index span of the sheet
+
+	# Constants (private)
+	_RANGE_PATTERN					= re.compile('^(.+)!([A-Z]+)([0-9]+):([A-Z]+)$')	# Open ended range, e.g. DailyData!A2:K
+	_RANGE_START_PATTERN			= re.compile('![A-Z]+([0-9]*)')					# First cell of a range, e.g. !A2 of DailyData!A2:K
+	_RENDER_FORMATTED				= {}										# Display strings (API default)
+	_RENDER_UNFORMATTED				= { 'valueRenderOption':		'UNFORMATTED_VALUE',	# Numbers as numbers, dates as serial day numbers
+										'dateTimeRenderOption':		'SERIAL_NUMBER' }
+
 	#
 	# Constructor
 	#
-	def __init__(self):
+	def __init__(self,runConfig=None):
 		self._spreadsheet_id		= AppSettings.glob().covidSheetID()
-		self._spreadsheet_range		= AppSettings.glob().covidSheetDataRange()
-		self._InitData()
+		self._spreadsheet_ranges	= AppSettings.glob().covidSheetDataRanges()
+		self._spreadsheet_range		= self._spreadsheet_ranges[0]
+		self._renderOptions			= self._RENDER_FORMATTED
+		super(GoogleSheet,self).__init__(runConfig)
+		if self._runConfig.unformattedValues(): self._renderOptions = self._RENDER_UNFORMATTED
 
 	#
 	# Methods (private)
 	#
 	def _InitData(self):
+		super(GoogleSheet,self)._InitData()
 		self._sheetService				= None									# Initialize Google sheet service object
-		self._gshtRows					= []									# Initialize list of raw sheet rows
-		self._gshtStatusRows			= []									# Initialize list of sheet Status Rows
-		self._gshtStatusRowsFiltered	= []									# Initialize list of sheet Status Rows filtered by date
-		self._rowCt						= 0										# Count of rows read from sheet
-		self._rowGoodCt					= 0										# Count of valid rows read from sheet
-		self._rowMatchCt				= 0										# Count of valid rows read from sheet matching filter
+		self._isIndexSpan				= False
 
 	def _Login(self):
-		self._sheetService = GoogleGoo().Login()
+		self._goo = GoogleGoo()
+		self._sheetService = self._goo.Login()
 		if self._sheetService is None:
 			raise EnvironmentError("Google Sheets login failed.",AppError.ERR_LOGINFAIL)
 		return self._sheetService
 
-	#
-	# Methods (public)
-	#
-	def GetData(self):
-		success = True
-		barfd("GoogleSheet.GetData.enter()")
-		
-		appOptions = AppSettings.glob().options()									# Get convenience reference to app command options
-	
-		self._InitData()															# Initialize data
-		self._Login()																# Log in to Google sheets service
-		sheet = self._sheetService.spreadsheets()									# Get reference to the source spreadsheet
-		result = sheet.values().get( 												# Query the sheet for the cell range having
-								spreadsheetId=self._spreadsheet_id,					#    the data we want, and retrieve result...
-								range=self._spreadsheet_range).execute()			#
-		self._gshtRows = result.get('values', [])									#    ... convert result to a list of rows of data
-		if not self._gshtRows:														# Puke if no data returned
-			raise EnvironmentError("ERROR: No spreadsheet data found at all.")		#
-
-		for sheetRow in self._gshtRows:												# Generate list of StatusRows and filtered StatusRows
-			self._rowCt += 1														# Increment row counter
-			if self._rowCt <= 5: barfd("row({}): {}".format(self._rowCt,sheetRow))
-			statusRow = StatusRow(sheetRow)											# Convert sheet raw data to a StatusRow
-			#if self._rowCt <= 2: statusRow.DumpFields()
-			validateMessage = ""													# Validate data in the row,
-			if not statusRow.isValidRow(self._rowCt):								#     report bad data if info reporting is enabled
-				barfi(statusRow.validateMessage())									#     and ignore row
-			else:																	#
-				self._rowGoodCt += 1												# Increment good row counter
-				self._gshtStatusRows.append(StatusRow(sheetRow))					# Add valid rows to StausRows list
-				if statusRow.isFilterMatchRow():									# If row matches filter,
-					self._gshtStatusRowsFiltered.append(StatusRow(sheetRow))		#   add to StatusRowsFiltered list
-					self._rowMatchCt += 1											#     and increment match row counter
-
-		barfd("GoogleSheet.GetData.exit(rowsCt={},goodCt={},matchCt={})".format(	self._rowCt, self._rowGoodCt, self._rowMatchCt ))
-		
-		return success
-		
-	def Close(self):
-		barfd("GoogleSheet.Close.enter()")
-		self._gshtRows					= None										# Clean up Google objects to close HTTPS connection
-		self._gshtStatusRows			= None										# 
-		self._gshtStatusRowsFiltered	= None										# 
-		self._sheetService				= None										# 
-		barfd("GoogleSheet.Close.exit()")
-		return True
-
-	#
-	# Properties (public)
-	#
-	def rawRows(self):															# Sheet rows, as returned from google service
-		return self._gshtRows
-
-	def statusRows(self):														# Sheet rows as list of Status Row objects
-		return self._gshtStatusRows
-
-	def statusRowsFiltered(self):												# Sheet rows filtered by date, as list of Status Row objects
-		return self._gshtStatusRowsFiltered
-		
-	def rowCt(self):
-		return copy.deepcopy(self._rowCt)
-		
-	def rowGoodCt(self):
-		return copy.deepcopy(self._rowGoodCt)
-		
-	def rowMatchCt(self):
-		return copy.deepcopy(self._rowMatchCt)
-		
-#
-# Status Row
-#	A row from the spreadsheet with data typing and validation functionality
-#
-class StatusRow():
-
-	# ColInfo hash
-	_COL_DTYPE				= 'dType'
-	_COL_HEADER				= 'header'
-
-	# Google Covid Data (input) metadata 
-	_GSHT_DATE				= 0
-	_GSHT_SITE				= 1
-	_GSHT_COUNTY			= 2
-	_GSHT_UTILITIES			= 3
-	_GSHT_SERVICES			= 4
-	_GSHT_CONSUMABLES		= 5
-	_GSHT_2M_CHECKINS		= 6
-	_GSHT_2M_PARTICIPATE	= 7
-	_GSHT_HF_CHECKINS		= 8
-	_GSHT_HF_PARTICIPATE	= 9
-	_GSHT_COMMENTS			= 10
-	_GSHT_METADATA			= { \
-			_GSHT_DATE:				{ _COL_DTYPE: DataField.DTYPE_DATE,		_COL_HEADER: 'IntelDate'			},
-			_GSHT_SITE:				{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'Site' 				},
-			_GSHT_COUNTY:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'County'				},
-			_GSHT_UTILITIES:		{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'UtilityImpact'		},
-			_GSHT_SERVICES:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'ServicesImpact'		},
-			_GSHT_CONSUMABLES:		{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'ConsumablesImpact'	},
-			_GSHT_2M_CHECKINS:		{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: '2M Checkins'			},
-			_GSHT_2M_PARTICIPATE:	{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: '2M Participate'		},
-			_GSHT_HF_CHECKINS:		{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: 'HF Checkins'			},
-			_GSHT_HF_PARTICIPATE:	{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: 'HF Participate'		},
-			_GSHT_COMMENTS:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'Comments'				}   }
-
-	# Properties (private)
-	_rowData				= None
-	_fieldData				= []
-	_validateMessage		= ""
-
-	#
-	# Constructor
-	#
-	def __init__(self,sheetRow):
-		self._rowData = sheetRow
-		self._SetFieldData()
-
-	#
-	# Methods (private)
-	#
-	def _SetFieldData(self):
-		self._fieldData = []
-		self._fieldData.append(self.intelDate())
-		self._fieldData.append(self.site())
-		self._fieldData.append(self.county())
-		self._fieldData.append(self.utilities())
-		self._fieldData.append(self.services())
-		self._fieldData.append(self.consumables())
-		self._fieldData.append(self.checkins2M())
-		self._fieldData.append(self.participate2M())
-		self._fieldData.append(self.checkinsHF())
-		self._fieldData.append(self.participateHF())
-
-	def _StatusField(self,columnId):
-		fieldValue = ''
-		if columnId < len(self._rowData):	fieldValue = self._rowData[columnId]
-		if self._GSHT_METADATA[columnId][self._COL_DTYPE] == DataField.DTYPE_NUMERIC: fieldValue = nullz(fieldValue)
-		if self._GSHT_METADATA[columnId][self._COL_DTYPE] == DataField.DTYPE_DATE: 	fieldValue = DateParser().ParseDate(fieldValue).dateYMD()
-		return DataField( columnId, self._GSHT_METADATA[columnId][self._COL_DTYPE],  self._GSHT_METADATA[columnId][self._COL_HEADER], fieldValue );
+	def _SheetRevision(self):													# Get sheet modified time and revision (one metadata call). (None,None) if unavailable.
+		modifiedTime = None
+		version = None
+		try:
+			fileMeta = GoogleGoo.Scheduler().Execute(self._goo.DriveService().files().get(
+								fileId=self._spreadsheet_id,
+								fields='modifiedTime,version'))
+			modifiedTime	= fileMeta.get('modifiedTime')
+			version			= fileMeta.get('version')
+		except HttpError as err:												# No metadata just means no cache reuse
+			barfi("Sheet revision unavailable, cached snapshot not used. (%s)", err)
+		barfd("GoogleSheet._SheetRevision(modifiedTime=%s,version=%s)", modifiedTime,version)
+		return modifiedTime,version
+
+	def _FetchValues(self,sheetRange=None):										# Query the sheet for the cell range having the data we want
+		if sheetRange is None: sheetRange = self._spreadsheet_range
+		sheet = self._sheetService.spreadsheets()								# Get reference to the source spreadsheet
+		result = GoogleGoo.Scheduler().Execute(sheet.values().get(
+								spreadsheetId=self._spreadsheet_id,
+								range=sheetRange,
+								**self._renderOptions))
+		return result.get('values', [])											# Convert result to a list of rows of data
+
+	def _FetchBatchValues(self,sheetRanges):									# Query the sheet for several cell ranges in one request. Returns list of row lists, in range order.
+		sheet = self._sheetService.spreadsheets()
+		result = GoogleGoo.Scheduler().Execute(sheet.values().batchGet(
+								spreadsheetId=self._spreadsheet_id,
+								ranges=sheetRanges,
+								**self._renderOptions))
+		return [valueRange.get('values', []) for valueRange in result.get('valueRanges', [])]
+
+	def _RangeTab(self,sheetRange):												# Tab name of a range, e.g. DailyData for DailyData!A2:K
+		return sheetRange.split('!')[0].strip("'")
+
+	def _RangeFirstRow(self,sheetRange):										# Sheet row number of a range's first row, e.g. 2 for DailyData!A2:K
+		rangeMatch = self._RANGE_START_PATTERN.search(sheetRange)
+		if rangeMatch is None or rangeMatch.group(1) == '': return 1
+		return int(rangeMatch.group(1))
+
+	def _RangeFromRow(self,rowOffset,lastOffset=None):							# Sheet range starting rowOffset rows into the configured range, through lastOffset (or open ended).
+		rangeMatch = self._RANGE_PATTERN.match(self._spreadsheet_range)			#    None if range isn't open ended.
+		if rangeMatch is None: return None
+		firstRow = int(rangeMatch.group(3)) + rowOffset
+		lastRow = ''
+		if not lastOffset is None: lastRow = int(rangeMatch.group(3)) + lastOffset
+		return "{}!{}{}:{}{}".format(rangeMatch.group(1),rangeMatch.group(2),firstRow,rangeMatch.group(4),lastRow)
+
+	def _FetchAppendedRows(self,sheetCache):									# Top up a cached snapshot with rows appended since. None if earlier rows changed.
+		cachedCt	= sheetCache.rowCount()
+		overlapCt	= sheetCache.tailRows()
+		fetchRange	= self._RangeFromRow(cachedCt - overlapCt)					# Refetch the last few cached rows, plus anything new
+		if fetchRange is None or overlapCt == 0: return None
+
+		newRows = self._FetchValues(fetchRange)
+		if len(newRows) < overlapCt or SheetCache.RowsHash(newRows[:overlapCt]) != sheetCache.tailHash():
+			barfi("Sheet rows were edited since last snapshot. Fetching all rows.")
+			return None
+
+		barfi("Sheet topped up from snapshot. %s new rows fetched.", len(newRows) - overlapCt)
+		return sheetCache.values() + newRows[overlapCt:]
+
+	def _FetchIndexedRows(self,sheetIndex,modifiedTime,version):				# Fetch only the rows from the first filter date on. None if index is missing or
+		if not sheetIndex.Load() or not sheetIndex.IsCurrent(modifiedTime,version): return None		#    the sheet changed since it was built.
+		rowSpan = sheetIndex.SpanFor(self._runConfig.startDate(),self._runConfig.endDate())
+		if rowSpan is None: return None
+		firstRow,edgeChecks = rowSpan
+
+		fetchFirst = min([firstRow] + [edgeCheck[0] for edgeCheck in edgeChecks])	# Edge rows come along with the span, no extra request
+		fetchRange = self._RangeFromRow(fetchFirst)								# Open ended, for rows entered since the index was built
+		if fetchRange is None: return None
+		spanRows = self._FetchValues(fetchRange)
+		if fetchFirst + len(spanRows) != sheetIndex.rowCount():				# Rows added or dropped since indexing, whatever the revision says
+			barfi("Sheet index is behind the sheet. Fetching all rows.")
+			return None
+
+		for rowOffset,rowHash in edgeChecks:									# Edge check: span's boundary rows are where the index says
+			spanIdx = rowOffset - fetchFirst
+			if spanIdx >= len(spanRows) or SheetCache.RowsHash([spanRows[spanIdx]]) != rowHash:
+				barfi("Sheet index is stale. Fetching all rows.")
+				return None
+
+		barfi("Sheet rows fetched by date index. %s rows fetched. Range=%s", len(spanRows),fetchRange)
+		self._firstRowNos[self._RangeTab(self._spreadsheet_range)] += firstRow		# Span starts firstRow rows into the range
+		return spanRows[firstRow - fetchFirst:]
+
+	def _FetchSheetRows(self):													# Get sheet rows: cached snapshot when sheet is unchanged, only the new rows
+		refresh		= self._runConfig.refreshData()								#    when it was appended to, rows from the first filter date on when there's
+		valueRender	= self._renderOptions.get('valueRenderOption')				#    no snapshot but an index of the unchanged sheet, otherwise all rows
+		sheetCache	= SheetCache(self._spreadsheet_id,self._spreadsheet_range,valueRender)
+		sheetIndex	= SheetIndex(self._spreadsheet_id,self._spreadsheet_range,valueRender)
+		modifiedTime,version = self._SheetRevision()
+
+		sheetRows = None
+		isCached = not refresh and sheetCache.Load()
+		if isCached and sheetCache.IsCurrent(modifiedTime,version):
+			sheetRows = sheetCache.values()
+			barfi("Sheet unchanged, using cached snapshot. File=%s", sheetCache.cacheSpec())
+			if not sheetIndex.Load() or sheetIndex.rowCount() != len(sheetRows) or not sheetIndex.IsCurrent(modifiedTime,version):
+				sheetIndex.Build(sheetRows,modifiedTime,version)
+				sheetIndex.Store()
+			SheetCache.Evict()
+			return sheetRows
+
+		if isCached:															# Top up keeps snapshot and index current
+			sheetRows = self._FetchAppendedRows(sheetCache)
+
+		elif not refresh:														# Snapshot evicted, sheet unchanged since indexed. Index rows aren't all rows,
+			sheetRows = self._FetchIndexedRows(sheetIndex,modifiedTime,version)	#    so snapshot and index are left as they are until the sheet changes.
+			if not sheetRows is None:
+				self._isIndexSpan = True
+				SheetCache.Evict()
+				return sheetRows
+
+		if sheetRows is None:
+			sheetRows = self._FetchValues()
+
+		if sheetRows:
+			sheetCache.Store(sheetRows,modifiedTime,version)
+			sheetIndex.Build(sheetRows,modifiedTime,version)
+			sheetIndex.Store()
+
+		SheetCache.Evict()
+		return sheetRows
+
+	def _FetchSheetRowSets(self):												# Get rows of several ranges: cached snapshots of ranges when sheet is unchanged,
+		refresh		= self._runConfig.refreshData()				#    all the other ranges in one batch request
+		valueRender	= self._renderOptions.get('valueRenderOption')
+		modifiedTime,version = self._SheetRevision()
+
+		rangeRows = {}
+		fetchRanges = []
+		for sheetRange in self._spreadsheet_ranges:
+			sheetCache = SheetCache(self._spreadsheet_id,sheetRange,valueRender)
+			if not refresh and sheetCache.Load() and sheetCache.IsCurrent(modifiedTime,version):
+				rangeRows[sheetRange] = sheetCache.values()
+			else:
+				fetchRanges.append(sheetRange)
+
+		if fetchRanges:
+			for sheetRange,sheetRows in zip(fetchRanges,self._FetchBatchValues(fetchRanges)):
+				rangeRows[sheetRange] = sheetRows
+				if sheetRows: SheetCache(self._spreadsheet_id,sheetRange,valueRender).Store(sheetRows,modifiedTime,version)
+		barfi("Sheet ranges fetched. %s from cache, %s in one batch request.", len(self._spreadsheet_ranges)-len(fetchRanges),len(fetchRanges))
+
+		SheetCache.Evict()
+		return [(self._RangeTab(sheetRange),rangeRows.get(sheetRange,[])) for sheetRange in self._spreadsheet_ranges]
 
 	#
 	# Methods (public)
 	#
-	def SetRow(self,sheetRow):
-		self._rowData = sheetRow
-		
-	def dataFields(self):
-		return self._fieldData
-		
-	def isValidRow(self,rowCt):
-		isValid = True
-		self._validateMessage = ""
-		if self.intelDate().isEmpty(): 	self._validateMessage = "Row {} Missing intel date".format(rowCt)
-		if self.site().isEmpty(): 		self._validateMessage = "Row {} Missing reporting site".format(rowCt)
-		if self.county().isEmpty(): 	self._validateMessage = "Row {} Missing county. intelDate={},site={}".format(rowCt,self.intelDate().value(),self.site().value())
-		isValid = self._validateMessage == ""
-		return isValid
-		
-	def isFilterMatchRow(self):
-		return isBetween(self.intelDate().value(),AppSettings.glob().options().startDate(),AppSettings.glob().options().endDate())
-
-	# Debug
-	def DumpFields(self):
-		for field in self.dataFields():
-			print("RowField.{}.{}={}".format(field.fieldId(),field.headerText(),field.value()))
-
-	#
-	# Getters
-	#
-	def intelDate(self):
-		return self._StatusField(self._GSHT_DATE)
-
-	def site(self):
-		return self._StatusField(self._GSHT_SITE)
-
-	def county(self):
-		return self._StatusField(self._GSHT_COUNTY)
+	def FetchRowSets(self):														# Log in to Google sheets service, and get rows of data by tab, from cache or sheet
+		self._Login()
+		for sheetRange in self._spreadsheet_ranges: self._firstRowNos[self._RangeTab(sheetRange)] = self._RangeFirstRow(sheetRange)	# Reject row numbers are sheet rows
+		if len(self._spreadsheet_ranges) > 1: return self._FetchSheetRowSets()
+		return [(self._RangeTab(self._spreadsheet_range),self._FetchSheetRows())]
 
-	def utilities(self):
-		return self._StatusField(self._GSHT_UTILITIES)
+	def FetchRows(self):														# Rows of data of all tabs, as one list
+		sheetRows = []
+		for sourceTab,tabRows in self.FetchRowSets(): sheetRows.extend(tabRows)
+		return sheetRows
 
-	def services(self):
-		return self._StatusField(self._GSHT_SERVICES)
+	def hasAllRows(self):														# Not when only an index span was fetched
+		return not self._isIndexSpan
 
-	def consumables(self):
-		return self._StatusField(self._GSHT_CONSUMABLES)
-
-	def checkins2M(self):
-		return self._StatusField(self._GSHT_2M_CHECKINS)
-
-	def participate2M(self):
-		return self._StatusField(self._GSHT_2M_PARTICIPATE)
-
-	def checkinsHF(self):
-		return self._StatusField(self._GSHT_HF_CHECKINS)
-
-	def participateHF(self):
-		return self._StatusField(self._GSHT_HF_PARTICIPATE)
-
-	def comments(self):
-		return self._StatusField(self._GSHT_COMMENTS)
-
-	def validateMessage(self):
-		return copy.deepcopy(self._validateMessage)
\ No newline at end of file
+	def Close(self):
+		barfd("GoogleSheet.Close.enter()")
+		super(GoogleSheet,self).Close()											# Clean up Google objects to close HTTPS connection
+		self._sheetService				= None
+		barfi("Google requests: %s", GoogleGoo.Scheduler().statsText())
+		barfd("GoogleSheet.Close.exit()")
+		return True
@@ -0,0 +1,67 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgGroupTally.py
+#
+# Description
+#
+#   Group-by tally over columns of a row batch. Row counts per group come from a Counter over
+#   the key column. Sums and maxima are a single pass over (key, value) pairs of a column into
+#   a dict seeded with every group key; that is plain Python per row, but only an int add or
+#   compare, with no per row object or field lookups. Group keys are kept in order of first
+#   appearance, as a row at a time tally would meet them.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import sys
+from collections		import Counter
+
+class GroupTally(object):
+
+	# Properties (private)
+	_groupKeys				= None												# Group key of each row
+	_keyCounts				= None												# Group key -> row count, in order of first appearance
+
+	#
+	# Constructor
+	#
+	def __init__(self,groupKeys):
+		self._groupKeys	= groupKeys
+		self._keyCounts	= Counter(groupKeys)
+
+	#
+	# Methods (public)
+	#
+	def Sums(self,column):														# Group key -> sum of column over group
+		keySums = dict.fromkeys(self._keyCounts, 0)
+		for groupKey,columnValue in zip(self._groupKeys, column):
+			keySums[groupKey] += columnValue
+		return keySums
+
+	def Maxes(self,column,floorValue=0):										# Group key -> max of column over group, and floor value
+		keyMaxes = dict.fromkeys(self._keyCounts, floorValue)
+		for groupKey,columnValue in zip(self._groupKeys, column):
+			if columnValue > keyMaxes[groupKey]:
+				keyMaxes[groupKey] = columnValue
+		return keyMaxes
+
+	def PairCounts(self,column):												# (group key, column value) -> row count, in order of first appearance
+		return Counter(zip(self._groupKeys, column))
+
+	#
+	# Getters
+	#
+	def groupKeys(self):														# Group keys, in order of first appearance
+		return list(self._keyCounts)
+
+	def counts(self):															# Group key -> row count, in order of first appearance
+		return self._keyCounts
@@ -24,11 +24,11 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
-import copy
 import sys
+from array				import array
 
 # MHGLIB includes
-from mhgAppSettings		import AppSettings
+from mhgUtility			import activeRunConfig
 
 class Impact(object):											# Impact
 
@@ -55,7 +55,7 @@ class Impact(object):											# Impact
 	# Properties (public)
 	#
 	def code(self):																# Impact code
-		return copy.deepcopy(self._impactCode)
+		return self._impactCode
 
 	def weight(self,impactCode=None):											# Determine Impact Weight - numeric weight of an impact code (A,M,S)
 		if impactCode is None: impactCode = self._impactCode
@@ -76,22 +76,81 @@ class Impact(object):											# Impact
 		if observeCount > 0: score = round(totalWeight / observeCount,2)
 		return score
 
-	def CodeFromScore(score):													# Derive Impact Code (A,M,S) from Impact Score
-		impactCode = Impact.IMPACT_CODE_UNKNOWN
-		score = round(score)
-		if score == 1: impactCode = Impact.IMPACT_CODE_AVAILABLE
-		if score == 2: impactCode = Impact.IMPACT_CODE_MODERATE
-		if score == 3: impactCode = Impact.IMPACT_CODE_SEVERE
-		if AppSettings.glob().options().zombiesEnabled() and score >= 4: impactCode = Impact.IMPACT_CODE_ZOMBIES
-		return impactCode
+	def CodeFromScore(score,runConfig=None):									# Derive Impact Code (A,M,S) from Impact Score
+		return ImpactTable.ForConfig(activeRunConfig(runConfig)).CodeFor(score)
 		
-	def WeightFromCode(impactCode):
-		weight = 0
-		if impactCode is None: impactCode = Impact.IMPACT_CODE_UNKNOWN
-		impactCode = impactCode.strip()
-		if impactCode == Impact.IMPACT_CODE_AVAILABLE:		weight = 1
-		if impactCode == Impact.IMPACT_CODE_MODERATE:		weight = 2
-		if impactCode == Impact.IMPACT_CODE_SEVERE:			weight = 3
-		if impactCode == Impact.IMPACT_CODE_ZOMBIES and \
-			AppSettings.glob().options().zombiesEnabled():	weight = 12
+	def WeightFromCode(impactCode,runConfig=None):
+		return ImpactTable.ForConfig(activeRunConfig(runConfig)).WeightFor(impactCode)
+
+#
+# Impact Table
+#	Impact weights and codes compiled for a run, zombie mode baked in. Weights are looked up by
+#	raw code text as entered (spaces and all), and codes by rounded score.
+#
+class ImpactTable(object):
+
+	# Constants (private)
+	_CODE_WEIGHTS			= { Impact.IMPACT_CODE_AVAILABLE: 1, Impact.IMPACT_CODE_MODERATE: 2, Impact.IMPACT_CODE_SEVERE: 3 }
+	_ZOMBIES_WEIGHT			= 12												# Weight of zombie outbreak, in zombie mode
+	_TYPE_WEIGHT			= 'B'												# uint8 weight column
+
+	# Tables, by zombie mode (private)
+	_tables					= {}
+
+	# Properties (private)
+	_rawWeights				= None												# Raw code text -> weight. Filled in as new spellings turn up.
+	_scoreCodes				= None												# Rounded score -> code, for scores 0..3
+	_topCode				= None												# Code of scores 4 and up
+
+	#
+	# Constructor
+	#
+	def __init__(self,zombiesEnabled=False):
+		codeWeights = dict(self._CODE_WEIGHTS)
+		if zombiesEnabled: codeWeights[Impact.IMPACT_CODE_ZOMBIES] = self._ZOMBIES_WEIGHT
+		self._rawWeights	= codeWeights
+		self._scoreCodes	= ( Impact.IMPACT_CODE_UNKNOWN, Impact.IMPACT_CODE_AVAILABLE, Impact.IMPACT_CODE_MODERATE, Impact.IMPACT_CODE_SEVERE )
+		self._topCode		= Impact.IMPACT_CODE_ZOMBIES if zombiesEnabled else Impact.IMPACT_CODE_UNKNOWN
+
+	#
+	# Methods (class public)
+	#
+	def ForConfig(runConfig):													# Table for a run configuration. Built once per zombie mode.
+		zombiesEnabled = runConfig.zombiesEnabled()
+		impactTable = ImpactTable._tables.get(zombiesEnabled)
+		if impactTable is None:
+			impactTable = ImpactTable(zombiesEnabled)
+			ImpactTable._tables[zombiesEnabled] = impactTable
+		return impactTable
+
+	#
+	# Methods (public)
+	#
+	def WeightFor(self,impactCode):												# Weight of a raw impact code
+		weight = self._rawWeights.get(impactCode)
+		if weight is None:
+			weight = 0
+			if not impactCode is None: weight = self._rawWeights.get(impactCode.strip(),0)
+			self._rawWeights[impactCode] = weight
 		return weight
+
+	def CodeFor(self,score):													# Impact code of a score
+		score = round(score)
+		if score < 0: return Impact.IMPACT_CODE_UNKNOWN
+		if score >= len(self._scoreCodes): return self._topCode
+		return self._scoreCodes[score]
+
+	def WeightsFor(self,codeColumn,codeTexts=None):								# Weights of a column of raw codes, as a uint8 array. With codeTexts,
+		if codeTexts is None: return array(self._TYPE_WEIGHT, map(self.WeightFor, codeColumn))	#    the column holds ids into it (e.g. RowBatch impact columns).
+		idWeights = bytes(map(self.WeightFor, codeTexts))						# Code id -> weight
+		weightColumn = array(self._TYPE_WEIGHT)
+		if len(idWeights) > 256:												# Ids past a byte. Look each one up.
+			weightColumn.frombytes(bytes(map(idWeights.__getitem__, codeColumn)))
+			return weightColumn
+		idBytes = bytes(codeColumn)												# Ids all fit their low byte: translate low bytes, in C
+		if codeColumn.itemsize > 1: idBytes = idBytes[0 if sys.byteorder == 'little' else codeColumn.itemsize - 1::codeColumn.itemsize]
+		weightColumn.frombytes(idBytes.translate(idWeights.ljust(256, bytes(1))))
+		return weightColumn
+
+	def CodesFor(self,scores):													# Impact codes of a column of scores
+		return list(map(self.CodeFor, scores))
@@ -23,6 +23,7 @@ import sys
 
 # MHGLIB includes
 from mhgAppCommandArgs	import AppCommandArgs
+from mhgCountyIndex		import CountyIndex
 from mhgCountyStats   	import CountyStats
 from mhgStateStats		import StateStats
 from mhgImpact			import Impact
@@ -116,7 +117,7 @@ class KmlWriter(object):									# KML Writer class
 		with open(AppSettings.glob().kmlStatusTemplateSpec()) as fhTemplate:
 
 			self._kmlLines = fhTemplate.readlines()
-			barfd("KmlWriter._MergeData.readlines({} read)".format(len(self._kmlLines)))
+			barfd("KmlWriter._MergeData.readlines(%s read)", len(self._kmlLines))
 
 			# TODO: Test for nothing loaded, then fail
 
@@ -125,7 +126,7 @@ class KmlWriter(object):									# KML Writer class
 			# Define regex patterns to drive walking KML.      TODO: update to use legit KML or XML parser.   NOTE: Python regex ease of use sux compared to PERL. :P
 			placemarkPattern 		= re.compile('^[\t ]*<Placemark>[\t ]*$')
 			placemarkEndPattern		= re.compile('^[\t ]*</Placemark>[\t ]*$')
-			countyNamePattern 		= re.compile('^[\t ]*<name>([A-Za-z]+)</name>[\t ]*$')
+			countyNamePattern 		= re.compile('^[\t ]*<name>([A-Za-z. ]+)</name>[\t ]*$')
 			stylePattern	 		= re.compile('^([\t ]*<styleUrl>)([^<]+)(</styleUrl>[\t ]*)$')
 			schemaDataStartPattern 	= re.compile('^[\t ]*<SchemaData schemaUrl="' + self.KDATA_SCHEMA + '">[\t ]*$')
 			schemaDataItemPattern	= re.compile('^[\t ]*<SimpleData name="([A-Za-z_]+)">([^<]*)</SimpleData>[\t ]*$')
@@ -133,6 +134,8 @@ class KmlWriter(object):									# KML Writer class
 			schemaDataEndPattern 	= re.compile('^[\t ]*</SchemaData>[\t ]*$')
 
 			statsKey = None
+			countyIndex = stateData.countyIndex()
+			countyStats = None
 			lookFor  = 'placemark'
 			traceCounty='Wayne'				#debug
 			for kmlLineIndex in range(0,len(self._kmlLines)-1):
@@ -143,34 +146,35 @@ class KmlWriter(object):									# KML Writer class
 				if lookFor == 'placemark' and placemarkPattern.match(kmlLine):  lookFor = 'county'
 				if lookFor == 'county' and countyNamePattern.match(kmlLine):
 					kmlCounty  = countyNamePattern.match(kmlLine).group(1)
-					statsCounty  = kmlCounty
-					barfd("KmlWriter._MergeData.MergeKmlData.evalCounty({})".format(kmlCounty))
+					statsCountyId  = countyIndex.CountyId(kmlCounty)
+					barfd("KmlWriter._MergeData.MergeKmlData.evalCounty(%s)", kmlCounty)
 					lookFor = 'style'
 					#if not kmlCounty in covidStats: lookFor = 'placemark'
-					if not kmlCounty in stateData.countyList(): 						# If we don't have stats for this county, use default values
-						statsCounty = CountyStats.COUNTY_DEFAULT
+					if not stateData.hasCountyId(statsCountyId): 						# If we don't have stats for this county, use default values
+						statsCountyId = CountyIndex.DEFAULT_ID
+					countyStats = stateData.countyDataById(statsCountyId)
 
 				if lookFor == 'style' and stylePattern.match(kmlLine):
 					styleMatch = stylePattern.match(kmlLine)
-					newStyle = self._IMPACT_STYLE_MAP[stateData.countyData(statsCounty).overallCode().value()]
+					newStyle = self._IMPACT_STYLE_MAP[countyStats.overallCode().value()]
 					self._kmlLines[kmlLineIndex] = styleMatch.group(1) + newStyle + styleMatch.group(3)
 					lookFor = 'schemaStart'
 
 				if lookFor == 'schemaStart' and schemaDataStartPattern.match(kmlLine): lookFor = 'schemaData'
 				if lookFor == 'schemaData'  and schemaDataItemPattern.match(kmlLine):
-					if kmlCounty == traceCounty: barft("KmlWriter._MergeData.EvaluatingData(kmlLine={})".format(kmlLine))
+					if kmlCounty == traceCounty: barft("KmlWriter._MergeData.EvaluatingData(kmlLine=%s)", kmlLine)
 					schemaDataItemMatch = schemaDataItemPattern.match(kmlLine)
 					schemaItemName	= schemaDataItemMatch.group(1)
 					schemaItemValue	= schemaDataItemMatch.group(2)
 					if schemaItemName in self._STATE_SCHEMA_DATA_MAP:
 						statName = self._STATE_SCHEMA_DATA_MAP[schemaItemName]
-						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating kmlLine={}".format(kmlLine))
-						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating county={},statName={}".format(statsCounty,statName))
-						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating schemaItemName={}".format(schemaItemName))
+						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating kmlLine=%s", kmlLine)
+						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating county=%s,statName=%s", countyIndex.CountyName(statsCountyId),statName)
+						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updating schemaItemName=%s", schemaItemName)
 						schemaDataUpdateMatch = schemaDataUpdatePattern.match(kmlLine)
-						newKmlValue = str(stateData.countyData(statsCounty).FieldFromId(statName).value())
+						newKmlValue = str(countyStats.FieldFromId(statName).value())
 						self._kmlLines[kmlLineIndex] = schemaDataUpdateMatch.group(1) + newKmlValue + schemaDataUpdateMatch.group(3)
-						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updated kmlLine={}".format(self._kmlLines[kmlLineIndex]))
+						if kmlCounty == traceCounty: barft("KmlWriter._MergeData.Updated kmlLine=%s", self._kmlLines[kmlLineIndex])
 
 				if (lookFor == 'schemaData' or lookFor == lookForLast) and schemaDataEndPattern.match(kmlLine): lookFor = 'placemark'
 
@@ -187,7 +191,7 @@ class KmlWriter(object):									# KML Writer class
 	def Open(self,kmlSpec):												# Open KML for output
 		success = False
 		if self._fhStatusKml is None:
-			barfd("KmlWriter.Open({})".format(kmlSpec))
+			barfd("KmlWriter.Open(%s)", kmlSpec)
 			self._fhStatusKml = open(kmlSpec, 'w')
 			success = True
 
@@ -204,7 +208,7 @@ class KmlWriter(object):									# KML Writer class
 		return True
 
 	def DumpKml(self,kmlSpec):											# Dump KML buffer to file
-		barfd("KmlWriter.DumpKml.Enter({})".format(kmlSpec))
+		barfd("KmlWriter.DumpKml.Enter(%s)", kmlSpec)
 		self.Open(kmlSpec)
 		for kmlLine in self._kmlLines:
 			self.Write(kmlLine)
@@ -215,5 +219,5 @@ class KmlWriter(object):									# KML Writer class
 
 	def WriteStateCountyStats(self,stateData):							# Merge State County data into buffered KML template, then barf to file(s)
 		self._MergeData(stateData)										# Read template kml into buffer, and merge state data
-		self.DumpKml( AppSettings.glob().statusKmlSpec() )				# Write to Daily Status file
+		self.DumpKml( AppSettings.glob().statusKmlSpec(stateData.runConfig()) )	# Write to Daily Status file, of the stats' date range
 		return True
@@ -18,7 +18,7 @@
 # ---------------------------------------------------------------------------------------------
 
 # MHGLIB includes
-from mhgRegion		import Region
+from mhgRegion		import MhgRegion
 
 class MichiganInfo(object):
 
@@ -111,14 +111,14 @@ class MichiganInfo(object):
 		'Wexford':			{ MCI_POP:33111,	MCI_REGION: MhgRegion.REGION_NW2	} }
 
 	# Constructor
-    def __init__(self,stateName):
+	def __init__(self,stateName):
 		pass
 
 	#
 	# Property Getters (public)
 	#
-	mhgRegion(countyName):
-		return self.MICHIGAN_COUNTIES[countyName][MCI_REG]
+	def mhgRegion(self,countyName):
+		return self.MICHIGAN_COUNTIES[countyName][self.MCI_REGION]
 
-	countyPopulation(countyName):
-		return self.MICHIGAN_COUNTIES[countyName][MCI_POP]
\ No newline at end of file
+	def countyPopulation(self,countyName):
+		return self.MICHIGAN_COUNTIES[countyName][self.MCI_POP]
\ No newline at end of file
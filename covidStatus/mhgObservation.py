@@ -0,0 +1,190 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgObservation.py
+#
+# Description
+#
+#   Compact record of one observation (a valid sheet row), kept for the whole date range.
+#   Slots instead of a DataField per column: intel date as a day ordinal, site and county as
+#   interned strings, impact codes as small ints from a shared code table, and counts as ints.
+#   DataField views, with column headers, are built on request for the writers.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import sys
+from datetime			import date
+
+# MHGLIB includes
+from mhgDataField		import DataField
+from mhgStatusRow		import StatusRow
+
+class Observation(object):
+
+	__slots__ = ( '_dateOrd', '_site', '_county', '_utilities', '_services', '_consumables',
+				  '_checkins2M', '_participate2M', '_checkinsHF', '_participateHF', '_comments', '_sourceTab' )
+
+	# Shared tables (private)
+	_codeTexts				= []												# Impact code id -> code text, as entered
+	_codeIds				= {}												# Impact code text -> code id
+	_dateYmds				= {}												# Day ordinal -> yyyy.mm.dd
+	_dateOrds				= {}												# yyyy.mm.dd -> day ordinal
+
+	#
+	# Constructor
+	#
+	def __init__(self,dateOrd,site,county,utilities,services,consumables,checkins2M,participate2M,checkinsHF,participateHF,comments='',sourceTab=None):
+		self._dateOrd		= dateOrd
+		self._site			= site
+		self._county		= county
+		self._utilities		= utilities
+		self._services		= services
+		self._consumables	= consumables
+		self._checkins2M	= checkins2M
+		self._participate2M	= participate2M
+		self._checkinsHF	= checkinsHF
+		self._participateHF	= participateHF
+		self._comments		= comments
+		self._sourceTab		= sourceTab
+
+	#
+	# Methods (private)
+	#
+	def _View(self,columnId,fieldValue):										# DataField view of a column
+		columnInfo = StatusRow._GSHT_METADATA[columnId]
+		return DataField(columnId, columnInfo[StatusRow._COL_DTYPE], columnInfo[StatusRow._COL_HEADER], fieldValue)
+
+	#
+	# Methods (class public)
+	#
+	def FromStatusRow(statusRow):												# Compact record of a (valid) StatusRow
+		return Observation( Observation.DateOrd(statusRow.intelDate().value()),
+							sys.intern(statusRow.site().value()),
+							sys.intern(statusRow.county().value()),
+							Observation.CodeId(statusRow.utilities().value()),
+							Observation.CodeId(statusRow.services().value()),
+							Observation.CodeId(statusRow.consumables().value()),
+							statusRow.checkins2M().value(),
+							statusRow.participate2M().value(),
+							statusRow.checkinsHF().value(),
+							statusRow.participateHF().value(),
+							statusRow.comments().value(),
+							statusRow.sourceTab() )
+
+	def CodeId(codeText):														# Small int id of an impact code, added to code table when new
+		codeId = Observation._codeIds.get(codeText)
+		if codeId is None:
+			codeId = len(Observation._codeTexts)
+			Observation._codeTexts.append(codeText)
+			Observation._codeIds[codeText] = codeId
+		return codeId
+
+	def CodeText(codeId):														# Impact code text of a code id
+		return Observation._codeTexts[codeId]
+
+	def CodeTexts():															# Impact code table, by code id. Don't change it.
+		return Observation._codeTexts
+
+	def DateOrd(dateYmd):														# yyyy.mm.dd -> day ordinal
+		dateOrd = Observation._dateOrds.get(dateYmd)
+		if dateOrd is None:
+			dateOrd = date(int(dateYmd[0:4]),int(dateYmd[5:7]),int(dateYmd[8:10])).toordinal()
+			Observation._dateOrds[dateYmd] = dateOrd
+			Observation._dateYmds[dateOrd] = dateYmd
+		return dateOrd
+
+	def DateYmd(dateOrd):														# Day ordinal -> yyyy.mm.dd
+		dateYmd = Observation._dateYmds.get(dateOrd)
+		if dateYmd is None:
+			dateYmd = date.fromordinal(dateOrd).strftime("%Y.%m.%d")
+			Observation._dateYmds[dateOrd] = dateYmd
+			Observation._dateOrds[dateYmd] = dateOrd
+		return dateYmd
+
+	#
+	# Getters (typed values)
+	#
+	def intelDateOrd(self):
+		return self._dateOrd
+
+	def intelDateYmd(self):
+		return Observation.DateYmd(self._dateOrd)
+
+	def siteName(self):
+		return self._site
+
+	def countyName(self):
+		return self._county
+
+	def utilitiesCode(self):
+		return Observation._codeTexts[self._utilities]
+
+	def servicesCode(self):
+		return Observation._codeTexts[self._services]
+
+	def consumablesCode(self):
+		return Observation._codeTexts[self._consumables]
+
+	def checkins2MCt(self):
+		return self._checkins2M
+
+	def participate2MCt(self):
+		return self._participate2M
+
+	def checkinsHFCt(self):
+		return self._checkinsHF
+
+	def participateHFCt(self):
+		return self._participateHF
+
+	def sourceTab(self):
+		return self._sourceTab
+
+	#
+	# Getters (DataField views, as StatusRow)
+	#
+	def dataFields(self):														# Data fields, less comments, in sheet column order
+		return [ self.intelDate(), self.site(), self.county(), self.utilities(), self.services(), self.consumables(),
+				 self.checkins2M(), self.participate2M(), self.checkinsHF(), self.participateHF() ]
+
+	def intelDate(self):
+		return self._View(StatusRow._GSHT_DATE, self.intelDateYmd())
+
+	def site(self):
+		return self._View(StatusRow._GSHT_SITE, self._site)
+
+	def county(self):
+		return self._View(StatusRow._GSHT_COUNTY, self._county)
+
+	def utilities(self):
+		return self._View(StatusRow._GSHT_UTILITIES, self.utilitiesCode())
+
+	def services(self):
+		return self._View(StatusRow._GSHT_SERVICES, self.servicesCode())
+
+	def consumables(self):
+		return self._View(StatusRow._GSHT_CONSUMABLES, self.consumablesCode())
+
+	def checkins2M(self):
+		return self._View(StatusRow._GSHT_2M_CHECKINS, self._checkins2M)
+
+	def participate2M(self):
+		return self._View(StatusRow._GSHT_2M_PARTICIPATE, self._participate2M)
+
+	def checkinsHF(self):
+		return self._View(StatusRow._GSHT_HF_CHECKINS, self._checkinsHF)
+
+	def participateHF(self):
+		return self._View(StatusRow._GSHT_HF_PARTICIPATE, self._participateHF)
+
+	def comments(self):
+		return self._View(StatusRow._GSHT_COMMENTS, self._comments)
@@ -35,9 +35,9 @@
 import statistics
 
 # MHGLIB includes
-from mhgAppSettings		import AppSettings
 from mhgDataField		import DataField
 from mhgImpact			import Impact
+from mhgImpact			import ImpactTable
 from mhgUtility			import *
 
 class ObservationStats(object):
@@ -70,6 +70,8 @@ class ObservationStats(object):
 	STAT_HF_PARTICIPATE				= 'HF Participate'									# Total HF nets participated in
 
 	# Properties (private)
+	_runConfig						= None												# Run configuration (date range, zombie mode)
+	_impactTable					= None												# Impact codes compiled for run configuration
 	_statusStartDate				= None
 	_statusEndDate					= None
 	_observeDays					= None
@@ -82,20 +84,25 @@ class ObservationStats(object):
 	_checkinsHF						= None
 	_participateHF					= None
 
+	_derivedFields					= None												# Scores and codes, by stat id. None when an accumulator has changed since.
+	_fieldDataStale					= True												# Whether field list needs rebuilding
+	_fieldIndexes					= {}												# Stats class -> { field id: position in dataFields() }, built once per class
+
 	_dailyCounts					= {}
 	_fieldData						= []
 
 	# Constructor
-	def __init__(self):
+	def __init__(self,runConfig=None):
+		self._runConfig = activeRunConfig(runConfig)
+		self._impactTable = ImpactTable.ForConfig(self._runConfig)
 		self._SetObservationDefaults()
 
 	#
 	# Methods (private)
 	#
 	def _SetObservationDefaults(self):
-		_appOptions = AppSettings.glob().options()
-		self._statusStartDate		= DataField(self.STAT_STATUS_START_DATE,	DataField.DTYPE_DATE,		'IntelStartDate',		_appOptions.startDate())
-		self._statusEndDate			= DataField(self.STAT_STATUS_END_DATE,		DataField.DTYPE_DATE,		'IntelEndDate',			_appOptions.endDate())
+		self._statusStartDate		= DataField(self.STAT_STATUS_START_DATE,	DataField.DTYPE_DATE,		'IntelStartDate',		self._runConfig.startDate())
+		self._statusEndDate			= DataField(self.STAT_STATUS_END_DATE,		DataField.DTYPE_DATE,		'IntelEndDate',			self._runConfig.endDate())
 		self._observeDays			= DataField(self.STAT_OBSERVE_NDAYS,		DataField.DTYPE_NUMERIC,	'ObserveDays',			0)
 		self._observeCount			= DataField(self.STAT_OBSERVE_COUNT,		DataField.DTYPE_NUMERIC,	'ObserveCount',			0)
 		self._utilityWeight			= DataField(self.STAT_UTILITIES_WEIGHT,		DataField.DTYPE_NUMERIC,	'UtilityWeight',		0)
@@ -106,6 +113,35 @@ class ObservationStats(object):
 		self._checkinsHF			= DataField(self.STAT_HF_CHECKINS,			DataField.DTYPE_NUMERIC,	'HFCheckins',			0)
 		self._participateHF			= DataField(self.STAT_HF_PARTICIPATE,		DataField.DTYPE_NUMERIC,	'HFParticipate',		0)
 		dailyCounts					= {}
+		for accumulator in (self._observeCount, self._utilityWeight, self._servicesWeight, self._consumablesWeight):	# Scores and codes derive from these
+			accumulator.SetChangeListener(self._Invalidate)
+		self._Invalidate()
+
+	def _Invalidate(self):														# Drop scores and codes. Recomputed on next use.
+		self._derivedFields		= None
+		self._fieldDataStale	= True
+
+	def _DerivedFields(self):													# Scores and codes, computed once after any accumulator change
+		if self._derivedFields is None:
+			utilitiesScore		= Impact.EvalScore(self._utilityWeight.value(),self._observeCount.value())
+			servicesScore		= Impact.EvalScore(self._servicesWeight.value(),self._observeCount.value())
+			consumablesScore	= Impact.EvalScore(self._consumablesWeight.value(),self._observeCount.value())
+			overallScore		= int( statistics.mean([utilitiesScore, servicesScore, consumablesScore]) + 0.5 )
+			barfd("ObservationStats.maxScore(utilitiesScore=%s,servicesScore=%s,consumablesScore=%s)", utilitiesScore,servicesScore,consumablesScore)
+			maxScore			= max(utilitiesScore,servicesScore,consumablesScore)
+			self._derivedFields	= {
+				self.STAT_UTILITIES_SCORE:		DataField(self.STAT_UTILITIES_SCORE,	DataField.DTYPE_NUMERIC,	'UtilitiesScore',	utilitiesScore),
+				self.STAT_SERVICES_SCORE:		DataField(self.STAT_SERVICES_SCORE,		DataField.DTYPE_NUMERIC,	'ServicesScore',	servicesScore),
+				self.STAT_CONSUMABLES_SCORE:	DataField(self.STAT_CONSUMABLES_SCORE,	DataField.DTYPE_NUMERIC,	'ConsumablesScore', consumablesScore),
+				self.STAT_OVERALL_SCORE:		DataField(self.STAT_OVERALL_SCORE,		DataField.DTYPE_NUMERIC,	'OverallScore',		overallScore),
+				self.STAT_MAX_SCORE:			DataField(self.STAT_MAX_SCORE,			DataField.DTYPE_NUMERIC,	'MaxScore',			maxScore),
+				self.STAT_UTILITIES_CODE:		DataField(self.STAT_UTILITIES_CODE,		DataField.DTYPE_NUMERIC,	'UtilitiesCode',	self._impactTable.CodeFor(utilitiesScore)),
+				self.STAT_SERVICES_CODE:		DataField(self.STAT_SERVICES_CODE,		DataField.DTYPE_NUMERIC,	'ServicesCode',		self._impactTable.CodeFor(servicesScore)),
+				self.STAT_CONSUMABLES_CODE:		DataField(self.STAT_CONSUMABLES_CODE,	DataField.DTYPE_NUMERIC,	'ConsumablesCode',	self._impactTable.CodeFor(consumablesScore)),
+				self.STAT_OVERALL_CODE:			DataField(self.STAT_OVERALL_CODE,		DataField.DTYPE_NUMERIC,	'OverallCode',		self._impactTable.CodeFor(overallScore)) }
+			maxCode = self._impactTable.CodeFor(self.maxScore().value())						# maxScore() may be overridden (CumulativeStats)
+			self._derivedFields[self.STAT_MAX_CODE] = DataField(self.STAT_MAX_CODE,	DataField.DTYPE_NUMERIC,	'MaxCode',			maxCode)
+		return self._derivedFields
 
 	def _SetFieldData(self):													# Create list of DataField items from properties. (archetype)
 		barft("ObservationStats._SetFieldData.enter()")
@@ -131,6 +167,7 @@ class ObservationStats(object):
 		self._fieldData.append(self.consumablesCode())		
 		self._fieldData.append(self.overallCode())		
 		self._fieldData.append(self.maxCode())		
+		self._fieldDataStale = False
 		barft("ObservationStats._SetFieldData.exit()")
 		return True
 
@@ -139,29 +176,38 @@ class ObservationStats(object):
 		for field in self._fieldData:
 			dumpText += "{}={},".format(field.fieldId(),field.value())
 		return dumpText
+
+	def _FieldIndex(self):														# Field id -> position in dataFields(), for this stats class
+		fieldIndex = ObservationStats._fieldIndexes.get(type(self))
+		if fieldIndex is None:
+			fieldIndex = {}
+			for fieldPos,field in enumerate(self.dataFields()): fieldIndex.setdefault(field.fieldId(), fieldPos)	# First field of an id, as a scan finds
+			ObservationStats._fieldIndexes[type(self)] = fieldIndex
+		return fieldIndex
+
 	#
 	# Methods (public)
 	#
-	def FieldFromId(self,fieldIdentifier):
-		barft("ObservationStats.FieldFromId.enter(id={})".format(fieldIdentifier))
-		statusField = None
-		for field in self.dataFields():
-			if field.fieldId() == fieldIdentifier:
-				statusField = field
-				break
+	def FieldFromId(self,fieldIdentifier):										# Field of a field id. Index lookup into the cached field list.
+		barft("ObservationStats.FieldFromId.enter(id=%s)", fieldIdentifier)
+		fieldPos = self._FieldIndex().get(fieldIdentifier)
+		statusField = None if fieldPos is None else self.dataFields()[fieldPos]
 		fieldText = "None"
 		if not statusField is None: fieldText = statusField.value()
-		barft("ObservationStats.FieldFromId.fields({})".format(self._dataFieldsDumpsText()))
-		barft("ObservationStats.FieldFromId.exit(fieldct={},value={})".format(len(self._fieldData),fieldText))
+		if barftOn(): barft("ObservationStats.FieldFromId.fields(%s)", self._dataFieldsDumpsText())
+		barft("ObservationStats.FieldFromId.exit(fieldct=%s,value=%s)", len(self._fieldData),fieldText)
 		return statusField
 
 	#
 	# Property Getters (public)
 	#
-	def dataFields(self):
-		self._SetFieldData()
+	def dataFields(self):														# Field list is rebuilt only after an accumulator changes
+		if self._fieldDataStale: self._SetFieldData()
 		return self._fieldData
 
+	def runConfig(self):
+		return self._runConfig
+
 	
 	def startDate(self):
 		return self._statusStartDate
@@ -198,51 +244,34 @@ class ObservationStats(object):
 
 	#
 	# Property Getters, Calculated (public)
+	#	Computed together, once after any accumulator change. Don't change them.
 	#
 	def utilitiesScore(self):
-		score = Impact.EvalScore(self._utilityWeight.value(),self._observeCount.value()) 
-		return DataField(self.STAT_UTILITIES_SCORE,		DataField.DTYPE_NUMERIC,	'UtilitiesScore',	score)
+		return self._DerivedFields()[self.STAT_UTILITIES_SCORE]
 
 	def servicesScore(self):
-		score = Impact.EvalScore(self._servicesWeight.value(),self._observeCount.value()) 
-		return DataField(self.STAT_SERVICES_SCORE,		DataField.DTYPE_NUMERIC,	'ServicesScore',	score)
+		return self._DerivedFields()[self.STAT_SERVICES_SCORE]
 
 	def consumablesScore(self):
-		score = Impact.EvalScore(self._consumablesWeight.value(),self._observeCount.value()) 
-		return DataField(self.STAT_CONSUMABLES_SCORE,	DataField.DTYPE_NUMERIC,	'ConsumablesScore', score)
+		return self._DerivedFields()[self.STAT_CONSUMABLES_SCORE]
 
 	def overallScore(self):
-		score = int( statistics.mean([self.utilitiesScore().value(), \
-										self.servicesScore().value(), \
-										self.consumablesScore().value()] ) + 0.5 )
-		return DataField(self.STAT_OVERALL_SCORE,		DataField.DTYPE_NUMERIC,	'OverallScore',		score)
+		return self._DerivedFields()[self.STAT_OVERALL_SCORE]
 
 	def maxScore(self):
-		barfd("ObservationStats.maxScore.enter()")
-		barfd("utilitiesScore={}".format(self.utilitiesScore().value()))
-		barfd("servicesScore={}".format(self.servicesScore().value()))
-		barfd("consumablesScore={}".format(self.consumablesScore().value()))
-		score = max(self.utilitiesScore().value(),self.servicesScore().value(),self.consumablesScore().value())
-		barfd("ObservationStats.maxScore.exit()")
-		return DataField(self.STAT_MAX_SCORE,			DataField.DTYPE_NUMERIC,	'MaxScore',			score)
+		return self._DerivedFields()[self.STAT_MAX_SCORE]
 
 	def utilitiesCode(self):
-		impactCode = Impact.CodeFromScore(self.utilitiesScore().value())
-		return DataField(self.STAT_UTILITIES_CODE,		DataField.DTYPE_NUMERIC,	'UtilitiesCode',	impactCode)
+		return self._DerivedFields()[self.STAT_UTILITIES_CODE]
 
 	def servicesCode(self):
-		impactCode = Impact.CodeFromScore(self.servicesScore().value())
-		return DataField(self.STAT_SERVICES_CODE,		DataField.DTYPE_NUMERIC,	'ServicesCode',		impactCode)
+		return self._DerivedFields()[self.STAT_SERVICES_CODE]
 
 	def consumablesCode(self):
-		impactCode = Impact.CodeFromScore(self.consumablesScore().value())
-		return DataField(self.STAT_CONSUMABLES_CODE,	DataField.DTYPE_NUMERIC,	'ConsumablesCode',	impactCode)
+		return self._DerivedFields()[self.STAT_CONSUMABLES_CODE]
 
 	def overallCode(self):
-		impactCode = Impact.CodeFromScore(self.overallScore().value())
-		return DataField(self.STAT_OVERALL_CODE,		DataField.DTYPE_NUMERIC,	'OverallCode',		impactCode)
+		return self._DerivedFields()[self.STAT_OVERALL_CODE]
 
 	def maxCode(self):
-		mscore=self.maxScore().value()
-		impactCode = Impact.CodeFromScore(self.maxScore().value())
-		return DataField(self.STAT_MAX_CODE,			DataField.DTYPE_NUMERIC,	'MaxCode',			impactCode)		
+		return self._DerivedFields()[self.STAT_MAX_CODE]
@@ -0,0 +1,70 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRejectsWriter.py
+#
+# Description
+#
+#   Class for writing the table of rejected source rows to CSV. One line per source tab and
+#   reject reason, with count and row numbers (sheet row numbers, for the Google sheet).
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import sys
+
+# MHGLIB includes
+from mhgCsvWriter		import CsvWriter
+from mhgDataField		import DataField
+from mhgUtility			import *
+
+class RejectsWriter(CsvWriter):												# Rejects CSV Writer class
+
+	# Constants (private)
+	_HEADERS				= ( 'Tab', 'Reason', 'Rejects', 'Rows' )
+
+	# Properties (private)
+	_runConfig				= None												# Run configuration (file name)
+
+	#
+	# Constructor
+	#
+	def __init__(self,runConfig=None):
+		self._runConfig		= activeRunConfig(runConfig)						# Run configuration. None for the current one
+
+	#
+	# Methods (public)
+	#
+	def Open(self):															# Open Rejects CSV for output
+		success = False
+		if self._fhCsv is None:
+			self.SetFileSpec( AppSettings.glob().rejectsCsvSpec(self._runConfig) )
+			barfd("RejectsWriter.Open(file=%s)", self.fileSpec())
+			self._fhCsv = open(self.fileSpec(), 'w')
+			if self._fhCsv is None:
+				raise EnvironmentError("Can't open output Rejects CSV ({})".format(self.fileSpec()))
+			self.Write(''.join(self._csvText(headerText, DataField.DTYPE_TEXT) for headerText in self._HEADERS))
+			success = True
+
+		return success
+
+	def WriteRejects(self,rowValidator):									# Write reject table of a RowValidator, if any rows were rejected
+		if rowValidator.rejectCt() == 0: return True
+
+		barfi("Rejects CSV generating ...")
+		self.Open()
+		for sourceTag,reason,rowNos in rowValidator.rejectTable():
+			self.Write( self._csvText(coalesce(sourceTag,''), DataField.DTYPE_TEXT) + self._csvText(reason, DataField.DTYPE_TEXT) +
+						self._csvText(len(rowNos), DataField.DTYPE_NUMERIC) + self._csvText(' '.join(map(str, rowNos)), DataField.DTYPE_TEXT) )
+		self.Close()
+		barfi("Rejects CSV complete. %s rows rejected.", rowValidator.rejectCt())
+
+		return True
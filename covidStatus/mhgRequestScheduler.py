@@ -0,0 +1,200 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRequestScheduler.py
+#
+# Description
+#
+#   Request scheduler for Google API calls. Requests are paced by a token bucket refilled at
+#   the per-minute quota, retried with exponential backoff and jitter on quota (429) and server
+#   (5xx) errors, and identical requests already in flight on another thread share one call.
+#   Request, retry, coalesce and wait counts are kept for the run report.
+#
+#   The HTTP transport, clock, sleep and random source can be handed in, so the scheduler can
+#   be run against a fake transport (e.g. googleapiclient.http.HttpMockSequence) without waiting.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import random
+import threading
+import time
+
+# Google includes
+from googleapiclient.errors			import HttpError
+
+# MHGLIB includes
+from mhgAppSettings		import AppSettings
+from mhgUtility			import *
+
+#
+# In flight request (private)
+#	Result of a request, shared with threads making the same request while it runs
+#
+class _InFlight(object):
+
+	_done						= None											# Set when request finishes
+	_result						= None											# Request result
+	_error						= None											# Exception raised by request
+
+	def __init__(self):
+		self._done		= threading.Event()
+		self._result	= None
+		self._error		= None
+
+#
+# Request Scheduler
+#
+class RequestScheduler(object):
+
+	# Constants (private)
+	_RETRY_STATUS				= (429, 500, 502, 503, 504)						# HTTP status codes worth another try
+
+	# Properties (private)
+	_ratePerSec					= None											# Token bucket refill rate
+	_bucketSize					= None											# Token bucket capacity
+	_tokens						= None											# Tokens in bucket
+	_tokensTime					= None											# Clock time tokens were last counted
+	_maxRetries					= None											# Retries before giving up on a request
+	_backoffSecs				= None											# First retry backoff
+	_backoffMaxSecs				= None											# Backoff ceiling
+	_http						= None											# HTTP transport for requests (None for the service's own)
+	_clock						= None											# Clock, in seconds
+	_sleep						= None											# Sleep function
+	_random						= None											# Random [0,1) source, for jitter
+	_lock						= None											# Guards bucket, in flight requests and stats
+	_inFlight					= None											# Request key -> _InFlight
+
+	# Stats (private)
+	_requestCt					= 0												# HTTP requests made, including retries
+	_retryCt					= 0												# Retries after quota or server errors
+	_coalescedCt				= 0												# Requests answered by an identical request in flight
+	_waitSecs					= 0.0											# Time spent waiting on the bucket and backoff
+
+	#
+	# Constructor
+	#
+	def __init__(self,requestsPerMinute=None,http=None,clock=time.monotonic,sleep=time.sleep,rand=random.random):
+		if requestsPerMinute is None: requestsPerMinute = AppSettings.glob().sheetsRequestsPerMinute()
+		self._ratePerSec		= requestsPerMinute / 60.0
+		self._bucketSize		= float(requestsPerMinute)
+		self._tokens			= self._bucketSize
+		self._tokensTime		= clock()
+		self._maxRetries		= AppSettings.glob().sheetsMaxRetries()
+		self._backoffSecs		= AppSettings.glob().sheetsBackoffSecs()
+		self._backoffMaxSecs	= AppSettings.glob().sheetsBackoffMaxSecs()
+		self._http				= http
+		self._clock				= clock
+		self._sleep				= sleep
+		self._random			= rand
+		self._lock				= threading.Lock()
+		self._inFlight			= {}
+		self._requestCt			= 0
+		self._retryCt			= 0
+		self._coalescedCt		= 0
+		self._waitSecs			= 0.0
+
+	#
+	# Methods (private)
+	#
+	def _RequestKey(self,request):												# Requests with the same method, URI and body are identical
+		return (getattr(request,'method',None), getattr(request,'uri',id(request)), getattr(request,'body',None))
+
+	def _Wait(self,waitSecs):
+		if waitSecs <= 0: return
+		with self._lock:
+			self._waitSecs += waitSecs
+		self._sleep(waitSecs)
+
+	def _AcquireToken(self):													# Take a token from the bucket. When empty, the token is borrowed and the
+		with self._lock:														#    caller waits until the bucket refills to cover it.
+			nowTime = self._clock()
+			self._tokens = min(self._bucketSize, self._tokens + (nowTime - self._tokensTime) * self._ratePerSec)
+			self._tokensTime = nowTime
+			self._tokens -= 1.0
+			waitSecs = 0.0
+			if self._tokens < 0: waitSecs = -self._tokens / self._ratePerSec
+		if waitSecs > 0:
+			barfd("RequestScheduler._AcquireToken(wait=%.2f)", waitSecs)
+			self._Wait(waitSecs)
+		return True
+
+	def _BackoffSecs(self,attemptNo,err):										# Backoff before retry: full jitter under an exponential ceiling, or Retry-After if longer
+		ceilingSecs = min(self._backoffMaxSecs, self._backoffSecs * (2 ** attemptNo))
+		backoffSecs = self._random() * ceilingSecs
+		retryAfter = err.resp.get('retry-after') if hasattr(err.resp,'get') else None
+		if not retryAfter is None and str(retryAfter).isdigit(): backoffSecs = max(backoffSecs, float(retryAfter))
+		return backoffSecs
+
+	def _ExecuteWithRetry(self,request):
+		for attemptNo in range(self._maxRetries + 1):
+			self._AcquireToken()
+			with self._lock:
+				self._requestCt += 1
+			try:
+				if self._http is None: return request.execute()
+				return request.execute(http=self._http)
+			except HttpError as err:
+				httpStatus = int(err.resp.status)
+				if not httpStatus in self._RETRY_STATUS or attemptNo >= self._maxRetries: raise
+				backoffSecs = self._BackoffSecs(attemptNo,err)
+				with self._lock:
+					self._retryCt += 1
+				barfi("Google request failed (status %s). Retry %s of %s in %.1f seconds.", httpStatus,attemptNo+1,self._maxRetries,backoffSecs)
+				self._Wait(backoffSecs)
+
+	#
+	# Methods (public)
+	#
+	def Execute(self,request):													# Execute a Google API request (HttpRequest), paced, retried and coalesced
+		requestKey = self._RequestKey(request)
+		with self._lock:
+			inFlight = self._inFlight.get(requestKey)
+			isOwner = inFlight is None
+			if isOwner:
+				inFlight = _InFlight()
+				self._inFlight[requestKey] = inFlight
+			else:
+				self._coalescedCt += 1
+
+		if not isOwner:																# Same request already running. Share its result.
+			inFlight._done.wait()
+			if not inFlight._error is None: raise inFlight._error
+			return inFlight._result
+
+		try:
+			inFlight._result = self._ExecuteWithRetry(request)
+		except Exception as err:
+			inFlight._error = err
+			raise
+		finally:
+			with self._lock:
+				del self._inFlight[requestKey]
+			inFlight._done.set()
+		return inFlight._result
+
+	#
+	# Properties (public)
+	#
+	def requestCt(self):
+		return self._requestCt
+
+	def retryCt(self):
+		return self._retryCt
+
+	def coalescedCt(self):
+		return self._coalescedCt
+
+	def waitSecs(self):
+		return self._waitSecs
+
+	def statsText(self):														# Stats, for run report
+		return "requests={},retries={},coalesced={},waitSecs={:.1f}".format(self._requestCt,self._retryCt,self._coalescedCt,self._waitSecs)
@@ -0,0 +1,239 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRowBatch.py
+#
+# Description
+#
+#   Columnar batch of observations. One typed array per column instead of an object per row:
+#
+#       intel date              day ordinal, int32
+#       site, county, tab       categorical codes (uint32) with a name dictionary per batch
+#       impact codes (3)        uint16, ids in the Observation impact code table
+#       radio counts (4)        int64
+#       comments                optional side list
+#
+#   Date filtering builds a byte mask over the date column and compresses every column by it,
+#   in C, with no per-row Python objects. Stats and detail writing read the columns directly;
+#   Observation records are built only on request.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import operator
+import sys
+from array				import array
+from itertools			import compress
+from itertools			import repeat
+
+# MHGLIB includes
+from mhgObservation		import Observation
+from mhgStatusRow		import StatusRow
+
+#
+# Categorical column dictionary (private)
+#
+class _Categories(object):
+
+	_names					= None												# Code -> name
+	_codes					= None												# Name -> code
+
+	def __init__(self,names=None):
+		self._names = list(names or [])
+		self._codes = { categoryName: categoryCode for categoryCode,categoryName in enumerate(self._names) }
+
+	def Code(self,categoryName):												# Code of a name, added when new
+		categoryCode = self._codes.get(categoryName)
+		if categoryCode is None:
+			categoryCode = len(self._names)
+			self._names.append(categoryName)
+			self._codes[categoryName] = categoryCode
+		return categoryCode
+
+	def names(self):
+		return self._names
+
+#
+# Row Batch
+#
+class RowBatch(object):
+
+	# Constants (private)
+	_TYPE_DATE				= 'i'												# int32 day ordinal
+	_TYPE_CATEGORY			= 'I'												# uint32 category code
+	_TYPE_IMPACT			= 'H'												# uint16 impact code id. Ids are raw spellings, so can pass 255.
+	_TYPE_COUNT				= 'q'												# int64 radio count
+
+	# Properties (private)
+	_dates					= None												# Intel date day ordinals
+	_sites					= None												# Site codes
+	_counties				= None												# County codes
+	_tabs					= None												# Source tab codes
+	_utilities				= None												# Utilities impact code ids
+	_services				= None												# Services impact code ids
+	_consumables			= None												# Consumables impact code ids
+	_checkins2M				= None												# 2M checkins
+	_participate2M			= None												# 2M participation
+	_checkinsHF				= None												# HF checkins
+	_participateHF			= None												# HF participation
+	_comments				= None												# Comments side list, None if not kept
+	_siteNames				= None												# Site dictionary
+	_countyNames			= None												# County dictionary
+	_tabNames				= None												# Source tab dictionary
+
+	#
+	# Constructor
+	#
+	def __init__(self,keepComments=False,siteNames=None,countyNames=None,tabNames=None):
+		self._dates				= array(self._TYPE_DATE)
+		self._sites				= array(self._TYPE_CATEGORY)
+		self._counties			= array(self._TYPE_CATEGORY)
+		self._tabs				= array(self._TYPE_CATEGORY)
+		self._utilities			= array(self._TYPE_IMPACT)
+		self._services			= array(self._TYPE_IMPACT)
+		self._consumables		= array(self._TYPE_IMPACT)
+		self._checkins2M		= array(self._TYPE_COUNT)
+		self._participate2M		= array(self._TYPE_COUNT)
+		self._checkinsHF		= array(self._TYPE_COUNT)
+		self._participateHF		= array(self._TYPE_COUNT)
+		self._comments			= [] if keepComments else None
+		self._siteNames			= _Categories(siteNames)
+		self._countyNames		= _Categories(countyNames)
+		self._tabNames			= _Categories(tabNames)
+
+	#
+	# Methods (private)
+	#
+	def _Columns(self):															# Array columns, in a fixed order
+		return [ self._dates, self._sites, self._counties, self._tabs, self._utilities, self._services, self._consumables,
+				 self._checkins2M, self._participate2M, self._checkinsHF, self._participateHF ]
+
+	#
+	# Methods (public)
+	#
+	def Append(self,statusRow):													# Add a (valid) StatusRow
+		self._dates.append(Observation.DateOrd(statusRow.intelDate().value()))
+		self._sites.append(self._siteNames.Code(statusRow.site().value()))
+		self._counties.append(self._countyNames.Code(statusRow.county().value()))
+		self._tabs.append(self._tabNames.Code(statusRow.sourceTab()))
+		self._utilities.append(Observation.CodeId(statusRow.utilities().value()))
+		self._services.append(Observation.CodeId(statusRow.services().value()))
+		self._consumables.append(Observation.CodeId(statusRow.consumables().value()))
+		self._checkins2M.append(statusRow.checkins2M().value())
+		self._participate2M.append(statusRow.participate2M().value())
+		self._checkinsHF.append(statusRow.checkinsHF().value())
+		self._participateHF.append(statusRow.participateHF().value())
+		if not self._comments is None: self._comments.append(statusRow.comments().value())
+		return True
+
+	def AppendColumns(self,columns,rowMask,sourceTag=None):						# Add the rows set in mask, of decoded columns in StatusRow column order (RowValidator.Validate)
+		keptColumns = [list(compress(column, rowMask)) for column in columns]
+		self._dates.extend(map(Observation.DateOrd, keptColumns[StatusRow._GSHT_DATE]))
+		self._sites.extend(map(self._siteNames.Code, keptColumns[StatusRow._GSHT_SITE]))
+		self._counties.extend(map(self._countyNames.Code, keptColumns[StatusRow._GSHT_COUNTY]))
+		self._tabs.extend(repeat(self._tabNames.Code(sourceTag), len(keptColumns[StatusRow._GSHT_DATE])))
+		self._utilities.extend(map(Observation.CodeId, keptColumns[StatusRow._GSHT_UTILITIES]))
+		self._services.extend(map(Observation.CodeId, keptColumns[StatusRow._GSHT_SERVICES]))
+		self._consumables.extend(map(Observation.CodeId, keptColumns[StatusRow._GSHT_CONSUMABLES]))
+		self._checkins2M.extend(keptColumns[StatusRow._GSHT_2M_CHECKINS])
+		self._participate2M.extend(keptColumns[StatusRow._GSHT_2M_PARTICIPATE])
+		self._checkinsHF.extend(keptColumns[StatusRow._GSHT_HF_CHECKINS])
+		self._participateHF.extend(keptColumns[StatusRow._GSHT_HF_PARTICIPATE])
+		if not self._comments is None: self._comments.extend(keptColumns[StatusRow._GSHT_COMMENTS])
+		return True
+
+	def DateMask(self,startOrd,endOrd):											# Byte mask of rows with intel date in startOrd..endOrd (day ordinals)
+		return bytes(map(operator.and_, map(startOrd.__le__, self._dates), map(endOrd.__ge__, self._dates)))
+
+	def Select(self,rowMask):													# New batch of the rows set in mask. Dictionaries are shared.
+		rowBatch = RowBatch.__new__(RowBatch)
+		rowBatch._dates,rowBatch._sites,rowBatch._counties,rowBatch._tabs,rowBatch._utilities,rowBatch._services, \
+			rowBatch._consumables,rowBatch._checkins2M,rowBatch._participate2M,rowBatch._checkinsHF,rowBatch._participateHF = \
+				[array(column.typecode, compress(column, rowMask)) for column in self._Columns()]
+		rowBatch._comments		= None if self._comments is None else list(compress(self._comments, rowMask))
+		rowBatch._siteNames		= self._siteNames
+		rowBatch._countyNames	= self._countyNames
+		rowBatch._tabNames		= self._tabNames
+		return rowBatch
+
+	def Observation(self,rowIdx):												# Observation record of a row
+		return Observation( self._dates[rowIdx],
+							sys.intern(self._siteNames.names()[self._sites[rowIdx]]),
+							sys.intern(self._countyNames.names()[self._counties[rowIdx]]),
+							self._utilities[rowIdx], self._services[rowIdx], self._consumables[rowIdx],
+							self._checkins2M[rowIdx], self._participate2M[rowIdx], self._checkinsHF[rowIdx], self._participateHF[rowIdx],
+							'' if self._comments is None else self._comments[rowIdx],
+							self._tabNames.names()[self._tabs[rowIdx]] )
+
+	def Observations(self):														# All rows, as Observation records
+		return [self.Observation(rowIdx) for rowIdx in range(len(self._dates))]
+
+	def DetailRows(self):														# Rows as values of StatusRow.dataFields(), in column order, for detail CSVs
+		siteNames	= self._siteNames.names()
+		countyNames	= self._countyNames.names()
+		return zip( map(Observation.DateYmd, self._dates),
+					map(siteNames.__getitem__, self._sites),
+					map(countyNames.__getitem__, self._counties),
+					map(Observation.CodeText, self._utilities),
+					map(Observation.CodeText, self._services),
+					map(Observation.CodeText, self._consumables),
+					self._checkins2M, self._participate2M, self._checkinsHF, self._participateHF )
+
+	#
+	# Getters
+	#
+	def rowCt(self):
+		return len(self._dates)
+
+	def dates(self):															# Column getters return the arrays themselves. Don't change them.
+		return self._dates
+
+	def sites(self):
+		return self._sites
+
+	def counties(self):
+		return self._counties
+
+	def tabs(self):
+		return self._tabs
+
+	def utilities(self):
+		return self._utilities
+
+	def services(self):
+		return self._services
+
+	def consumables(self):
+		return self._consumables
+
+	def checkins2M(self):
+		return self._checkins2M
+
+	def participate2M(self):
+		return self._participate2M
+
+	def checkinsHF(self):
+		return self._checkinsHF
+
+	def participateHF(self):
+		return self._participateHF
+
+	def comments(self):
+		return self._comments
+
+	def siteNames(self):														# Site code -> name
+		return self._siteNames.names()
+
+	def countyNames(self):														# County code -> name
+		return self._countyNames.names()
+
+	def tabNames(self):															# Source tab code -> name
+		return self._tabNames.names()
@@ -0,0 +1,323 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRowSource.py
+#
+# Description
+#
+#   Row Sources. Supply raw rows of MHG Covid observation data (as lists of cell text, laid
+#   out like the DailyData sheet) and convert them to validated, date filtered StatusRows.
+#   Rows are validated a column at a time (RowValidator), and valid rows are kept in a columnar
+#   RowBatch. The date filter is a mask over the batch date column.
+#
+#   RowSource               Base class. Subclasses supply FetchRows(), or FetchRowSets() for sources
+#                           with several tagged sets of rows (sheet tabs).
+#   DetailCsvRowSource      Replays data/mhgCovidStatus-Detail-YYYY.MM.DD.csv files for the date range
+#   DumpRowSource           Reads a local CSV or JSON dump of sheet rows
+#   GoogleSheet             (mhgGoogleSheet.py) Pulls rows from the Google spreadsheet
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import csv
+import json
+import os
+import os.path
+from datetime			import timedelta
+
+# MHGLIB includes
+from mhgAppSettings		import AppSettings
+from mhgDataCube		import DataCube
+from mhgDateParser		import DateParser
+from mhgException	  	import EnvironmentError
+from mhgException	  	import UserError
+from mhgObservation		import Observation
+from mhgRowBatch		import RowBatch
+from mhgRowValidator	import RowValidator
+from mhgUtility			import *
+
+#
+# Row Source (base class)
+#
+class RowSource(object):
+
+	#
+	# Properties (private)
+	#
+	_sourceText						= 'row source'								# Description of source for messages
+	_runConfig						= None										# Run configuration (date range)
+	_firstRowNos					= None										# Source tag -> source row number of the set's first row, where not 1
+	_rowValidator					= None										# Batch validator, with table of rejected rows
+	_rowBatch						= None										# Valid rows, as a columnar batch
+	_rowBatchFiltered				= None										# Valid rows matching date range, as a columnar batch
+	_statusRows						= None										# List of valid data rows, as Observation records (built on request)
+	_statusRowsFiltered				= None										# List of data rows matching date range, as Observation records (built on request)
+	_rowCt							= 0											# Count of rows read from source
+	_rowGoodCt						= 0											# Count of valid rows read from source
+	_rowMatchCt						= 0											# Count of valid rows read from source matching filter
+
+	#
+	# Constructor
+	#
+	def __init__(self,runConfig=None):
+		self._runConfig = activeRunConfig(runConfig)
+		self._InitData()
+
+	#
+	# Methods (private)
+	#
+	def _InitData(self):
+		self._firstRowNos				= {}									# Initialize first row numbers of row sets
+		self._rowValidator				= RowValidator()						# Initialize validator and its reject table
+		self._rowBatch					= RowBatch()							# Initialize batch of valid rows
+		self._rowBatchFiltered			= RowBatch()							# Initialize batch of valid rows filtered by date
+		self._statusRows				= None									# Observation records, built on request
+		self._statusRowsFiltered		= None									# Observation records, built on request
+		self._rowCt						= 0										# Count of rows read from source
+		self._rowGoodCt					= 0										# Count of valid rows read from source
+		self._rowMatchCt				= 0										# Count of valid rows read from source matching filter
+
+	#
+	# Methods (public)
+	#
+	def FetchRows(self):														# Get raw rows from source. (archetype)
+		raise NotImplementedError("{}.FetchRows".format(type(self).__name__))
+
+	def FetchRowSets(self):														# Get raw rows from source, as list of (sourceTag, rows). Single untagged set by default.
+		return [(None, self.FetchRows())]
+
+	def GetData(self):
+		success = True
+		barfd("RowSource.GetData.enter(source=%s)", self._sourceText)
+
+		self._InitData()															# Initialize data
+		rawRowSets = [(sourceTag,sourceRows) for sourceTag,sourceRows in self.FetchRowSets() if sourceRows]	# Get rows of data from the source. Raw rows are let go once batched.
+		if not rawRowSets:															# Puke if no data returned
+			raise EnvironmentError("ERROR: No {} data found at all.".format(self._sourceText))
+
+		for rowNo,sourceRow in enumerate(rawRowSets[0][1][:5]): barfd("row(%s): %s", rowNo+1,sourceRow)
+		for sourceTag,sourceRows in rawRowSets:										# Validate rows a column at a time, keeping the valid ones in the batch
+			sourceColumns,keepMask = self._rowValidator.Validate(sourceRows,sourceTag,self._firstRowNos.get(sourceTag,1))
+			self._rowBatch.AppendColumns(sourceColumns,keepMask,sourceTag)
+		rawRowSets = None
+		self._rowCt		= self._rowValidator.rowCt()
+		self._rowGoodCt	= self._rowCt - self._rowValidator.rejectCt()
+		self._rowValidator.Report()
+
+		self._rowBatchFiltered = self._rowBatch.Select(self._rowBatch.DateMask(self._runConfig.startDateOrd(),self._runConfig.endDateOrd()))	# Filter batch by date
+		self._rowMatchCt = self._rowBatchFiltered.rowCt()
+
+		barfd("RowSource.GetData.exit(rowsCt=%s,goodCt=%s,matchCt=%s)", self._rowCt, self._rowGoodCt, self._rowMatchCt)
+
+		return success
+
+	def Close(self):
+		barfd("RowSource.Close.enter()")
+		self._rowBatch					= None
+		self._rowBatchFiltered			= None
+		self._statusRows				= None
+		self._statusRowsFiltered		= None
+		barfd("RowSource.Close.exit()")
+		return True
+
+	#
+	# Properties (public)
+	#
+	def sourceText(self):														# Description of source
+		return self._sourceText
+
+	def runConfig(self):
+		return self._runConfig
+
+	def replaysDetail(self):													# Whether source rows came from Detail CSVs (no need to rewrite them)
+		return False
+
+	def hasAllRows(self):														# Whether rows fetched are all of the source's rows, not just those of a date range
+		return True
+
+	def statusRows(self):														# Valid rows, as list of Observation records
+		if self._statusRows is None: self._statusRows = self._rowBatch.Observations()
+		return self._statusRows
+
+	def statusRowsFiltered(self):												# Rows filtered by date, as list of Observation records
+		if self._statusRowsFiltered is None: self._statusRowsFiltered = self._rowBatchFiltered.Observations()
+		return self._statusRowsFiltered
+
+	def rowValidator(self):														# Validator of last GetData, with its table of rejected rows
+		return self._rowValidator
+
+	def rowBatch(self):															# Valid rows, as a columnar batch
+		return self._rowBatch
+
+	def rowBatchFiltered(self):													# Rows filtered by date, as a columnar batch
+		return self._rowBatchFiltered
+
+	def dataCube(self):															# Data cube of all valid rows, if the source keeps one
+		return None
+
+	def rowCt(self):
+		return self._rowCt
+
+	def rowGoodCt(self):
+		return self._rowGoodCt
+
+	def rowMatchCt(self):
+		return self._rowMatchCt
+
+#
+# Detail CSV Row Source
+#	Replays Detail CSVs written by DetailWriter, one file per day of the date range
+#
+class DetailCsvRowSource(RowSource):
+
+	_sourceText						= 'detail CSV'
+
+	#
+	# Methods (public)
+	#
+	def FetchRows(self):
+		barfd("DetailCsvRowSource.FetchRows.enter()")
+		detailRows = []
+		detailDateTS = self._runConfig.startDateTS()
+		deltaOneDay = timedelta(days=1)
+
+		for dayNo in range(self._runConfig.nDays()):
+			detailDateYmd = detailDateTS.strftime(AppSettings.FORMAT_YMD)
+			detailSpec = AppSettings.glob().detailCsvTemplate().replace(AppSettings.TEMPLATE_DATE_TOKEN,detailDateYmd)
+			if os.path.isfile(detailSpec):
+				with open(detailSpec, 'r', newline='') as fhCsv:
+					csvReader = csv.reader(fhCsv)
+					next(csvReader, None)											# Skip header
+					for csvRow in csvReader:
+						if csvRow and csvRow[-1] == '': csvRow.pop()				# DetailWriter leaves a trailing separator
+						if csvRow: detailRows.append(csvRow)
+				barfd("DetailCsvRowSource.FetchRows(file=%s,rowsSoFar=%s)", detailSpec,len(detailRows))
+			else:
+				barfd("DetailCsvRowSource.FetchRows(missing=%s)", detailSpec)
+			detailDateTS = detailDateTS + deltaOneDay
+
+		barfi("Detail replay complete. %s rows read.", len(detailRows))
+		return detailRows
+
+	#
+	# Properties (public)
+	#
+	def replaysDetail(self):
+		return True
+
+	def hasAllRows(self):														# Only the date range's Detail CSVs are read
+		return False
+
+#
+# Dump Row Source
+#	Reads a local dump of sheet rows. JSON dumps are either the sheet API result ({"values": [...]})
+#	or a bare list of rows. CSV dumps have one sheet row per line, with an optional header line.
+#
+class DumpRowSource(RowSource):
+
+	_sourceText						= 'dump file'
+
+	# Properties (private)
+	_dumpSpec						= None										# File spec of dump
+
+	#
+	# Constructor
+	#
+	def __init__(self,dumpSpec,runConfig=None):
+		super(DumpRowSource,self).__init__(runConfig)
+		self._dumpSpec = dumpSpec
+
+	#
+	# Methods (private)
+	#
+	def _ReadJson(self):
+		with open(self._dumpSpec, 'r') as fhJson:
+			dumpData = json.load(fhJson)
+		if isinstance(dumpData, dict): dumpData = dumpData.get('values', [])
+		return dumpData
+
+	def _ReadCsv(self):
+		with open(self._dumpSpec, 'r', newline='') as fhCsv:
+			csvRows = list(csv.reader(fhCsv))
+		if csvRows and csvRows[0] and DateParser().ParseDate(csvRows[0][0]).isBadDate():
+			csvRows = csvRows[1:]													# Skip header line
+		return csvRows
+
+	#
+	# Methods (public)
+	#
+	def FetchRows(self):
+		barfd("DumpRowSource.FetchRows.enter(file=%s)", self._dumpSpec)
+		if not os.path.isfile(self._dumpSpec):
+			raise EnvironmentError("ERROR: Dump file not found ({})".format(self._dumpSpec))
+
+		if self._dumpSpec.lower().endswith('.json'):	dumpRows = self._ReadJson()
+		else:											dumpRows = self._ReadCsv()
+
+		sourceRows = []
+		for dumpRow in dumpRows:													# Cell text, the same as the sheet service returns. Numbers (unformatted dumps) are kept.
+			sourceRows.append(['' if cell is None else cell if isinstance(cell,(int,float)) else str(cell) for cell in dumpRow])
+		barfd("DumpRowSource.FetchRows.exit(rows=%s)", len(sourceRows))
+		return sourceRows
+
+#
+# Cube Row Source
+#	Reads a data cube saved by --tally cube. No rows are fetched. County stats of the date range
+#	come from the cube, and row counts are the cube's.
+#
+class CubeRowSource(RowSource):
+
+	_sourceText						= 'data cube'
+
+	# Properties (private)
+	_cubeSpec						= None										# File spec of cube
+	_dataCube						= None										# Cube, once loaded
+
+	#
+	# Constructor
+	#
+	def __init__(self,cubeSpec,runConfig=None):
+		super(CubeRowSource,self).__init__(runConfig)
+		self._cubeSpec = cubeSpec
+
+	#
+	# Methods (public)
+	#
+	def GetData(self):
+		barfd("CubeRowSource.GetData.enter(file=%s)", self._cubeSpec)
+		self._InitData()
+		self._dataCube = DataCube.Load(self._cubeSpec)
+		if self._dataCube.zombiesEnabled() != self._runConfig.zombiesEnabled():	# Weights, so scores and codes, depend on zombie mode
+			raise UserError("ERROR: Data cube {} was built {} --zombies. Run with the same setting.".format(self._cubeSpec, 'with' if self._dataCube.zombiesEnabled() else 'without'))
+		barfi("Data cube read. %s rows, %s to %s.", self._dataCube.rowCt(), Observation.DateYmd(self._dataCube.firstDayOrd()),
+				Observation.DateYmd(self._dataCube.firstDayOrd() + max(self._dataCube.dayCt() - 1, 0)))
+		self._rowCt			= self._dataCube.rowCt()
+		self._rowGoodCt		= self._dataCube.rowCt()
+		self._rowMatchCt	= self._dataCube.ObservationCt(self._runConfig.startDateOrd(),self._runConfig.endDateOrd())
+		barfd("CubeRowSource.GetData.exit(rowsCt=%s,matchCt=%s)", self._rowCt, self._rowMatchCt)
+		return True
+
+	def Close(self):
+		if not self._dataCube is None: self._dataCube.Close()
+		self._dataCube = None
+		return super(CubeRowSource,self).Close()
+
+	#
+	# Properties (public)
+	#
+	def replaysDetail(self):													# No rows to write detail of
+		return True
+
+	def hasAllRows(self):														# No rows at all
+		return False
+
+	def dataCube(self):
+		return self._dataCube
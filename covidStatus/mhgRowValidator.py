@@ -0,0 +1,171 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRowValidator.py
+#
+# Description
+#
+#   Batch row validator. Decodes a set of raw source rows a column at a time, and evaluates
+#   every validation rule as a byte mask over the rows:
+#
+#       missing intel date, intel date out of range, missing site, missing county,
+#       unknown impact code, non-numeric count
+#
+#   Cell values are decoded and tested once per distinct value, then mapped over the column,
+#   so no per-row Python objects or message strings are built. Rejected rows are kept in a
+#   compact table of row numbers by source tab and reason, reported once per run.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import sys
+from array				import array
+from datetime			import datetime
+from itertools			import compress
+from itertools			import zip_longest
+
+# MHGLIB includes
+from mhgDataField		import DataField
+from mhgDateParser		import DateParser
+from mhgImpact			import Impact
+from mhgStatusRow		import StatusRow
+from mhgUtility			import *
+
+class RowValidator(object):
+
+	# Reject reasons (public)
+	REJECT_MISSING_DATE		= 'Missing intel date'
+	REJECT_DATE_RANGE		= 'Intel date out of range'
+	REJECT_MISSING_SITE		= 'Missing reporting site'
+	REJECT_MISSING_COUNTY	= 'Missing county'
+	REJECT_IMPACT_CODE		= 'Unknown impact code'
+	REJECT_COUNT			= 'Non-numeric count'
+	REJECT_REASONS			= ( REJECT_MISSING_DATE, REJECT_DATE_RANGE, REJECT_MISSING_SITE, REJECT_MISSING_COUNTY, REJECT_IMPACT_CODE, REJECT_COUNT )
+
+	# Constants (private)
+	_DATE_FLOOR				= '2020.01.01'										# Earliest intel date accepted. Latest is today.
+	_IMPACT_CODES			= frozenset(( '', Impact.IMPACT_CODE_AVAILABLE, Impact.IMPACT_CODE_MODERATE, Impact.IMPACT_CODE_SEVERE,
+											Impact.IMPACT_CODE_UNKNOWN, Impact.IMPACT_CODE_ZOMBIES ))	# Impact codes accepted, less surrounding blanks, in any case
+	_IMPACT_COLUMNS			= ( StatusRow._GSHT_UTILITIES, StatusRow._GSHT_SERVICES, StatusRow._GSHT_CONSUMABLES )
+	_COUNT_COLUMNS			= ( StatusRow._GSHT_2M_CHECKINS, StatusRow._GSHT_2M_PARTICIPATE, StatusRow._GSHT_HF_CHECKINS, StatusRow._GSHT_HF_PARTICIPATE )
+	_REPORT_ROW_NOS			= 10												# Row numbers listed per reason in the info report
+	_TYPE_ROW_NO			= 'I'												# uint32 row number
+	_NOT_TABLE				= bytes([1]) + bytes(255)							# Byte translation of mask to its inverse
+
+	# Properties (private)
+	_dateCeiling			= None												# Latest intel date accepted
+	_rejectTable			= None												# List of (sourceTag, reason, row numbers)
+	_rowCt					= 0													# Rows validated
+	_rejectCt				= 0													# Rows rejected, for any number of reasons
+
+	#
+	# Constructor
+	#
+	def __init__(self):
+		self._dateCeiling	= datetime.now().strftime(AppSettings.FORMAT_YMD)
+		self._rejectTable	= []
+		self._rowCt			= 0
+		self._rejectCt		= 0
+
+	#
+	# Methods (private)
+	#
+	def _DateValue(self,cellValue):												# yyyy.mm.dd of a date cell, None if not a date
+		if isinstance(cellValue,(int,float)):	return DateParser.SerialDateYMD(cellValue)
+		return DateParser().ParseDate(cellValue).dateYMD()
+
+	def _CountValue(self,cellValue):											# Count of a numeric cell, None if not a number
+		try:
+			return nullz(cellValue)
+		except (ValueError,AttributeError):
+			return None
+
+	def _Decoded(self,column,dataType):											# Column of cell values as StatusRow decodes them, each distinct value decoded once
+		cellValues = set(column)
+		if dataType == DataField.DTYPE_TEXT:
+			if not any(isinstance(cellValue,(int,float)) for cellValue in cellValues): return list(column)
+			return [str(cellValue) if isinstance(cellValue,(int,float)) else cellValue for cellValue in column]
+		if dataType == DataField.DTYPE_DATE:	decodeValue = self._DateValue
+		else:									decodeValue = self._CountValue
+		decodedValues = { cellValue: decodeValue(cellValue) for cellValue in cellValues }
+		return list(map(decodedValues.__getitem__, column))
+
+	def _Mask(self,column,isBad):												# Byte mask of rows whose value fails, each distinct value tested once
+		badValues = { columnValue: isBad(columnValue) for columnValue in set(column) }
+		return bytes(map(badValues.__getitem__, column))
+
+	def _AnyMask(self,rowMasks):												# Byte mask of rows set in any of the masks. Masks are OR'd as big integers, in C.
+		anyBits = 0
+		for rowMask in rowMasks: anyBits |= int.from_bytes(rowMask,'big')
+		return anyBits.to_bytes(len(rowMasks[0]),'big')
+
+	def _IsMissing(self,columnValue):
+		return columnValue is None
+
+	def _IsBlank(self,textValue):
+		return textValue is None or str(textValue).strip() == ""
+
+	def _IsBadDate(self,dateYmd):
+		return not dateYmd is None and not isBetween(dateYmd,self._DATE_FLOOR,self._dateCeiling)
+
+	def _IsBadCode(self,impactCode):
+		return impactCode is None or not impactCode.strip().upper() in self._IMPACT_CODES
+
+	#
+	# Methods (public)
+	#
+	def Validate(self,sourceRows,sourceTag=None,firstRowNo=1):					# Decode and validate a set of raw rows, the first being source row firstRowNo (sheet row, for sheets).
+																				#    Returns (decoded columns in StatusRow column order, keep mask).
+		rowCt		= len(sourceRows)
+		columnCt	= len(StatusRow._GSHT_METADATA)
+		columns		= list(zip_longest(*sourceRows, fillvalue=''))[:columnCt] if rowCt else []
+		columns		+= [('',) * rowCt] * (columnCt - len(columns))					# Columns no row reaches
+		columns		= [self._Decoded(column, StatusRow._GSHT_METADATA[columnId][StatusRow._COL_DTYPE]) for columnId,column in enumerate(columns)]
+
+		dates		= columns[StatusRow._GSHT_DATE]
+		reasonMasks	= [ (self.REJECT_MISSING_DATE,		self._Mask(dates, self._IsMissing)),
+						(self.REJECT_DATE_RANGE,		self._Mask(dates, self._IsBadDate)),
+						(self.REJECT_MISSING_SITE,		self._Mask(columns[StatusRow._GSHT_SITE], self._IsBlank)),
+						(self.REJECT_MISSING_COUNTY,	self._Mask(columns[StatusRow._GSHT_COUNTY], self._IsBlank)),
+						(self.REJECT_IMPACT_CODE,		self._AnyMask([self._Mask(columns[columnId], self._IsBadCode) for columnId in self._IMPACT_COLUMNS])),
+						(self.REJECT_COUNT,				self._AnyMask([self._Mask(columns[columnId], self._IsMissing) for columnId in self._COUNT_COLUMNS])) ]
+
+		rejectMask	= self._AnyMask([rowMask for reason,rowMask in reasonMasks])
+		rejectCt	= rejectMask.count(1)
+		for reason,rowMask in reasonMasks:											# Source row numbers, counted from the set's first row
+			if 1 in rowMask: self._rejectTable.append( (sourceTag, reason, array(self._TYPE_ROW_NO, compress(range(firstRowNo,firstRowNo+rowCt), rowMask))) )
+
+		self._rowCt		+= rowCt
+		self._rejectCt	+= rejectCt
+		barfd("RowValidator.Validate(tab=%s,rows=%s,rejects=%s)", sourceTag, rowCt, rejectCt)
+		return columns, rejectMask.translate(self._NOT_TABLE)
+
+	def Report(self):															# Info report of rejects, once per run
+		if self._rejectCt == 0: return True
+		barfi("%s of %s rows rejected.", self._rejectCt, self._rowCt)
+		for sourceTag,reason,rowNos in self._rejectTable:
+			moreText = " ..." if len(rowNos) > self._REPORT_ROW_NOS else ""
+			barfi("  %s%s: %s rows (%s%s)", '' if sourceTag is None else sourceTag + ' ', reason, len(rowNos),
+					' '.join(map(str, rowNos[:self._REPORT_ROW_NOS])), moreText)
+		return True
+
+	#
+	# Getters
+	#
+	def rejectTable(self):														# List of (sourceTag, reason, row numbers). Don't change it.
+		return self._rejectTable
+
+	def rejectCt(self,reason=None):												# Rows rejected, or rejections for a reason
+		if reason is None: return self._rejectCt
+		return sum(len(rowNos) for sourceTag,rejectReason,rowNos in self._rejectTable if rejectReason == reason)
+
+	def rowCt(self):
+		return self._rowCt
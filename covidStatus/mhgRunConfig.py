@@ -0,0 +1,228 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgRunConfig.py
+#
+# Description
+#
+#   Run configuration. Read-only snapshot of what a run does, built once from the parsed
+#   command options: date range (as yyyy.mm.dd, timestamps and day ordinals), output flags,
+#   zombie mode and log level. Stats, row sources and writers are handed one explicitly, so
+#   more than one configuration can be used in a process. The one built from the command line
+#   is the current configuration, used by the barf helpers and anything not handed one.
+#   A --windows run has a configuration per report window, made from the current one.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+from datetime			import datetime
+from datetime			import timedelta
+
+class RunConfig(object):
+
+	# Log level constants (public)
+	LOG_QUIET				= 0													# Nothing but warnings and errors
+	LOG_INFO				= 1													# Progress info
+	LOG_DEBUG				= 2													# Debug info
+	LOG_TRACE				= 3													# Trace info
+
+	# Constants (private)
+	_FORMAT_YMD				= '%Y.%m.%d'										# yyyy.mm.dd format
+
+	# Current configuration (private)
+	_current				= None												# Configuration of the run, as set by AppSettings
+
+	# Properties (private)
+	_isFrozen				= False												# Set once constructed. Configuration is read-only after that.
+	_startDate				= None												# Date range, yyyy.mm.dd
+	_endDate				= None
+	_startDateTS			= None												# Date range, timestamps
+	_endDateTS				= None
+	_startDateOrd			= None												# Date range, day ordinals
+	_endDateOrd				= None
+	_nDays					= None												# Days in range, as given on the command line
+	_captureDetail			= None												# Output flags
+	_generateSummary		= None
+	_generateProject		= None
+	_generatePdf			= None
+	_generateImage			= None
+	_zombiesEnabled			= None												# Zombie mode
+	_infoEnabled			= None												# Log levels enabled
+	_debugEnabled			= None
+	_traceEnabled			= None
+	_refreshData			= None												# Row source settings
+	_unformattedValues		= None
+	_rowSource				= None
+	_sourceFile				= None
+	_tallyEngine			= None												# County stats tally engine (AppCommandArgs.TALLY_). None for batch.
+	_windows				= None												# Report window day counts (--windows). None for one report of the range.
+	_windowDays				= None												# Day count of this report window. None if not a window.
+
+	#
+	# Constructor
+	#
+	def __init__(self,startDate,endDate,nDays=None,captureDetail=True,generateSummary=True,generateProject=True,generatePdf=True,generateImage=True,
+					zombiesEnabled=False,infoEnabled=False,debugEnabled=False,traceEnabled=False,refreshData=False,unformattedValues=False,rowSource=None,sourceFile=None,tallyEngine=None,
+					windows=None,windowDays=None):
+		self._startDate			= startDate
+		self._endDate			= endDate
+		self._startDateTS		= datetime.strptime(startDate,self._FORMAT_YMD)
+		self._endDateTS			= datetime.strptime(endDate,self._FORMAT_YMD)
+		self._startDateOrd		= self._startDateTS.toordinal()
+		self._endDateOrd		= self._endDateTS.toordinal()
+		self._nDays				= self._endDateOrd - self._startDateOrd + 1 if nDays is None else nDays
+		self._captureDetail		= captureDetail
+		self._generateSummary	= generateSummary
+		self._generateProject	= generateProject
+		self._generatePdf		= generatePdf
+		self._generateImage		= generateImage
+		self._zombiesEnabled	= zombiesEnabled
+		self._infoEnabled		= infoEnabled or debugEnabled									# Debug implies info, as with command options
+		self._debugEnabled		= debugEnabled
+		self._traceEnabled		= traceEnabled
+		self._refreshData		= refreshData
+		self._unformattedValues	= unformattedValues
+		self._rowSource			= rowSource
+		self._sourceFile		= sourceFile
+		self._tallyEngine		= tallyEngine
+		self._windows			= windows
+		self._windowDays		= windowDays
+		self._isFrozen			= True
+
+	def __setattr__(self,name,value):												# Configurations are shared by reference, so they can't change
+		if self._isFrozen: raise AttributeError("Run configuration is read-only ({})".format(name))
+		super(RunConfig,self).__setattr__(name,value)
+
+	#
+	# Methods (class public)
+	#
+	def FromOptions(appOptions):													# Configuration from parsed command options (AppCommandArgs)
+		return RunConfig( appOptions.startDate(), appOptions.endDate(), nDays=appOptions.nDays(),
+							captureDetail=appOptions.captureDetail(), generateSummary=appOptions.generateSummary(),
+							generateProject=appOptions.generateProject(), generatePdf=appOptions.generatePdf(),
+							generateImage=appOptions.generateImage(), zombiesEnabled=appOptions.zombiesEnabled(),
+							infoEnabled=appOptions.infoEnabled(), debugEnabled=appOptions.debugEnabled(),
+							traceEnabled=appOptions.traceEnabled(), refreshData=appOptions.refreshData(),
+							unformattedValues=appOptions.unformattedValues(), rowSource=appOptions.rowSource(),
+							sourceFile=appOptions.sourceFile(), tallyEngine=appOptions.tallyEngine(), windows=appOptions.windows() )
+
+	def Current():																	# Current configuration. None until AppSettings builds it.
+		return RunConfig._current
+
+	def SetCurrent(runConfig):
+		RunConfig._current = runConfig
+
+	#
+	# Methods (public)
+	#
+	def WindowConfigs(self):														# Configuration of each report window, ending on the end date. Just this one, without windows.
+		if self._windows is None: return [self]
+		windowConfigs = []
+		for windowDays in self._windows:
+			startDate = (self._endDateTS - timedelta(days=windowDays - 1)).strftime(self._FORMAT_YMD)
+			windowConfigs.append( RunConfig( startDate, self._endDate, nDays=windowDays,
+							captureDetail=self._captureDetail, generateSummary=self._generateSummary,
+							generateProject=self._generateProject, generatePdf=self._generatePdf,
+							generateImage=self._generateImage, zombiesEnabled=self._zombiesEnabled,
+							infoEnabled=self._infoEnabled, debugEnabled=self._debugEnabled,
+							traceEnabled=self._traceEnabled, refreshData=self._refreshData,
+							unformattedValues=self._unformattedValues, rowSource=self._rowSource,
+							sourceFile=self._sourceFile, tallyEngine=self._tallyEngine, windowDays=windowDays ) )
+		return windowConfigs
+
+	#
+	# Getters
+	#
+	def startDate(self):
+		return self._startDate
+
+	def endDate(self):
+		return self._endDate
+
+	def startDateTS(self):
+		return self._startDateTS
+
+	def endDateTS(self):
+		return self._endDateTS
+
+	def startDateOrd(self):
+		return self._startDateOrd
+
+	def endDateOrd(self):
+		return self._endDateOrd
+
+	def nDays(self):
+		return self._nDays
+
+	def isDateRange(self):
+		return self._startDate != self._endDate
+
+	def filterRangeText(self):
+		if self.isDateRange():	return "{} to {}".format(self._startDate,self._endDate)
+		return self._endDate
+
+	def captureDetail(self):
+		return self._captureDetail
+
+	def generateSummary(self):
+		return self._generateSummary
+
+	def generateProject(self):
+		return self._generateProject
+
+	def generatePdf(self):
+		return self._generatePdf
+
+	def generateImage(self):
+		return self._generateImage
+
+	def zombiesEnabled(self):
+		return self._zombiesEnabled
+
+	def logLevel(self):																# Most verbose log level enabled
+		if self._traceEnabled:	return self.LOG_TRACE
+		if self._debugEnabled:	return self.LOG_DEBUG
+		if self._infoEnabled:	return self.LOG_INFO
+		return self.LOG_QUIET
+
+	def infoEnabled(self):
+		return self._infoEnabled
+
+	def debugEnabled(self):
+		return self._debugEnabled
+
+	def traceEnabled(self):
+		return self._traceEnabled
+
+	def refreshData(self):
+		return self._refreshData
+
+	def unformattedValues(self):
+		return self._unformattedValues
+
+	def rowSource(self):
+		return self._rowSource
+
+	def sourceFile(self):
+		return self._sourceFile
+
+	def tallyEngine(self):
+		return self._tallyEngine
+
+	def windows(self):
+		return self._windows
+
+	def windowDays(self):
+		return self._windowDays
+
+	def fileTag(self):																# Output file name tag. End date, and window days of a report window.
+		if self._windowDays is None: return self._endDate
+		return "{}-{}d".format(self._endDate,self._windowDays)
@@ -0,0 +1,168 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgSheetCache.py
+#
+# Description
+#
+#   On-disk snapshot cache of raw spreadsheet 'values' payloads. Entries are keyed by
+#   spreadsheet ID and range, stamped with the sheet's modified time and revision, and
+#   evicted by age and total size. Entries also record the row count and a hash of the
+#   last few rows, so an append-only sheet can be topped up with just its new rows.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import glob
+import hashlib
+import json
+import os
+import os.path
+import time
+
+# MHGLIB includes
+from mhgAppSettings		import AppSettings
+from mhgUtility			import *
+
+class SheetCache(object):														# Snapshot cache of a sheet range
+
+	# Cache entry keys (private)
+	_KEY_SHEET_ID				= 'spreadsheetId'								# Spreadsheet identifier
+	_KEY_RANGE					= 'range'										# Spreadsheet range
+	_KEY_RENDER					= 'valueRender'									# Value render option (None for formatted)
+	_KEY_MODIFIED				= 'modifiedTime'								# Sheet modified time when snapshot was taken
+	_KEY_VERSION				= 'version'										# Sheet revision when snapshot was taken
+	_KEY_FETCHED				= 'fetched'										# Epoch time snapshot was taken
+	_KEY_ROW_COUNT				= 'rowCount'									# Number of rows in snapshot
+	_KEY_TAIL_ROWS				= 'tailRows'									# Number of trailing rows hashed
+	_KEY_TAIL_HASH				= 'tailHash'									# Hash of trailing rows
+	_KEY_VALUES					= 'values'										# Raw values payload
+
+	# Properties (private)
+	_spreadsheet_id				= None											# Google spreadsheet identifier string
+	_spreadsheet_range			= None											# Range cached
+	_valueRender				= None											# Value render option of cached values
+	_cacheSpec					= None											# File spec of cache entry
+	_entry						= None											# Loaded cache entry
+
+	#
+	# Constructor
+	#
+	def __init__(self,spreadsheetId,spreadsheetRange,valueRender=None):
+		self._spreadsheet_id	= spreadsheetId
+		self._spreadsheet_range	= spreadsheetRange
+		self._valueRender		= valueRender
+		self._cacheSpec			= AppSettings.glob().sheetCacheTemplate().replace(AppSettings.TEMPLATE_KEY_TOKEN,SheetCache.CacheKey(spreadsheetId,spreadsheetRange,valueRender))
+		self._entry				= None
+
+	#
+	# Methods (public)
+	#
+	def Load(self):																# Load cache entry from disk. Returns True if an entry was found.
+		self._entry = None
+		if os.path.isfile(self._cacheSpec):
+			try:
+				with open(self._cacheSpec, 'r') as fhCache:
+					entry = json.load(fhCache)
+				if entry.get(self._KEY_SHEET_ID) == self._spreadsheet_id and entry.get(self._KEY_RANGE) == self._spreadsheet_range and \
+						entry.get(self._KEY_RENDER) == self._valueRender:
+					self._entry = entry
+			except (OSError, ValueError) as err:								# Unreadable entry is treated as a miss
+				barfi("Sheet cache entry unreadable, ignoring. File=%s (%s)", self._cacheSpec,err)
+		barfd("SheetCache.Load(file=%s,hit=%s)", self._cacheSpec,not self._entry is None)
+		return not self._entry is None
+
+	def IsCurrent(self,modifiedTime,version):									# Test whether loaded entry matches the sheet's current modified time/revision
+		if self._entry is None: return False
+		if modifiedTime is None and version is None: return False
+		isCurrent = True
+		if not version is None:			isCurrent = isCurrent and self._entry.get(self._KEY_VERSION) == version
+		if not modifiedTime is None:	isCurrent = isCurrent and self._entry.get(self._KEY_MODIFIED) == modifiedTime
+		return isCurrent
+
+	def Store(self,values,modifiedTime,version):								# Write a snapshot of values to disk
+		tailRows = min(AppSettings.glob().sheetOverlapRows(),len(values))
+		self._entry = { self._KEY_SHEET_ID:		self._spreadsheet_id,
+						self._KEY_RANGE:		self._spreadsheet_range,
+						self._KEY_RENDER:		self._valueRender,
+						self._KEY_MODIFIED:		modifiedTime,
+						self._KEY_VERSION:		version,
+						self._KEY_FETCHED:		time.time(),
+						self._KEY_ROW_COUNT:	len(values),
+						self._KEY_TAIL_ROWS:	tailRows,
+						self._KEY_TAIL_HASH:	SheetCache.RowsHash(values[len(values)-tailRows:]),
+						self._KEY_VALUES:		values }
+		workSpec = self._cacheSpec + '.tmp'										# Write to temp file and swap, so a killed run can't leave half an entry
+		with open(workSpec, 'w') as fhCache:
+			json.dump(self._entry, fhCache, separators=(',',':'))
+		os.replace(workSpec, self._cacheSpec)
+		barfd("SheetCache.Store(file=%s,rows=%s)", self._cacheSpec,len(values))
+		return True
+
+	#
+	# Methods (class public)
+	#
+	def CacheKey(spreadsheetId,spreadsheetRange,valueRender=None):				# Cache key from spreadsheet ID, range and value render option
+		keyText = "{}|{}".format(spreadsheetId,spreadsheetRange)
+		if not valueRender is None: keyText = "{}|{}".format(keyText,valueRender)	# Formatted keys unchanged, so existing snapshots stay good
+		return hashlib.sha1(keyText.encode('utf-8')).hexdigest()[:16]
+
+	def RowsHash(rows):															# Content hash of a list of rows
+		rowsText = json.dumps(rows, separators=(',',':'))
+		return hashlib.sha1(rowsText.encode('utf-8')).hexdigest()
+
+	def Evict():																# Drop entries past max age, then oldest entries until under max size
+		maxAgeSecs	= AppSettings.glob().sheetCacheMaxAgeDays() * 86400
+		maxBytes	= AppSettings.glob().sheetCacheMaxBytes()
+		cachePattern = AppSettings.glob().sheetCacheTemplate().replace(AppSettings.TEMPLATE_KEY_TOKEN,'*')
+		nowTime = time.time()
+
+		entries = []
+		for cacheSpec in glob.glob(cachePattern):
+			try:
+				cacheStat = os.stat(cacheSpec)
+			except OSError:
+				continue
+			if nowTime - cacheStat.st_mtime > maxAgeSecs:
+				barfd("SheetCache.Evict(expired=%s)", cacheSpec)
+				os.remove(cacheSpec)
+			else:
+				entries.append((cacheStat.st_mtime,cacheStat.st_size,cacheSpec))
+
+		totalBytes = sum(entry[1] for entry in entries)
+		for mtime,size,cacheSpec in sorted(entries):							# Oldest first
+			if totalBytes <= maxBytes: break
+			barfd("SheetCache.Evict(oversize=%s)", cacheSpec)
+			os.remove(cacheSpec)
+			totalBytes -= size
+		return True
+
+	#
+	# Properties (public)
+	#
+	def cacheSpec(self):
+		return self._cacheSpec
+
+	def values(self):															# Cached raw values payload
+		if self._entry is None: return None
+		return self._entry.get(self._KEY_VALUES)
+
+	def rowCount(self):															# Number of rows in snapshot
+		if self._entry is None: return 0
+		return self._entry.get(self._KEY_ROW_COUNT, len(self._entry.get(self._KEY_VALUES, [])))
+
+	def tailRows(self):															# Number of trailing rows covered by tailHash
+		if self._entry is None: return 0
+		return self._entry.get(self._KEY_TAIL_ROWS, 0)
+
+	def tailHash(self):															# Hash of trailing rows
+		if self._entry is None: return None
+		return self._entry.get(self._KEY_TAIL_HASH)
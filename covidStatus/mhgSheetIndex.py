@@ -0,0 +1,167 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgSheetIndex.py
+#
+# Description
+#
+#   Persistent date -> row span index over a sheet range. DailyData is entered in date order,
+#   so the rows for a date range are one short span of the sheet. The index records, for each
+#   intel date, the first and last row offsets (from the top of the range) holding that date,
+#   plus a hash of each of those rows. GoogleSheet uses it to fetch only the rows covering a
+#   report's date range, after checking the span's edge rows still hash the same.
+#
+#   The index also records the sheet revision it was built from. It is only used while the
+#   sheet is still at that revision; once the sheet changes, the next fetch reads all rows
+#   (or tops up the snapshot) and the index is rebuilt from them.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import json
+import os
+import os.path
+
+# MHGLIB includes
+from mhgAppSettings		import AppSettings
+from mhgSheetCache		import SheetCache
+from mhgStatusRow		import StatusRow
+from mhgUtility			import *
+
+class SheetIndex(object):														# Date -> row span index of a sheet range
+
+	# Index entry keys (private)
+	_KEY_SHEET_ID				= 'spreadsheetId'								# Spreadsheet identifier
+	_KEY_RANGE					= 'range'										# Spreadsheet range
+	_KEY_RENDER					= 'valueRender'									# Value render option (None for formatted)
+	_KEY_MODIFIED				= 'modifiedTime'								# Sheet modified time when rows were indexed
+	_KEY_VERSION				= 'version'										# Sheet revision when rows were indexed
+	_KEY_ROW_COUNT				= 'rowCount'									# Number of rows indexed
+	_KEY_DATES					= 'dates'										# yyyy.mm.dd -> [firstRow, lastRow, firstHash, lastHash]
+
+	# Date entry columns (private)
+	_DATE_FIRST_ROW				= 0
+	_DATE_LAST_ROW				= 1
+	_DATE_FIRST_HASH			= 2
+	_DATE_LAST_HASH				= 3
+
+	# Properties (private)
+	_spreadsheet_id				= None											# Google spreadsheet identifier string
+	_spreadsheet_range			= None											# Range indexed
+	_valueRender				= None											# Value render option of indexed values
+	_indexSpec					= None											# File spec of index
+	_entry						= None											# Loaded or built index
+
+	#
+	# Constructor
+	#
+	def __init__(self,spreadsheetId,spreadsheetRange,valueRender=None):
+		self._spreadsheet_id	= spreadsheetId
+		self._spreadsheet_range	= spreadsheetRange
+		self._valueRender		= valueRender
+		self._indexSpec			= AppSettings.glob().sheetIndexTemplate().replace(AppSettings.TEMPLATE_KEY_TOKEN,SheetCache.CacheKey(spreadsheetId,spreadsheetRange,valueRender))
+		self._entry				= None
+
+	#
+	# Methods (public)
+	#
+	def Load(self):																# Load index from disk. Returns True if an index was found.
+		self._entry = None
+		if os.path.isfile(self._indexSpec):
+			try:
+				with open(self._indexSpec, 'r') as fhIndex:
+					entry = json.load(fhIndex)
+				if entry.get(self._KEY_SHEET_ID) == self._spreadsheet_id and entry.get(self._KEY_RANGE) == self._spreadsheet_range and \
+						entry.get(self._KEY_RENDER) == self._valueRender:
+					self._entry = entry
+			except (OSError, ValueError) as err:								# Unreadable index is treated as a miss
+				barfi("Sheet index unreadable, ignoring. File=%s (%s)", self._indexSpec,err)
+		barfd("SheetIndex.Load(file=%s,hit=%s)", self._indexSpec,not self._entry is None)
+		return not self._entry is None
+
+	def IsCurrent(self,modifiedTime,version):									# Test whether loaded index was built at the sheet's current modified time/revision
+		if self._entry is None: return False
+		if modifiedTime is None and version is None: return False
+		isCurrent = True
+		if not version is None:			isCurrent = isCurrent and self._entry.get(self._KEY_VERSION) == version
+		if not modifiedTime is None:	isCurrent = isCurrent and self._entry.get(self._KEY_MODIFIED) == modifiedTime
+		return isCurrent
+
+	def Build(self,values,modifiedTime=None,version=None):						# Index rows by intel date. Rows without a good date are skipped.
+		dateRows = {}
+		for rowOffset,sheetRow in enumerate(values):
+			intelDate = StatusRow(sheetRow).intelDate().value()
+			if intelDate is None: continue
+			dateEntry = dateRows.get(intelDate)
+			if dateEntry is None:
+				dateRows[intelDate] = [rowOffset, rowOffset, None, None]
+			else:
+				dateEntry[self._DATE_LAST_ROW] = rowOffset
+		for dateEntry in dateRows.values():
+			dateEntry[self._DATE_FIRST_HASH]	= SheetCache.RowsHash([values[dateEntry[self._DATE_FIRST_ROW]]])
+			dateEntry[self._DATE_LAST_HASH]		= SheetCache.RowsHash([values[dateEntry[self._DATE_LAST_ROW]]])
+		self._entry = { self._KEY_SHEET_ID:		self._spreadsheet_id,
+						self._KEY_RANGE:		self._spreadsheet_range,
+						self._KEY_RENDER:		self._valueRender,
+						self._KEY_MODIFIED:		modifiedTime,
+						self._KEY_VERSION:		version,
+						self._KEY_ROW_COUNT:	len(values),
+						self._KEY_DATES:		dateRows }
+		barfd("SheetIndex.Build(rows=%s,dates=%s)", len(values),len(dateRows))
+		return True
+
+	def Store(self):															# Write index to disk
+		if self._entry is None: return False
+		workSpec = self._indexSpec + '.tmp'										# Write to temp file and swap, so a killed run can't leave half an index
+		with open(workSpec, 'w') as fhIndex:
+			json.dump(self._entry, fhIndex, separators=(',',':'))
+		os.replace(workSpec, self._indexSpec)
+		barfd("SheetIndex.Store(file=%s)", self._indexSpec)
+		return True
+
+	def SpanFor(self,startDate,endDate):										# Row span covering startDate..endDate
+		# Returns (firstRow, edgeChecks). The span runs from firstRow to the end of the sheet: rows
+		# entered since the index was built are appended after the last indexed row, whatever
+		# their date, so a span closed at an indexed row would drop them. edgeChecks is a list of
+		# (rowOffset, rowHash) that must still hold for the span to be good. None if the index
+		# can't place the range.
+		if self._entry is None: return None
+		dateRows = self._entry.get(self._KEY_DATES, {})
+		if not dateRows: return None
+		maxDate = max(dateRows.keys())
+
+		rangeRows = [dateRows[intelDate] for intelDate in dateRows.keys() if isBetween(intelDate,startDate,endDate)]
+		if rangeRows:
+			firstEntry	= min(rangeRows, key=lambda dateEntry: dateEntry[self._DATE_FIRST_ROW])
+			lastEntry	= max(rangeRows, key=lambda dateEntry: dateEntry[self._DATE_LAST_ROW])
+			edgeChecks	= [(firstEntry[self._DATE_FIRST_ROW],firstEntry[self._DATE_FIRST_HASH])]
+			firstRow	= firstEntry[self._DATE_FIRST_ROW]
+			lastRow		= lastEntry[self._DATE_LAST_ROW]
+			if lastRow != firstRow: edgeChecks.append((lastRow,lastEntry[self._DATE_LAST_HASH]))
+		elif startDate > maxDate:												# Range is past the index. Everything after the last indexed date.
+			lastEntry	= dateRows[maxDate]
+			edgeChecks	= [(lastEntry[self._DATE_LAST_ROW],lastEntry[self._DATE_LAST_HASH])]
+			firstRow	= lastEntry[self._DATE_LAST_ROW] + 1
+		else:																	# No indexed rows in range. Let a full fetch sort it out.
+			return None
+
+		barfd("SheetIndex.SpanFor(start=%s,end=%s,firstRow=%s)", startDate,endDate,firstRow)
+		return firstRow,edgeChecks
+
+	#
+	# Properties (public)
+	#
+	def indexSpec(self):
+		return self._indexSpec
+
+	def rowCount(self):															# Number of rows indexed
+		if self._entry is None: return 0
+		return self._entry.get(self._KEY_ROW_COUNT, 0)
@@ -0,0 +1,364 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgSheetStandIn.py
+#
+# Description
+#
+#   Local stand-in for the Google Sheets API, for offline, repeatable fetch benchmarks and
+#   regression runs. Serves spreadsheets.values.get and spreadsheets.values.batchGet (plus the
+#   Drive files.get revision call) from a fixture file or a synthetic row generator, with
+#   configurable latency, payload size and error injection. Injected errors fail a random
+#   fraction of requests, or the next few (FailNext), and 429/503 errors can carry Retry-After.
+#
+#   Point the app at it by setting MHGGIS_GOOGLE_ENDPOINT to the URL it prints. GoogleGoo then
+#   skips login and sends requests here. Google API discovery documents are not served; the
+#   client library's static documents (or those cached in the data folder) are used.
+#
+#   Fixtures are a JSON dump of sheet rows ({"values": [...]} or a bare list), a JSON object
+#   of tab name -> rows, or a CSV of rows. Sheet row 1 is a header; data starts at row 2,
+#   as on DailyData. Synthetic rows are laid out like DailyData, in date order, and are
+#   generated on demand from the row number, so large sheets take no memory.
+#
+# Usage:
+#
+#    mhgSheetStandIn.py [-h] [--port PORT] [--fixture FIXTURE] [--rows ROWS] [--days DAYS]
+#                       [--latency MS] [--errorrate RATE] [--errorstatus STATUS]
+#                       [--retryafter SECS] [--commentbytes N] [--seed SEED] [--verbose]
+#
+#    e.g.   mhgSheetStandIn.py --rows 100000 --latency 80 --errorrate 0.02
+#           set MHGGIS_GOOGLE_ENDPOINT=http://127.0.0.1:8089/
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New Module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import argparse
+import csv
+import json
+import random
+import re
+import threading
+import time
+from datetime			import date
+from datetime			import timedelta
+from http.server		import BaseHTTPRequestHandler
+from http.server		import ThreadingHTTPServer
+from urllib.parse		import parse_qs
+from urllib.parse		import unquote
+from urllib.parse		import urlparse
+
+# MHGLIB includes
+from mhgDateParser		import DateParser
+
+#
+# Request handler (private)
+#
+class _StandInHandler(BaseHTTPRequestHandler):
+
+	def do_GET(self):
+		urlParts = urlparse(self.path)
+		httpStatus,payload = self.server.standIn.Respond(unquote(urlParts.path),parse_qs(urlParts.query))
+		responseBody = json.dumps(payload, separators=(',',':')).encode('utf-8')
+		self.send_response(httpStatus)
+		self.send_header('Content-Type', 'application/json; charset=UTF-8')
+		retryAfterSecs = self.server.standIn.retryAfterSecs()
+		if httpStatus in SheetStandIn.RETRY_AFTER_STATUS and not retryAfterSecs is None: self.send_header('Retry-After', str(retryAfterSecs))
+		self.send_header('Content-Length', str(len(responseBody)))
+		self.end_headers()
+		self.wfile.write(responseBody)
+
+	def log_message(self,format,*args):
+		if self.server.standIn.verbose(): BaseHTTPRequestHandler.log_message(self,format,*args)
+
+#
+# Sheet Stand-in Server
+#
+class SheetStandIn(object):
+
+	# Constants
+	RETRY_AFTER_STATUS		= (429, 503)										# Error statuses sent with Retry-After, when set
+
+	# Constants (private)
+	_HEADER_ROW				= ['IntelDate','Site','County','UtilityImpact','ServicesImpact','ConsumablesImpact',
+								'2M Checkins','2M Participate','HF Checkins','HF Participate','Comments']
+	_NUMERIC_COLUMNS		= (6,7,8,9)											# Checkins/participate columns
+	_SYNTH_START_DATE		= date(2020,3,20)									# First intel date of synthetic rows
+	_SERIAL_EPOCH			= date(1899,12,30)									# Spreadsheet serial day 0
+	_SYNTH_COUNTIES			= ['Alcona','Allegan','Bay','Berrien','Calhoun','Chippewa','Eaton','Genesee','Grand Traverse',
+								'Houghton','Ingham','Jackson','Kalamazoo','Kent','Livingston','Macomb','Marquette',
+								'Midland','Monroe','Muskegon','Oakland','Ottawa','Saginaw','Washtenaw','Wayne']
+	_SYNTH_IMPACTS			= ['A','A','A','M','M','S','U','']					# Weighted toward all available
+	_RANGE_PATTERN			= re.compile("^(?:'?(.*?)'?!)?([A-Z]+)([0-9]*)(?::([A-Z]+)([0-9]*))?$")
+	_PATH_VALUES			= re.compile('^/v4/spreadsheets/([^/]+)/values/(.+)$')
+	_PATH_BATCH				= re.compile('^/v4/spreadsheets/([^/]+)/values:batchGet$')
+	_PATH_FILE				= re.compile('^/(?:drive/v3/)?files/([^/]+)$')
+
+	# Properties (private)
+	_host					= None												# Interface to listen on
+	_port					= None												# Port to listen on (0 for any free port)
+	_tabRows				= None												# Fixture tab name -> rows. None key for default tab.
+	_synthRows				= 0													# Number of synthetic rows (when no fixture)
+	_synthDays				= 0													# Days synthetic rows are spread over
+	_latencySecs			= 0.0												# Added to every response
+	_errorRate				= 0.0												# Fraction of requests failed
+	_errorStatus			= 503												# HTTP status of failed requests
+	_retryAfterSecs			= None												# Retry-After of 429/503 errors (None for none)
+	_failNextCt				= 0													# Requests still to fail, before random errors
+	_failNextStatus			= None												# HTTP status of those failures
+	_commentBytes			= 0													# Synthetic comment length, to pad payload size
+	_seed					= 0													# Synthetic data and error injection seed
+	_verbose				= False												# Log requests
+	_random					= None												# Error injection random source
+	_lock					= None												# Guards stats and random source
+	_version				= 0													# Sheet revision, bumped when data changes
+	_server					= None												# HTTP server
+	_thread					= None												# Server thread
+	_requestCt				= 0													# Requests served
+	_errorCt				= 0													# Errors injected
+	_rowsServed				= 0													# Rows returned
+
+	#
+	# Constructor
+	#
+	def __init__(self,fixtureSpec=None,synthRows=0,synthDays=365,latencyMs=0,errorRate=0.0,errorStatus=503,commentBytes=0,seed=1,port=0,host='127.0.0.1',verbose=False,retryAfterSecs=None):
+		self._host				= host
+		self._port				= port
+		self._tabRows			= None
+		self._synthRows			= synthRows
+		self._synthDays			= max(1,synthDays)
+		self._latencySecs		= latencyMs / 1000.0
+		self._errorRate			= errorRate
+		self._errorStatus		= errorStatus
+		self._retryAfterSecs	= retryAfterSecs
+		self._failNextCt		= 0
+		self._failNextStatus	= None
+		self._commentBytes		= commentBytes
+		self._seed				= seed
+		self._verbose			= verbose
+		self._random			= random.Random(seed)
+		self._lock				= threading.Lock()
+		self._version			= 1
+		self._requestCt			= 0
+		self._errorCt			= 0
+		self._rowsServed		= 0
+		if not fixtureSpec is None: self.LoadFixture(fixtureSpec)
+
+	#
+	# Methods (private)
+	#
+	def _ColumnIdx(self,columnLetters):											# A -> 0, K -> 10, AA -> 26
+		columnIdx = 0
+		for columnLetter in columnLetters: columnIdx = columnIdx * 26 + ord(columnLetter) - ord('A') + 1
+		return columnIdx - 1
+
+	def _DataRowCt(self,tabName):												# Number of data rows on a tab
+		if self._tabRows is None: return self._synthRows
+		return len(self._tabRows.get(tabName, self._tabRows.get(None, [])))
+
+	def _SynthRow(self,dataIdx,isUnformatted):									# Synthetic DailyData row, from its row number
+		rowHash = (dataIdx * 2654435761 + self._seed * 40503) & 0xffffffff		# Cheap, repeatable scramble of the row number
+		dayNo = dataIdx * self._synthDays // max(1,self._synthRows)
+		intelDate = self._SYNTH_START_DATE + timedelta(days=dayNo)
+		impactCt = len(self._SYNTH_IMPACTS)
+		sheetRow = [ (intelDate - self._SERIAL_EPOCH).days if isUnformatted else intelDate.strftime('%Y-%m-%d'),
+					 "site{}".format(rowHash % 97),
+					 self._SYNTH_COUNTIES[(rowHash >> 7) % len(self._SYNTH_COUNTIES)],
+					 self._SYNTH_IMPACTS[(rowHash >> 12) % impactCt],
+					 self._SYNTH_IMPACTS[(rowHash >> 15) % impactCt],
+					 self._SYNTH_IMPACTS[(rowHash >> 18) % impactCt],
+					 (rowHash >> 21) % 6,
+					 (rowHash >> 24) % 2,
+					 (rowHash >> 25) % 3,
+					 (rowHash >> 27) % 2,
+					 ('c' * self._commentBytes) ]
+		if not isUnformatted:
+			for columnId in self._NUMERIC_COLUMNS: sheetRow[columnId] = str(sheetRow[columnId])
+		return sheetRow
+
+	def _Unformatted(self,sheetRow):											# Fixture row as UNFORMATTED_VALUE/SERIAL_NUMBER would return it
+		sheetRow = list(sheetRow)
+		if sheetRow and isinstance(sheetRow[0],str):
+			parseResult = DateParser().ParseDate(sheetRow[0])
+			if not parseResult.isBadDate(): sheetRow[0] = (parseResult.dateTS().date() - self._SERIAL_EPOCH).days
+		for columnId in self._NUMERIC_COLUMNS:
+			if columnId < len(sheetRow) and isinstance(sheetRow[columnId],str) and sheetRow[columnId].strip().isdigit():
+				sheetRow[columnId] = int(sheetRow[columnId])
+		return sheetRow
+
+	def _DataRow(self,tabName,dataIdx,isUnformatted):
+		if self._tabRows is None: return self._SynthRow(dataIdx,isUnformatted)
+		sheetRow = self._tabRows.get(tabName, self._tabRows.get(None, []))[dataIdx]
+		if isUnformatted: return self._Unformatted(sheetRow)
+		return sheetRow
+
+	def _ValueRange(self,sheetRange,query):										# values resource for one range, e.g. DailyData!A2:K
+		rangeMatch = self._RANGE_PATTERN.match(sheetRange)
+		if rangeMatch is None: return None
+		tabName = rangeMatch.group(1)
+		isUnformatted = query.get('valueRenderOption',[''])[0] == 'UNFORMATTED_VALUE'
+		firstCol = self._ColumnIdx(rangeMatch.group(2))
+		lastCol = self._ColumnIdx(rangeMatch.group(4) or rangeMatch.group(2))
+		firstRow = int(rangeMatch.group(3) or 1)
+		lastRow = self._DataRowCt(tabName) + 1									# Row 1 is the header
+		if rangeMatch.group(5): lastRow = min(lastRow, int(rangeMatch.group(5)))
+
+		rangeRows = []
+		for sheetRowNo in range(firstRow, lastRow + 1):
+			if sheetRowNo == 1:	sheetRow = self._HEADER_ROW
+			else:				sheetRow = self._DataRow(tabName, sheetRowNo - 2, isUnformatted)
+			sheetRow = sheetRow[firstCol:lastCol + 1]
+			while sheetRow and sheetRow[-1] == '': sheetRow = sheetRow[:-1]		# Sheets drops trailing empty cells
+			rangeRows.append(sheetRow)
+
+		with self._lock:
+			self._rowsServed += len(rangeRows)
+		valueRange = { 'range': "{}!{}{}:{}{}".format(tabName or 'Sheet1',rangeMatch.group(2),firstRow,rangeMatch.group(4) or rangeMatch.group(2),lastRow),
+					   'majorDimension': 'ROWS' }
+		if rangeRows: valueRange['values'] = rangeRows
+		return valueRange
+
+	def _Error(self,httpStatus,message):										# Google API error payload
+		return httpStatus, { 'error': { 'code': httpStatus, 'message': message, 'status': 'UNAVAILABLE' if httpStatus >= 500 else 'INVALID_ARGUMENT' } }
+
+	#
+	# Methods (public)
+	#
+	def LoadFixture(self,fixtureSpec):											# Serve rows of a fixture file instead of synthetic rows
+		if fixtureSpec.lower().endswith('.json'):
+			with open(fixtureSpec, 'r') as fhJson:
+				fixtureData = json.load(fhJson)
+			if isinstance(fixtureData, list):			self._tabRows = { None: fixtureData }
+			elif 'values' in fixtureData:				self._tabRows = { None: fixtureData['values'] }
+			else:										self._tabRows = dict(fixtureData)
+		else:
+			with open(fixtureSpec, 'r', newline='') as fhCsv:
+				self._tabRows = { None: list(csv.reader(fhCsv)) }
+		with self._lock:
+			self._version += 1
+		return True
+
+	def SetSynthRows(self,synthRows,synthDays=None):							# Serve a different number of synthetic rows
+		self._tabRows = None
+		self._synthRows = synthRows
+		if not synthDays is None: self._synthDays = max(1,synthDays)
+		with self._lock:
+			self._version += 1
+		return True
+
+	def Respond(self,urlPath,query):											# Status and JSON payload for a request
+		if self._latencySecs > 0: time.sleep(self._latencySecs)
+		with self._lock:
+			self._requestCt += 1
+			errorStatus = self._errorStatus
+			if self._failNextCt > 0:
+				self._failNextCt -= 1
+				isFailed,errorStatus = True,self._failNextStatus
+			else:
+				isFailed = self._errorRate > 0 and self._random.random() < self._errorRate
+			if isFailed: self._errorCt += 1
+		if isFailed: return self._Error(errorStatus, "Injected failure")
+
+		pathMatch = self._PATH_BATCH.match(urlPath)
+		if not pathMatch is None:
+			valueRanges = [self._ValueRange(sheetRange,query) for sheetRange in query.get('ranges',[])]
+			if None in valueRanges: return self._Error(400, "Unable to parse range")
+			return 200, { 'spreadsheetId': pathMatch.group(1), 'valueRanges': valueRanges }
+
+		pathMatch = self._PATH_VALUES.match(urlPath)
+		if not pathMatch is None:
+			valueRange = self._ValueRange(pathMatch.group(2),query)
+			if valueRange is None: return self._Error(400, "Unable to parse range: {}".format(pathMatch.group(2)))
+			return 200, valueRange
+
+		pathMatch = self._PATH_FILE.match(urlPath)
+		if not pathMatch is None:
+			return 200, { 'modifiedTime': "2020-04-20T00:00:{:02d}.000Z".format(self._version % 60), 'version': str(self._version) }
+
+		return self._Error(404, "Not found: {}".format(urlPath))
+
+	def FailNext(self,failCt,errorStatus=None):									# Fail the next failCt requests, with errorStatus (default: error status set)
+		with self._lock:
+			self._failNextCt = failCt
+			self._failNextStatus = self._errorStatus if errorStatus is None else errorStatus
+		return True
+
+	def Start(self):															# Start serving on a background thread. Returns endpoint URL.
+		self._server = ThreadingHTTPServer((self._host, self._port), _StandInHandler)
+		self._server.daemon_threads = True
+		self._server.standIn = self
+		self._port = self._server.server_address[1]
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+		self._thread.start()
+		return self.endpoint()
+
+	def Stop(self):
+		if not self._server is None:
+			self._server.shutdown()
+			self._server.server_close()
+		self._server = None
+		self._thread = None
+		return True
+
+	#
+	# Properties (public)
+	#
+	def endpoint(self):
+		return "http://{}:{}/".format(self._host,self._port)
+
+	def verbose(self):
+		return self._verbose
+
+	def retryAfterSecs(self):
+		return self._retryAfterSecs
+
+	def rowCt(self):															# Data rows on default tab
+		return self._DataRowCt(None)
+
+	def requestCt(self):
+		return self._requestCt
+
+	def errorCt(self):
+		return self._errorCt
+
+	def rowsServed(self):
+		return self._rowsServed
+
+"""
+##########################################
+		MAIN
+##########################################
+"""
+def main():
+	parser = argparse.ArgumentParser(prog='mhgSheetStandIn.py', description="=== MHG Sheets API Stand-in ===")
+	parser.add_argument('--port',			type=int,	default=8089,		help='Port to listen on')
+	parser.add_argument('--fixture',		type=str,	default=None,		help='JSON or CSV dump of sheet rows to serve')
+	parser.add_argument('--rows',			type=int,	default=10000,		help='Number of synthetic rows to serve, when no fixture')
+	parser.add_argument('--days',			type=int,	default=365,		help='Days synthetic rows are spread over, from 2020.03.20')
+	parser.add_argument('--latency',		type=int,	default=0,			help='Milliseconds added to every response')
+	parser.add_argument('--errorrate',		type=float,	default=0.0,		help='Fraction of requests failed')
+	parser.add_argument('--errorstatus',	type=int,	default=503,		help='HTTP status of failed requests')
+	parser.add_argument('--retryafter',		type=int,	default=None,		help='Retry-After seconds sent with 429 and 503 errors')
+	parser.add_argument('--commentbytes',	type=int,	default=0,			help='Synthetic comment length, to pad payload size')
+	parser.add_argument('--seed',			type=int,	default=1,			help='Synthetic data and error injection seed')
+	parser.add_argument('--verbose',		default=False,	action='store_true',	help='Log requests')
+	args = parser.parse_args()
+
+	standIn = SheetStandIn(fixtureSpec=args.fixture, synthRows=args.rows, synthDays=args.days, latencyMs=args.latency,
+							errorRate=args.errorrate, errorStatus=args.errorstatus, commentBytes=args.commentbytes,
+							seed=args.seed, port=args.port, verbose=args.verbose, retryAfterSecs=args.retryafter)
+	print("#### Sheets stand-in listening. Set MHGGIS_GOOGLE_ENDPOINT={}".format(standIn.Start()))
+	try:
+		while True: time.sleep(3600)
+	except KeyboardInterrupt:
+		standIn.Stop()
+
+if __name__ == '__main__':
+	main()
@@ -21,6 +21,7 @@
 import copy
 
 # MHGLIB includes
+from mhgCountyIndex			import CountyIndex
 from mhgCountyStats			import CountyStats
 from mhgCumulativeStats 	import CumulativeStats
 from mhgImpact				import Impact
@@ -37,13 +38,15 @@ class StateStats(CumulativeStats):
 	# Properties (private)
 	_fieldData						= []
 	_stateName						= None
-	_countyData						= {}												# Hash of CountyStats objects, by county name
+	_countyIndex					= None												# County names, by county id
+	_countyData						= {}												# Hash of CountyStats objects, by county id
 
 	# Constructor
-	def __init__(self,stateName):
-		barfd("StateStats.Constructor.entry(stateName={})".format(stateName))
-		super(StateStats,self).__init__()												# Call base class constructor
+	def __init__(self,stateName,runConfig=None):
+		barfd("StateStats.Constructor.entry(stateName=%s)", stateName)
+		super(StateStats,self).__init__(runConfig)										# Call base class constructor
 		self._SetDefaults()																# Set new object defaults
+		self._countyIndex = CountyIndex.Michigan()
 		self._stateName	= stateName														# Set state name
 		barfd("StateStats.Constructor.exit()")
 
@@ -79,16 +82,16 @@ class StateStats(CumulativeStats):
 
 	def _CrunchCountyData(self):
 		self._ZeroAccumulators()
-		for countyName in self._countyData.keys():
-			self._observeDays.SetValue( self._observeDays.value() + self._countyData(countyName).observeDays().value() )
-			self._observeCount.SetValue( self._observeCount.value() + self._countyData(countyName).observeCount().value() )
-			self._utilityWeight.SetValue( self._utilityWeight.value() + self._countyData(countyName).utilityWeight().value() )
-			self._servicesWeight.SetValue( self._servicesWeight.value() + self._countyData(countyName).servicesWeight().value() )
-			self._consumablesWeight.SetValue( self._consumablesWeight.value() + self._countyData(countyName).consumablesWeight().value() )
-			self._checkins2M.SetValue( self._checkins2M.value() + self._countyData(countyName).checkins2M().value() )
-			self._participate2M.SetValue( self._participate2M.value() + self._countyData(countyName).participate2M().value() )
-			self._checkinsHF.SetValue( self._checkinsHF.value() + self._countyData(countyName).checkinsHF().value() )
-			self._participateHF.SetValue( self._participateHF.value() + self._countyData(countyName).participateHF().value() )
+		for countyData in self._countyData.values():
+			self._observeDays.SetValue( self._observeDays.value() + countyData.observeDays().value() )
+			self._observeCount.SetValue( self._observeCount.value() + countyData.observeCount().value() )
+			self._utilityWeight.SetValue( self._utilityWeight.value() + countyData.utilityWeight().value() )
+			self._servicesWeight.SetValue( self._servicesWeight.value() + countyData.servicesWeight().value() )
+			self._consumablesWeight.SetValue( self._consumablesWeight.value() + countyData.consumablesWeight().value() )
+			self._checkins2M.SetValue( self._checkins2M.value() + countyData.checkins2M().value() )
+			self._participate2M.SetValue( self._participate2M.value() + countyData.participate2M().value() )
+			self._checkinsHF.SetValue( self._checkinsHF.value() + countyData.checkinsHF().value() )
+			self._participateHF.SetValue( self._participateHF.value() + countyData.participateHF().value() )
 
 	#
 	# Methods (private)
@@ -98,7 +101,7 @@ class StateStats(CumulativeStats):
 	# Methods (public)
 	#
 	def ClearCountyData(self):
-		self._countyData = {CountyStats.COUNTY_DEFAULT: CountyStats()}				# Initialize county data hash with a default county item
+		self._countyData = {CountyIndex.DEFAULT_ID: CountyStats(runConfig=self._runConfig)}	# Initialize county data hash with a default county item
 
 	#
 	# Property Getters (public)
@@ -106,13 +109,27 @@ class StateStats(CumulativeStats):
 	def stateName(self):
 		return copy.deepcopy(self._stateName)
 
-	def countyList(self):
+	def countyIndex(self):
+		return self._countyIndex
+
+	def countyList(self):															# County names with stats, in order added
+		return [self._countyIndex.CountyName(countyId) for countyId in self._countyData]
+
+	def countyIds(self):															# County ids with stats, in order added
 		return self._countyData.keys()
 
-	def countyData(self,county):
-		if not county in self._countyData:											# Add county, with default values, if not already in hash
-			self._countyData[county]	= CountyStats(county)
-		return self._countyData[county]
+	def hasCountyId(self,countyId):
+		return countyId in self._countyData
+
+	def countyData(self,county):													# County stats, by county text
+		return self.countyDataById(self._countyIndex.CountyId(county))
+
+	def countyDataById(self,countyId):
+		countyData = self._countyData.get(countyId)
+		if countyData is None:														# Add county, with default values, if not already in hash
+			countyData = CountyStats(self._countyIndex.CountyName(countyId),self._runConfig)
+			self._countyData[countyId] = countyData
+		return countyData
 
 	#
 	# Property Getters, Calculated (public)
@@ -0,0 +1,166 @@
+#
+# ---------------------------------------------------------------------------------------------
+# mhgStatusRow.py
+#
+# Description
+#
+#   Status Row. A row of MHG Covid observation data with data typing and validation.
+#
+# Copyright
+#
+#   Copyright (c) 2020 Kurt Schulte & Michigan Home Guard.  This software is freely available for
+#                       non profit conservative organizations and individuals to use in support
+#                       of American freedom and the constitution. All other rights are reserved,
+#                       and any other use prohibited.
+#
+# Date          Version     Author          Description
+# 2020.04.20    02.00       SquintMHG       New module
+# ---------------------------------------------------------------------------------------------
+
+# Python includes
+import copy
+
+# MHGLIB includes
+from mhgAppSettings		import AppSettings
+from mhgDataField   	import DataField
+from mhgDateParser   	import DateParser
+from mhgUtility			import *
+
+#
+# Status Row
+#	A row from the spreadsheet with data typing and validation functionality. Columns are
+#	decoded to typed DataFields once, when the row is set, and getters return those fields.
+#
+class StatusRow():
+
+	# ColInfo hash
+	_COL_DTYPE				= 'dType'
+	_COL_HEADER				= 'header'
+
+	# Google Covid Data (input) metadata 
+	_GSHT_DATE				= 0
+	_GSHT_SITE				= 1
+	_GSHT_COUNTY			= 2
+	_GSHT_UTILITIES			= 3
+	_GSHT_SERVICES			= 4
+	_GSHT_CONSUMABLES		= 5
+	_GSHT_2M_CHECKINS		= 6
+	_GSHT_2M_PARTICIPATE	= 7
+	_GSHT_HF_CHECKINS		= 8
+	_GSHT_HF_PARTICIPATE	= 9
+	_GSHT_COMMENTS			= 10
+	_GSHT_METADATA			= { \
+			_GSHT_DATE:				{ _COL_DTYPE: DataField.DTYPE_DATE,		_COL_HEADER: 'IntelDate'			},
+			_GSHT_SITE:				{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'Site' 				},
+			_GSHT_COUNTY:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'County'				},
+			_GSHT_UTILITIES:		{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'UtilityImpact'		},
+			_GSHT_SERVICES:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'ServicesImpact'		},
+			_GSHT_CONSUMABLES:		{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'ConsumablesImpact'	},
+			_GSHT_2M_CHECKINS:		{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: '2M Checkins'			},
+			_GSHT_2M_PARTICIPATE:	{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: '2M Participate'		},
+			_GSHT_HF_CHECKINS:		{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: 'HF Checkins'			},
+			_GSHT_HF_PARTICIPATE:	{ _COL_DTYPE: DataField.DTYPE_NUMERIC,	_COL_HEADER: 'HF Participate'		},
+			_GSHT_COMMENTS:			{ _COL_DTYPE: DataField.DTYPE_TEXT,		_COL_HEADER: 'Comments'				}   }
+
+	# Properties (private)
+	_rowData				= None
+	_columnFields			= []														# DataField per column, decoded once
+	_sourceTab				= None														# Sheet tab (or other source tag) row came from
+	_fieldData				= []
+	_validateMessage		= ""
+
+	#
+	# Constructor
+	#
+	def __init__(self,sheetRow,sourceTab=None):
+		self._rowData = sheetRow
+		self._sourceTab = sourceTab
+		self._SetFieldData()
+
+	#
+	# Methods (private)
+	#
+	def _SetFieldData(self):													# Decode all columns of row
+		self._columnFields = [self._StatusField(columnId) for columnId in range(len(self._GSHT_METADATA))]
+		self._fieldData = self._columnFields[self._GSHT_DATE:self._GSHT_COMMENTS]	# Data fields, less comments
+
+	def _StatusField(self,columnId):
+		fieldValue = ''
+		if columnId < len(self._rowData):	fieldValue = self._rowData[columnId]
+		isNumber = isinstance(fieldValue,(int,float))													# Unformatted sheet values: numbers and serial dates
+		if self._GSHT_METADATA[columnId][self._COL_DTYPE] == DataField.DTYPE_NUMERIC: fieldValue = nullz(fieldValue)
+		if self._GSHT_METADATA[columnId][self._COL_DTYPE] == DataField.DTYPE_DATE:
+			if isNumber:	fieldValue = DateParser.SerialDateYMD(fieldValue)
+			else:			fieldValue = DateParser().ParseDate(fieldValue).dateYMD()
+		if self._GSHT_METADATA[columnId][self._COL_DTYPE] == DataField.DTYPE_TEXT and isNumber: fieldValue = str(fieldValue)
+		return DataField( columnId, self._GSHT_METADATA[columnId][self._COL_DTYPE],  self._GSHT_METADATA[columnId][self._COL_HEADER], fieldValue );
+
+	#
+	# Methods (public)
+	#
+	def SetRow(self,sheetRow):
+		self._rowData = sheetRow
+		self._SetFieldData()
+		
+	def dataFields(self):
+		return self._fieldData
+		
+	def isValidRow(self,rowCt):
+		isValid = True
+		self._validateMessage = ""
+		if self.intelDate().isEmpty(): 	self._validateMessage = "Row {} Missing intel date".format(rowCt)
+		if self.site().isEmpty(): 		self._validateMessage = "Row {} Missing reporting site".format(rowCt)
+		if self.county().isEmpty(): 	self._validateMessage = "Row {} Missing county. intelDate={},site={}".format(rowCt,self.intelDate().value(),self.site().value())
+		isValid = self._validateMessage == ""
+		return isValid
+		
+	def isFilterMatchRow(self,runConfig=None):
+		runConfig = activeRunConfig(runConfig)
+		return isBetween(self.intelDate().value(),runConfig.startDate(),runConfig.endDate())
+
+	# Debug
+	def DumpFields(self):
+		for field in self.dataFields():
+			print("RowField.{}.{}={}".format(field.fieldId(),field.headerText(),field.value()))
+
+	#
+	# Getters
+	#
+	def intelDate(self):
+		return self._columnFields[self._GSHT_DATE]
+
+	def site(self):
+		return self._columnFields[self._GSHT_SITE]
+
+	def county(self):
+		return self._columnFields[self._GSHT_COUNTY]
+
+	def utilities(self):
+		return self._columnFields[self._GSHT_UTILITIES]
+
+	def services(self):
+		return self._columnFields[self._GSHT_SERVICES]
+
+	def consumables(self):
+		return self._columnFields[self._GSHT_CONSUMABLES]
+
+	def checkins2M(self):
+		return self._columnFields[self._GSHT_2M_CHECKINS]
+
+	def participate2M(self):
+		return self._columnFields[self._GSHT_2M_PARTICIPATE]
+
+	def checkinsHF(self):
+		return self._columnFields[self._GSHT_HF_CHECKINS]
+
+	def participateHF(self):
+		return self._columnFields[self._GSHT_HF_PARTICIPATE]
+
+	def comments(self):
+		return self._columnFields[self._GSHT_COMMENTS]
+
+	def sourceTab(self):
+		return self._sourceTab
+
+	def validateMessage(self):
+		return copy.deepcopy(self._validateMessage)
\ No newline at end of file
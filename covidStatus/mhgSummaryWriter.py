@@ -44,8 +44,8 @@ class SummaryWriter(CsvWriter):												# Summary CSV Writer class
 	def Open(self,stats):													# Open Summary CSV for output
 		success = False
 		if self._fhCsv is None:
-			self.SetFileSpec( AppSettings.glob().summaryCsvSpec() )
-			barfd("SummaryWriter.Open(file={})".format(self._fhCsv))
+			self.SetFileSpec( AppSettings.glob().summaryCsvSpec(stats.runConfig()) )
+			barfd("SummaryWriter.Open(file=%s)", self._fhCsv)
 			self._fhCsv = open(self.fileSpec(), 'w')
 			if self._fhCsv is None:
 				raise EnvironmentError("Can't open output Summary CSV ({})".format(self.fileSpec()))
@@ -76,12 +76,12 @@ class SummaryWriter(CsvWriter):												# Summary CSV Writer class
 		barfd("SummaryWriter.WriteStateCountyStats()")
 		barfi("Summary data generating ...")
 
-		for countyName in stateData.countyList():
-			countyStats	= stateData.countyData(countyName)
+		for countyId in stateData.countyIds():
+			countyStats	= stateData.countyDataById(countyId)
 			self.WriteCountyStats(countyStats)
 
 		self.Close()
 
-		barfi("Summary data complete. Stats recorded for {} counties.".format(len(stateData.countyList())))
+		barfi("Summary data complete. Stats recorded for %s counties.", len(stateData.countyIds()))
 
 		return success
\ No newline at end of file
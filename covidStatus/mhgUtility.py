@@ -23,34 +23,95 @@
 # ---------------------------------------------------------------------------------------------
 
 # Python includes
+import atexit
 import os
+import sys
 from datetime import datetime
 from datetime import timedelta
 
 # MHGLIB includes
 from mhgAppSettings		import AppSettings
+from mhgRunConfig		import RunConfig
+
+#
+# Run configuration
+#
+def activeRunConfig(runConfig=None):													# Run configuration given, else the current one
+	if runConfig is None: runConfig = RunConfig.Current()
+	if runConfig is None: runConfig = AppSettings.glob().runConfig()					# First use parses command options
+	return runConfig
 
 #
 # Regurgitation
+#	Log levels are read from the run configuration once, on first use. Messages take %-style
+#	args, formatted only when the level is on. Lines are buffered, and written when the buffer
+#	fills, on info lines, before unconditional barf() output, and at exit. Guard expensive
+#	message args with barfdOn()/barftOn().
 #
-def barfi(text):
-	if AppSettings.glob().options().infoEnabled():	print("INFO: " + text)
+_LOG_BUFFER_LINES	= 500																# Log lines held before writing
+_logInfo			= None																# Log levels on. None until first use.
+_logDebug			= None
+_logTrace			= None
+_logLines			= []																# Buffered log lines
+
+def SetLogLevels(runConfig=None):														# Cache log levels of run configuration
+	global _logInfo, _logDebug, _logTrace
+	runConfig = activeRunConfig(runConfig)
+	_logInfo	= runConfig.infoEnabled()
+	_logDebug	= runConfig.debugEnabled()
+	_logTrace	= runConfig.traceEnabled()
+
+def _barfLine(prefix,text,args):
+	if args: text = text % args
+	_logLines.append(prefix + text + "\n")
+	if len(_logLines) >= _LOG_BUFFER_LINES: barfFlush()
+
+def barfFlush():																		# Write buffered log lines
+	if _logLines:
+		sys.stdout.write(''.join(_logLines))
+		del _logLines[:]
+	sys.stdout.flush()
 
-def barfd(text):
-	if AppSettings.glob().options().debugEnabled():	print("DEBUG: " + text)
+def barfiOn():
+	if _logInfo is None: SetLogLevels()
+	return _logInfo
 
-def barft(text):
-	if AppSettings.glob().options().traceEnabled():	print("TRACE: " + text)
+def barfdOn():
+	if _logDebug is None: SetLogLevels()
+	return _logDebug
 
-def barf(text):
+def barftOn():
+	if _logTrace is None: SetLogLevels()
+	return _logTrace
+
+def barfi(text,*args):
+	if _logInfo is None: SetLogLevels()
+	if _logInfo:
+		_barfLine("INFO: ",text,args)
+		barfFlush()																		# Progress info shows up as it happens
+
+def barfd(text,*args):
+	if _logDebug is None: SetLogLevels()
+	if _logDebug: _barfLine("DEBUG: ",text,args)
+
+def barft(text,*args):
+	if _logTrace is None: SetLogLevels()
+	if _logTrace: _barfLine("TRACE: ",text,args)
+
+def barf(text,*args):
+	barfFlush()
+	if args: text = text % args
 	print (text)
 
+atexit.register(barfFlush)
+
 #
 # String manipulation
 #
 def nullz(someValue):																	# Coalesce null and empty string -> zero
 	retVal = 0
-	if not someValue is None and someValue.strip() != "": retVal = int(someValue)
+	if isinstance(someValue,(int,float)):							retVal = int(someValue)		# Unformatted sheet values arrive as numbers
+	elif not someValue is None and someValue.strip() != "":			retVal = int(someValue)
 	return retVal
 	
 def coalesce(someValue,ifNullValue):													# Coalesce
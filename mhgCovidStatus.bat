@@ -4,7 +4,9 @@
 :: Usage:
 ::
 ::    mhgCovidStatus.py [-h] [--start START] [--end END] [--ndays [NDAYS]] [--nodetail] [--nosummary]
-::                         [--noproject] [--nopdf] [--noimage] [--info] [--debug] [--zombies]
+::                         [--noproject] [--nopdf] [--noimage] [--info] [--debug] [--zombies] [--refresh]
+::                         [--source {sheet,detail,file,cube}] [--sourcefile SOURCEFILE] [--unformatted]
+::                         [--tally {batch,rows,cube}] [--windows WINDOWS]
 ::
 ::     === MHG Covid Status Report ===
 ::
@@ -21,6 +23,16 @@
 ::       --info           Whether to barf progress info
 ::       --debug          Whether to barf debug info
 ::       --zombies        Whether to enable zombies
+::       --refresh        Refetch sheet data, ignoring cached snapshot
+::       --source {sheet,detail,file,cube}
+::                        Where to read observation rows from
+::       --sourcefile SOURCEFILE
+::                        CSV or JSON dump of sheet rows, for --source file. Cube file, for --source cube.
+::       --unformatted    Fetch sheet values unformatted, with dates as serial numbers
+::       --tally {batch,rows,cube}
+::                        How to tally county stats. Output is the same either way.
+::       --windows WINDOWS
+::                        Report windows, as days ending on end date (e.g. 1,7,30). One fetch, reports for each.
 ::
 ::     Note:
 ::             dates may be entered mm/dd, mm/dd/yyyy or yyyy.mm.dd